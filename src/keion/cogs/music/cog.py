@@ -1,20 +1,45 @@
 """Music playback cog implementation."""
 
+import asyncio
+import contextlib
 import logging
+import math
+import time
 
 from discord import Color, Embed, Member, VoiceState
 from discord.ext import commands
 from discord.ext.commands import Context
 
-from keion.utils.constants import MAX_PLAYLIST_DISPLAY
+from keion.utils.constants import (
+    MAX_LOOKAHEAD_DEPTH,
+    MAX_PLAYLIST_DISPLAY,
+    SEEK_STEP_SECONDS,
+    SPOTIFY_IMPORT_PROGRESS_INTERVAL,
+)
+from keion.utils.events import EVENTS
+from keion.utils.extraction import ExtractionQueueFullError
+from keion.utils.metrics import REGISTRY, CallbackMetric
 from keion.utils.musicbrainz_client import MusicBrainzClient  # Import the client
-
-from .player_manager import PlayerManager
-from .playlist_manager import PlaylistManager
+from keion.utils.spotify_client import SpotifyAPIError
+
+from .player_manager import (
+    DISCORD_SEND_SECONDS,
+    PlayerManager,
+    is_youtube_playlist,
+    parse_spotify_collection,
+    parse_timestamp,
+)
+from .playlist_manager import PlaylistRegistry
 from .voice_manager import VoiceManager
 
 logger = logging.getLogger(__name__)
 
+COMMAND_SECONDS = REGISTRY.histogram(
+    "keion_command_duration_seconds",
+    "Time spent running a music command",
+    labels=("command",),
+)
+
 
 class MusicCog(commands.Cog):
     """A Discord cog that provides music playback functionality."""
@@ -22,20 +47,101 @@ class MusicCog(commands.Cog):
     def __init__(self, bot: commands.Bot) -> None:
         """Initialize the music cog."""
         self.bot = bot
-        self.playlist_manager = PlaylistManager()
+        self.playlists = PlaylistRegistry()
         self.voice_manager = VoiceManager()
-        self.player_manager = PlayerManager(
-            bot, self.playlist_manager, self.voice_manager
-        )
+        self.player_manager = PlayerManager(bot, self.playlists, self.voice_manager)
         self.musicbrainz_client = MusicBrainzClient()  # Initialize the client
+        self.metrics: list[CallbackMetric] = []
         logger.info("Music cog initialized")
 
+    async def cog_load(self) -> None:
+        """Start background tasks when the cog is loaded."""
+        self.player_manager.cache.start_sweeper()
+        self.player_manager.search_cache.start_sweeper()
+        await asyncio.to_thread(self.player_manager.opus_cache.load)
+        self.metrics = self._state_metrics()
+        for metric in self.metrics:
+            REGISTRY.register(metric)
+
     async def cog_unload(self) -> None:
         """Clean up resources when the cog is unloaded."""
+        for metric in self.metrics:
+            REGISTRY.unregister(metric.name)
+        await self.player_manager.cache.stop_sweeper()
+        await self.player_manager.search_cache.stop_sweeper()
+        await self.player_manager.opus_cache.close()
+        await self.player_manager.loudness_analyzer.close()
+        self.player_manager.extractor.shutdown()
+        self.player_manager.downloader.close()
+        await self.player_manager.spotify_client.close()
         # Close the MusicBrainz client's session if it exists
         await self.musicbrainz_client.close_session()
         logger.info("MusicBrainz client session closed.")
 
+    def _state_metrics(self) -> list[CallbackMetric]:
+        """Metrics read from the player state when /metrics is scraped."""
+        player = self.player_manager
+        caches = {"song": player.cache, "search": player.search_cache}
+        return [
+            CallbackMetric(
+                "keion_cache_requests_total",
+                "Cache lookups by result",
+                lambda: {
+                    (name, result): getattr(cache, attr)
+                    for name, cache in caches.items()
+                    for result, attr in (("hit", "hits"), ("miss", "misses"))
+                },
+                labels=("cache", "result"),
+                metric_type="counter",
+            ),
+            CallbackMetric(
+                "keion_cache_evictions_total",
+                "Entries evicted from a cache",
+                lambda: {(name,): cache.evictions for name, cache in caches.items()},
+                labels=("cache",),
+                metric_type="counter",
+            ),
+            CallbackMetric(
+                "keion_extraction_queue_depth",
+                "Extractions waiting for or running on the executor",
+                lambda: {
+                    ("pending",): player.extractor.pending,
+                    ("running",): player.extractor.running,
+                },
+                labels=("state",),
+            ),
+            CallbackMetric(
+                "keion_voice_clients",
+                "Connected voice clients",
+                lambda: len(self.voice_manager.voice_clients),
+            ),
+            CallbackMetric(
+                "keion_ffmpeg_processes",
+                "Running ffmpeg playback processes",
+                lambda: {
+                    ("encode",): player.governor.encoding,
+                    ("passthrough",): player.governor.passthrough,
+                },
+                labels=("mode",),
+            ),
+            CallbackMetric(
+                "keion_discord_gateway_latency_seconds",
+                "Discord gateway heartbeat latency",
+                lambda: self.bot.latency if math.isfinite(self.bot.latency) else None,
+            ),
+        ]
+
+    async def cog_before_invoke(self, context: Context) -> None:
+        """Note when a command starts, for the command latency metric."""
+        context.started_at = time.perf_counter()
+
+    async def cog_after_invoke(self, context: Context) -> None:
+        """Record how long a command took."""
+        if (started_at := getattr(context, "started_at", None)) is not None:
+            COMMAND_SECONDS.observe(
+                time.perf_counter() - started_at, context.command.qualified_name
+            )
+
     @commands.Cog.listener()
     async def on_ready(self) -> None:
         """Event handler for when the bot is ready."""
@@ -51,23 +157,120 @@ class MusicCog(commands.Cog):
     @commands.command()
     async def play(self, context: Context, *, query: str) -> None:
         """Play a song from URL or search query."""
-        info = await self.player_manager.get_music_info(query)
-        self.playlist_manager.add_to_queue(info)
+        if collection := parse_spotify_collection(query):
+            await self._play_spotify_collection(context, *collection)
+            return
+        if is_youtube_playlist(query):
+            await self._play_youtube_playlist(context, query)
+            return
+
+        try:
+            info = await self.voice_manager.connect_while(
+                context, self.player_manager.get_music_info(query, context.guild.id)
+            )
+        except ExtractionQueueFullError:
+            await context.send("⏳ Too many songs are being looked up, try again soon!")
+            return
+        playlist = self.playlists.get(context.guild.id)
+        playlist.add_to_queue(info)
+        EVENTS.publish("queue", context.guild.id)
 
         # Get the voice client using guild ID
         voice_client = self.voice_manager.voice_clients.get(context.guild.id)
 
         if voice_client and not voice_client.is_playing():
-            next_song = self.playlist_manager.get_next_song()
+            next_song = playlist.get_next_song()
             await self.player_manager.play_song(context, next_song)
         else:
+            self.player_manager.refresh_lookahead(context.guild.id)
             embed = Embed(title="🎵 Added to Queue", color=Color.green())
             embed.add_field(
-                name=info["title"],
-                value=f"Position: #{len(self.playlist_manager.playlist)}",
+                name=info.title,
+                value=f"Position: #{len(playlist.playlist)}",
                 inline=False,
             )
-            await context.send(embed=embed)
+            with DISCORD_SEND_SECONDS.time():
+                await context.send(embed=embed)
+
+    @commands.command(name="playlist")
+    async def play_playlist(self, context: Context, url: str) -> None:
+        """Queue every video of a YouTube playlist."""
+        await self._play_youtube_playlist(context, url)
+
+    async def _play_youtube_playlist(self, context: Context, url: str) -> None:
+        """Queue placeholders for a YouTube playlist and start playback."""
+        try:
+            tracks = await self.voice_manager.connect_while(
+                context, self.player_manager.get_playlist_tracks(url, context.guild.id)
+            )
+        except ExtractionQueueFullError:
+            await context.send("⏳ Too many songs are being looked up, try again soon!")
+            return
+
+        if not tracks:
+            await context.send("❌ Couldn't find any videos in that playlist!")
+            return
+
+        playlist = self.playlists.get(context.guild.id)
+        for track in tracks:
+            playlist.add_to_queue(track)
+        EVENTS.publish("queue", context.guild.id)
+        await context.send(f"📜 Queued {len(tracks)} songs from the playlist!")
+
+        voice_client = self.voice_manager.voice_clients.get(context.guild.id)
+        if voice_client and not voice_client.is_playing():
+            next_song = playlist.get_next_song()
+            await self.player_manager.play_song(context, next_song)
+        else:
+            self.player_manager.refresh_lookahead(context.guild.id)
+
+    async def _play_spotify_collection(
+        self, context: Context, kind: str, collection_id: str
+    ) -> None:
+        """Queue a Spotify album or playlist, starting playback right away."""
+        guild_id = context.guild.id
+        message, _ = await asyncio.gather(
+            context.send(f"🎧 Importing Spotify {kind}..."),
+            self.voice_manager.connect(context),
+        )
+        loop = asyncio.get_running_loop()
+        last_edit = loop.time()
+        queued = 0
+
+        imports = self.player_manager.iter_spotify_collection(
+            kind, collection_id, guild_id
+        )
+        try:
+            # Closed right away on a break, cancelling pending lookups
+            async with contextlib.aclosing(imports):
+                async for track in imports:
+                    voice_client = self.voice_manager.voice_clients.get(guild_id)
+                    if voice_client is None:
+                        break  # Stopped or disconnected while importing
+
+                    playlist = self.playlists.get(guild_id)
+                    playlist.add_to_queue(track)
+                    EVENTS.publish("queue", guild_id)
+                    queued += 1
+                    if not voice_client.is_playing() and not voice_client.is_paused():
+                        next_song = playlist.get_next_song()
+                        await self.player_manager.play_song(context, next_song)
+                    else:
+                        self.player_manager.refresh_lookahead(guild_id)
+
+                    if loop.time() - last_edit >= SPOTIFY_IMPORT_PROGRESS_INTERVAL:
+                        last_edit = loop.time()
+                        await message.edit(
+                            content=f"🎧 Importing Spotify {kind}... {queued} queued"
+                        )
+        except SpotifyAPIError as e:
+            logger.error("Error importing Spotify %s: %s", kind, e)
+            await message.edit(
+                content=f"❌ Failed to import Spotify {kind} after {queued} songs."
+            )
+            return
+
+        await message.edit(content=f"✅ Queued {queued} songs from Spotify {kind}!")
 
     @commands.command()
     async def skip(self, context: Context) -> None:
@@ -78,7 +281,8 @@ class MusicCog(commands.Cog):
         ):
             self.voice_manager.voice_clients[context.guild.id].stop()
             # Force next song to be from queue if available
-            next_song = self.playlist_manager.skip_current()
+            next_song = self.playlists.get(context.guild.id).skip_current()
+            EVENTS.publish("skip", context.guild.id)
             if next_song:
                 await self.player_manager.play_song(context, next_song)
             await context.send("⏭️ Skipped the current song!")
@@ -93,6 +297,7 @@ class MusicCog(commands.Cog):
             and self.voice_manager.voice_clients[context.guild.id].is_playing()
         ):
             self.voice_manager.voice_clients[context.guild.id].pause()
+            EVENTS.publish("pause", context.guild.id)
         else:
             await context.send("❌ Nothing to pause!")
 
@@ -104,6 +309,7 @@ class MusicCog(commands.Cog):
             and self.voice_manager.voice_clients[context.guild.id].is_paused()
         ):
             self.voice_manager.voice_clients[context.guild.id].resume()
+            EVENTS.publish("resume", context.guild.id)
         else:
             await context.send("❌ Nothing to resume!")
 
@@ -111,48 +317,45 @@ class MusicCog(commands.Cog):
     async def stop(self, context: Context) -> None:
         """Stop playback and clear the queue."""
         if context.guild.id in self.voice_manager.voice_clients:
-            self.playlist_manager.clear_queue()
+            self.playlists.get(context.guild.id).clear_queue()
+            self.player_manager.cancel_lookahead(context.guild.id)
             await self.voice_manager.disconnect(context.guild.id)
 
     @commands.command()
     async def queue(self, context: Context) -> None:
         """Display the current queue and loop status."""
-        if (
-            not self.playlist_manager.playlist
-            and not self.playlist_manager.current_song
-        ):
+        playlist = self.playlists.peek(context.guild.id)
+        if playlist is None or (not playlist.playlist and not playlist.current_song):
             await context.send("📝 The queue is empty!")
             return
 
         embed = Embed(title="📝 Current Queue", color=Color.blue())
 
         # Show current song
-        if self.playlist_manager.current_song:
+        if playlist.current_song:
             embed.add_field(
                 name="🎵 Now Playing",
-                value=f"{self.playlist_manager.current_song['title']}",
+                value=f"{playlist.current_song.title}",
                 inline=False,
             )
 
         # Show queue
-        for i, song in enumerate(self.playlist_manager.playlist[:10], 1):
+        for i, song in enumerate(playlist.playlist[:10], 1):
             embed.add_field(
-                name=f"{i}. {song['title']}",
-                value=f"Duration: {song.get('duration', '??:??')}",
+                name=f"{i}. {song.title}",
+                value=f"Duration: {song.duration or '??:??'}",
                 inline=False,
             )
 
         # Show remaining count
-        if len(self.playlist_manager.playlist) > MAX_PLAYLIST_DISPLAY:
-            embed.set_footer(
-                text=f"And {len(self.playlist_manager.playlist) - 10} more songs..."
-            )
+        if len(playlist.playlist) > MAX_PLAYLIST_DISPLAY:
+            embed.set_footer(text=f"And {len(playlist.playlist) - 10} more songs...")
 
         # Show loop status
         loop_status = (
             "🔁 Queue"
-            if self.playlist_manager.loop_queue
-            else "🔂 Song" if self.playlist_manager.loop_song else "❌ Off"
+            if playlist.loop_queue
+            else "🔂 Song" if playlist.loop_song else "❌ Off"
         )
         embed.add_field(name="Loop Status", value=loop_status, inline=False)
 
@@ -161,19 +364,124 @@ class MusicCog(commands.Cog):
     @commands.command()
     async def loop(self, context: Context, mode: str = "queue") -> None:
         """Toggle loop mode for queue or current song."""
+        playlist = self.playlists.get(context.guild.id)
         if mode == "queue":
-            is_enabled = self.playlist_manager.toggle_loop_queue()
+            is_enabled = playlist.toggle_loop_queue()
             await context.send(
                 f"🔁 Queue loop {'enabled' if is_enabled else 'disabled'}!"
             )
         elif mode == "song":
-            is_enabled = self.playlist_manager.toggle_loop_song()
+            is_enabled = playlist.toggle_loop_song()
             await context.send(
                 f"🔂 Song loop {'enabled' if is_enabled else 'disabled'}!"
             )
         else:
             await context.send("❌ Invalid loop mode. Use 'queue' or 'song'!")
 
+    @commands.command()
+    async def remove(self, context: Context, position: int) -> None:
+        """Remove the song at a queue position."""
+        playlist = self.playlists.get(context.guild.id)
+        try:
+            song = playlist.remove_song(position)
+        except IndexError:
+            await context.send(f"❌ There is no song at position #{position}!")
+            return
+
+        self.player_manager.refresh_lookahead(context.guild.id)
+        EVENTS.publish("queue", context.guild.id)
+        await context.send(f"🗑️ Removed **{song.title}** from the queue!")
+
+    @commands.command()
+    async def move(self, context: Context, source: int, destination: int) -> None:
+        """Move a song from one queue position to another."""
+        playlist = self.playlists.get(context.guild.id)
+        try:
+            song = playlist.move_song(source, destination)
+        except IndexError:
+            await context.send(
+                f"❌ Positions must be between 1 and {len(playlist.playlist)}!"
+            )
+            return
+
+        self.player_manager.refresh_lookahead(context.guild.id)
+        EVENTS.publish("queue", context.guild.id)
+        await context.send(f"↕️ Moved **{song.title}** to position #{destination}!")
+
+    @commands.command()
+    async def shuffle(self, context: Context) -> None:
+        """Shuffle the upcoming songs."""
+        playlist = self.playlists.get(context.guild.id)
+        if len(playlist.playlist) <= 1:
+            await context.send("❌ Not enough songs in the queue to shuffle!")
+            return
+
+        playlist.shuffle()
+        self.player_manager.refresh_lookahead(context.guild.id)
+        EVENTS.publish("queue", context.guild.id)
+        await context.send(f"🔀 Shuffled {len(playlist.playlist)} songs!")
+
+    @commands.command()
+    async def dedupe(self, context: Context) -> None:
+        """Remove repeated songs from the queue."""
+        removed = self.playlists.get(context.guild.id).dedupe()
+        if removed:
+            self.player_manager.refresh_lookahead(context.guild.id)
+            EVENTS.publish("queue", context.guild.id)
+        await context.send(f"🧹 Removed {removed} duplicate song(s) from the queue!")
+
+    @commands.command()
+    async def seek(self, context: Context, timestamp: str) -> None:
+        """Jump to a position in the current song, e.g. 90, 1:30 or 1:02:03."""
+        try:
+            position = parse_timestamp(timestamp)
+        except ValueError:
+            await context.send("❌ Use a position like 90, 1:30 or 1:02:03!")
+            return
+        await self._seek_to(context, position)
+
+    @commands.command(aliases=["ff"])
+    async def forward(self, context: Context, seconds: int = SEEK_STEP_SECONDS) -> None:
+        """Skip ahead in the current song (default: 10 seconds)."""
+        await self._seek_by(context, seconds)
+
+    @commands.command(aliases=["rw"])
+    async def rewind(self, context: Context, seconds: int = SEEK_STEP_SECONDS) -> None:
+        """Go back in the current song (default: 10 seconds)."""
+        await self._seek_by(context, -seconds)
+
+    async def _seek_by(self, context: Context, seconds: int) -> None:
+        position = self.player_manager.get_position(context.guild.id)
+        if position is None:
+            await context.send("❌ No song is currently playing!")
+            return
+        await self._seek_to(context, position + seconds)
+
+    async def _seek_to(self, context: Context, position: float) -> None:
+        position = await self.player_manager.seek(context.guild.id, position)
+        if position is None:
+            await context.send("❌ No song is currently playing!")
+            return
+        minutes, seconds = divmod(int(position), 60)
+        await context.send(f"⏩ Jumped to {minutes}:{seconds:02d}!")
+
+    @commands.command()
+    async def lookahead(self, context: Context, depth: int | None = None) -> None:
+        """Show or set how many upcoming songs are prepared in advance."""
+        if depth is None:
+            current = self.player_manager.get_lookahead_depth(context.guild.id)
+            await context.send(f"🔮 Preparing the next {current} song(s) in advance.")
+            return
+
+        if depth < 0 or depth > MAX_LOOKAHEAD_DEPTH:
+            await context.send(
+                f"❌ Look-ahead depth must be between 0 and {MAX_LOOKAHEAD_DEPTH}!"
+            )
+            return
+
+        self.player_manager.set_lookahead_depth(context.guild.id, depth)
+        await context.send(f"🔮 Look-ahead depth set to {depth}!")
+
     @commands.command(aliases=["new"])
     async def newreleases(self, context: Context, days: int = 1) -> None:
         """Show new music releases from the last few days (default: 1)."""
@@ -217,12 +525,24 @@ class MusicCog(commands.Cog):
 
     # Voice state management
     @play.before_invoke
+    @play_playlist.before_invoke
+    async def check_voice(self, context: Context) -> None:
+        """Check voice state only; play connects while looking up the song."""
+        self.voice_manager.check_voice(context)
+
     @skip.before_invoke
     @pause.before_invoke
     @resume.before_invoke
     @stop.before_invoke
     @queue.before_invoke
     @loop.before_invoke
+    @remove.before_invoke
+    @move.before_invoke
+    @shuffle.before_invoke
+    @dedupe.before_invoke
+    @seek.before_invoke
+    @forward.before_invoke
+    @rewind.before_invoke
     async def ensure_voice(self, context: Context) -> None:
         """Ensure proper voice channel connection."""
         await self.voice_manager.ensure_voice(context)
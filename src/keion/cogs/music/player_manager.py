@@ -3,88 +3,457 @@
 import asyncio
 import logging
 import re
-from urllib.parse import urlparse
+from collections import OrderedDict, deque
+from collections.abc import AsyncIterator
+from dataclasses import dataclass, replace
+from urllib.parse import parse_qs, urlparse
 
-import yt_dlp
-from discord import FFmpegOpusAudio
 from discord.ext.commands import Bot, Context
 
-from ...utils.audio import ffmpeg_opts, youtube_dl_options
-from ...utils.cache import SongCache
+from ...utils.audio import (
+    ffmpeg_options_for,
+    ffmpeg_seek_opts,
+    youtube_dl_options,
+    youtube_dl_playlist_options,
+)
+from ...utils.cache import SearchCache, SongCache, StreamURLCache
+from ...utils.constants import (
+    DEFAULT_LOOKAHEAD_DEPTH,
+    FFMPEG_BITRATE_LOAD_THRESHOLD,
+    LOOKAHEAD_POLL_SECONDS,
+    LOOKAHEAD_WARM_SECONDS,
+    LOUDNESS_MIN_REENCODE_GAIN,
+    OPUS_CACHE_REPLAY_WINDOW,
+    SEEK_CLEANUP_DELAY,
+    SPOTIFY_IMPORT_CONCURRENCY,
+    SPOTIFY_IMPORT_MAX_ATTEMPTS,
+    STREAM_URL_EXPIRY_MARGIN,
+    UNAVAILABLE_PLAYLIST_ENTRIES,
+    YOUTUBE_MIX_PREFIX,
+)
 from ...utils.embed import EmbedBuilder
+from ...utils.events import EVENTS
+from ...utils.extraction import (
+    ExtractionQueueFullError,
+    ExtractionScheduler,
+    Priority,
+    SingleFlight,
+    YoutubeDLPool,
+    normalize_query,
+)
+from ...utils.ffmpeg_governor import FFmpegGovernor, GovernedOpusAudio
+from ...utils.loudness import LoudnessAnalyzer, loudness_gain
+from ...utils.metrics import REGISTRY
+from ...utils.opus_cache import OpusDiskCache
 from ...utils.spotify_client import SpotifyClient
-from .playlist_manager import PlaylistManager
+from ...utils.track import SpotifyMetadata, Track
+from .playlist_manager import PlaylistRegistry
 from .voice_manager import VoiceManager
 
 logger = logging.getLogger(__name__)
 
+SPOTIFY_TRACK_PATTERN = re.compile(
+    r"(?:spotify:track:|https://open\.spotify\.com/(?:intl-[a-z]{2}/)?track/)"
+    r"([a-zA-Z0-9]+)"
+)
+SPOTIFY_COLLECTION_PATTERN = re.compile(
+    r"(?:spotify:|https://open\.spotify\.com/(?:intl-[a-z]{2}/)?)"
+    r"(album|playlist)[:/]([a-zA-Z0-9]+)"
+)
+TIMESTAMP_PATTERN = re.compile(r"(?:(?:(\d+):)?(\d+):)?(\d+(?:\.\d+)?)")
+
+MUSIC_INFO_SECONDS = REGISTRY.histogram(
+    "keion_music_info_duration_seconds",
+    "Time to resolve a play query into a track",
+    labels=("kind",),
+)
+DISCORD_SEND_SECONDS = REGISTRY.histogram(
+    "keion_discord_send_duration_seconds", "Time for Discord to accept a message"
+)
+
+
+def parse_spotify_collection(query: str) -> tuple[str, str] | None:
+    """Return ``(kind, id)`` if the query is a Spotify album or playlist."""
+    if match := SPOTIFY_COLLECTION_PATTERN.search(query):
+        return match.group(1), match.group(2)
+    return None
+
+
+def is_youtube_playlist(query: str) -> bool:
+    """Check whether a query is a YouTube URL carrying a playlist.
+
+    Besides playlist pages this matches videos opened from a playlist, e.g.
+    ``watch?v=...&list=...`` or ``youtu.be/...?list=...``, which are played
+    from that video on. Auto-generated mixes (``RD...`` lists) are endless
+    radio rather than a playlist, so links into one play the single video.
+    """
+    try:
+        result = urlparse(query)
+    except ValueError:
+        return False
+    playlist_ids = parse_qs(result.query).get("list")
+    return (
+        result.netloc.removeprefix("www.").removeprefix("m.")
+        in ("youtube.com", "music.youtube.com", "youtu.be")
+        and bool(playlist_ids)
+        and not playlist_ids[0].startswith(YOUTUBE_MIX_PREFIX)
+    )
+
+
+def _playlist_start(url: str, tracks: list[Track]) -> int:
+    """Get the index of the entry a playlist link was opened at, 0 if none."""
+    result = urlparse(url)
+    params = parse_qs(result.query)
+    if result.netloc == "youtu.be":
+        video_id = result.path.strip("/")
+    else:
+        video_id = params.get("v", [""])[0]
+    for index, track in enumerate(tracks):
+        if track.id == video_id:
+            return index
+
+    position = params.get("index", [""])[0]
+    if position.isdigit() and int(position) > 0:
+        return min(int(position), len(tracks)) - 1
+    return 0
+
+
+def parse_timestamp(value: str) -> float:
+    """Parse a position given as seconds, ``mm:ss`` or ``h:mm:ss``.
+
+    Raises:
+        ValueError: If the value is not a valid, non-negative timestamp
+    """
+    match = TIMESTAMP_PATTERN.fullmatch(value.strip())
+    if not match:
+        raise ValueError(f"Invalid timestamp: {value}")
+    hours, minutes, seconds = match.groups()
+    return int(hours or 0) * 3600 + int(minutes or 0) * 60 + float(seconds)
+
+
+def is_valid_url(url: str) -> bool:
+    """Check whether a query is an absolute URL."""
+    try:
+        result = urlparse(url)
+        return all([result.scheme, result.netloc])
+    except ValueError:
+        return False
+
+
+@dataclass(slots=True)
+class _PreparedTrack:
+    """Look-ahead work for the next track of a guild."""
+
+    track: Track
+    task: asyncio.Task
+    resolved: Track | None = None
+    source: GovernedOpusAudio | None = None
+
+    def cancel(self) -> None:
+        """Cancel pending work and release any warmed audio source."""
+        self.task.cancel()
+        if self.source is not None:
+            self.source.cleanup()
+            self.source = None
+
 
 class PlayerManager:
     """Manages music playback functionality."""
 
     def __init__(
-        self, bot: Bot, playlist_manager: PlaylistManager, voice_manager: VoiceManager
+        self, bot: Bot, playlists: PlaylistRegistry, voice_manager: VoiceManager
     ) -> None:
         """Initialize the player manager."""
         self.bot = bot
-        self.playlist_manager = playlist_manager
+        self.playlists = playlists
         self.voice_manager = voice_manager
-        self.downloader = yt_dlp.YoutubeDL(youtube_dl_options)
+        self.voice_manager.register_disconnect_callback(self.forget_guild)
+        self.downloader = YoutubeDLPool(youtube_dl_options)
+        self.playlist_downloader = YoutubeDLPool(
+            youtube_dl_playlist_options, max_idle=1
+        )
+        self.extractor = ExtractionScheduler()
+        self.inflight = SingleFlight()
         self.cache = SongCache()
+        self.stream_cache = StreamURLCache()
+        self.search_cache = SearchCache()
+        self.opus_cache = OpusDiskCache()
+        self.governor = FFmpegGovernor()
+        self.loudness_analyzer = LoudnessAnalyzer()
+        # Recently played track IDs, to spot tracks worth caching on disk
+        self._recent_plays: OrderedDict[str, None] = OrderedDict()
         self.embed_builder = EmbedBuilder()
         self.spotify_client = SpotifyClient()
         # Track text channel IDs for responding
         self.text_channels = {}
+        # Look-ahead state, per guild
+        self.lookahead_depths: dict[int, int] = {}
+        self._prepared: dict[int, _PreparedTrack] = {}
 
-    async def get_music_info(self, query: str) -> dict:
-        """Fetch music information from URL or search query."""
-        logger.debug("Fetching music info for query: %s", query)
-        loop = asyncio.get_event_loop()
+    async def get_music_info(
+        self,
+        query: str,
+        guild_id: int | None = None,
+        priority: Priority = Priority.INTERACTIVE,
+    ) -> Track:
+        """Fetch music information from URL or search query.
 
-        def is_valid_url(url: str) -> bool:
-            try:
-                result = urlparse(url)
-                return all([result.scheme, result.netloc])
-            except ValueError:
-                return False
+        Raises:
+            ExtractionQueueFullError: If the extraction queue is saturated
+        """
+        logger.debug("Fetching music info for query: %s", query)
+        query = query.strip()
 
-        spotify_track_pattern = r"(?:spotify:track:|https://open\.spotify\.com/(?:intl-[a-z]{2}/)?track/)([a-zA-Z0-9]+)"
-        if match := re.search(spotify_track_pattern, query):
+        if match := SPOTIFY_TRACK_PATTERN.search(query):
             track_id = match.group(1)
-            track_info = self.spotify_client.get_track_info(track_id)
-            search_query = (
-                f"{track_info['name']} "
-                f"{' '.join(artist['name'] for artist in track_info['artists'])}"
-            )
-            search = await loop.run_in_executor(
-                None, self.downloader.extract_info, f"ytsearch1:{search_query}", False
+            cache_key = f"spotify:track:{track_id}"
+            with MUSIC_INFO_SECONDS.time("spotify"):
+                if cached_info := self.cache.get(cache_key):
+                    return cached_info
+                return await self.inflight.run(
+                    ("spotify", track_id),
+                    lambda: self._fetch_spotify_track(track_id, guild_id, priority),
+                    priority,
+                )
+
+        if is_valid_url(query):
+            with MUSIC_INFO_SECONDS.time("url"):
+                if cached_info := self.cache.get(query):
+                    return cached_info
+                return await self.inflight.run(
+                    ("url", query),
+                    lambda: self._fetch_url(query, guild_id, priority),
+                    priority,
+                )
+
+        with MUSIC_INFO_SECONDS.time("search"):
+            return await self._search(query, guild_id, priority)
+
+    async def _search(
+        self, query: str, guild_id: int | None, priority: Priority
+    ) -> Track:
+        """Resolve a free-text query, reusing earlier results for it."""
+        key = normalize_query(query)
+        if url := self.search_cache.get(key):
+            if cached_info := self.cache.get(url):
+                return cached_info
+            return await self.inflight.run(
+                ("url", url), lambda: self._fetch_url(url, guild_id, priority), priority
             )
-            info = search["entries"][0]
-            info["spotify_metadata"] = track_info
-            return info
 
-        if is_valid_url(query) and (cached_info := self.cache.get(query)):
+        return await self.inflight.run(
+            ("search", key),
+            lambda: self._fetch_search(query, guild_id, priority),
+            priority,
+        )
+
+    async def iter_spotify_collection(
+        self, kind: str, collection_id: str, guild_id: int | None = None
+    ) -> AsyncIterator[Track]:
+        """Yield the tracks of a Spotify album or playlist, in order.
+
+        Up to ``SPOTIFY_IMPORT_CONCURRENCY`` tracks are resolved to YouTube at
+        once, and each is yielded as soon as it and every track before it are
+        resolved, so playback can start after the first one. Tracks that
+        cannot be resolved are skipped.
+        """
+        pending: deque[asyncio.Task] = deque()
+        priority = Priority.INTERACTIVE
+        try:
+            async for track_info in self.spotify_client.iter_collection_tracks(
+                kind, collection_id
+            ):
+                pending.append(
+                    asyncio.create_task(
+                        self._resolve_spotify_track(track_info, guild_id, priority)
+                    )
+                )
+                # Only the first track has a user waiting on it
+                priority = Priority.PREFETCH
+                while pending and (
+                    pending[0].done() or len(pending) >= SPOTIFY_IMPORT_CONCURRENCY
+                ):
+                    if track := await pending.popleft():
+                        yield track
+
+            while pending:
+                if track := await pending.popleft():
+                    yield track
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def _resolve_spotify_track(
+        self, track_info: dict, guild_id: int | None, priority: Priority
+    ) -> Track | None:
+        """Resolve one imported Spotify track, waiting out back-pressure."""
+        cache_key = f"spotify:track:{track_info['id']}"
+        if cached_info := self.cache.get(cache_key):
             return cached_info
 
-        if is_valid_url(query):
-            info = await loop.run_in_executor(
-                None, self.downloader.extract_info, query, False
-            )
-        else:
-            search = await loop.run_in_executor(
-                None, self.downloader.extract_info, f"ytsearch1:{query}", False
+        for _ in range(SPOTIFY_IMPORT_MAX_ATTEMPTS):
+            try:
+                return await self.inflight.run(
+                    ("spotify", track_info["id"]),
+                    lambda: self._track_from_spotify(track_info, guild_id, priority),
+                    priority,
+                )
+            except ExtractionQueueFullError:
+                await asyncio.sleep(1)
+            except Exception as e:
+                logger.warning("Failed to resolve %s: %s", track_info["name"], e)
+                return None
+        return None
+
+    async def _fetch_spotify_track(
+        self, track_id: str, guild_id: int | None, priority: Priority
+    ) -> Track:
+        """Resolve a Spotify track to its best YouTube match."""
+        track_info = await self.spotify_client.get_track_info(track_id)
+        return await self._track_from_spotify(track_info, guild_id, priority)
+
+    async def _track_from_spotify(
+        self, track_info: dict, guild_id: int | None, priority: Priority
+    ) -> Track:
+        """Find the YouTube match for a Spotify track object."""
+        search_query = (
+            f"{track_info['name']} "
+            f"{' '.join(artist['name'] for artist in track_info['artists'])}"
+        )
+        track = replace(
+            await self._search(search_query, guild_id, priority),
+            spotify_metadata=SpotifyMetadata.from_api(track_info),
+        )
+        self.cache.add(f"spotify:track:{track_info['id']}", track)
+        return track
+
+    async def _fetch_url(
+        self, url: str, guild_id: int | None, priority: Priority
+    ) -> Track:
+        """Extract a track from a URL."""
+        info = await self._extract(url, guild_id, priority)
+        track = self._remember_stream(Track.from_info(info))
+        self.cache.add(track.webpage_url, track)
+        if url != track.webpage_url:
+            self.cache.add(url, track)
+        return track
+
+    async def _fetch_search(
+        self, query: str, guild_id: int | None, priority: Priority
+    ) -> Track:
+        """Extract the first search result for a free-text query."""
+        search = await self._extract(f"ytsearch1:{query}", guild_id, priority)
+        track = self._remember_stream(Track.from_info(search["entries"][0]))
+        self.cache.add(track.webpage_url, track)
+        self.search_cache.add(normalize_query(query), track.webpage_url)
+        return track
+
+    async def _extract(
+        self,
+        query: str,
+        guild_id: int | None,
+        priority: Priority,
+        downloader: YoutubeDLPool | None = None,
+    ) -> dict:
+        """Run a yt-dlp extraction on the extraction scheduler."""
+        downloader = downloader or self.downloader
+        return await self.extractor.run(
+            downloader.extract_info,
+            query,
+            False,
+            guild_id=guild_id,
+            priority=priority,
+        )
+
+    def _remember_stream(self, track: Track) -> Track:
+        """Record a freshly extracted stream URL in the stream URL cache."""
+        if track.stream_url:
+            self.stream_cache.add(
+                track.id, track.stream_url, track.stream_expires_at, track.audio_codec
             )
-            info = search["entries"][0]
+        return track
+
+    async def resolve_stream(
+        self,
+        track: Track,
+        guild_id: int | None = None,
+        priority: Priority = Priority.INTERACTIVE,
+    ) -> Track:
+        """Return the track with a stream URL valid for its whole playback.
+
+        Metadata is cached for a long time but signed stream URLs expire
+        after a few hours, so only the playable URL is re-resolved here, and
+        only when it is missing or close to expiring. Playlist placeholders
+        are resolved into full tracks the same way.
+        """
+        if track.is_placeholder and (cached_info := self.cache.peek(track.webpage_url)):
+            track = cached_info
+
+        valid_for = (track.duration or 0) + STREAM_URL_EXPIRY_MARGIN
+        if not track.stream_expires_within(valid_for):
+            return track
+
+        if cached := self.stream_cache.get(track.id, valid_for=valid_for):
+            return track.with_stream(*cached)
+
+        logger.debug("Re-resolving stream URL for: %s", track.title)
+        fresh = await self.inflight.run(
+            ("stream", track.id),
+            lambda: self._fetch_stream(track.webpage_url, guild_id, priority),
+            priority,
+        )
+        if track.is_placeholder:
+            return fresh
+        return track.with_stream(
+            fresh.stream_url, fresh.stream_expires_at, fresh.audio_codec
+        )
+
+    async def _fetch_stream(
+        self, url: str, guild_id: int | None, priority: Priority
+    ) -> Track:
+        """Extract a fresh stream URL for a track page."""
+        info = await self._extract(url, guild_id, priority)
+        track = self._remember_stream(Track.from_info(info))
+        self.cache.add(track.webpage_url, track)
+        return track
+
+    async def get_playlist_tracks(
+        self, url: str, guild_id: int | None = None
+    ) -> list[Track]:
+        """List a YouTube playlist as lightweight placeholder tracks.
+
+        Uses flat extraction, so no per-video format resolution happens up
+        front; each placeholder is resolved when it nears the head of the
+        queue. Private and deleted videos are left out, and a link opened at
+        a video of the playlist starts from that video.
 
-        self.cache.add(info["webpage_url"], info)
-        return info
+        Raises:
+            ExtractionQueueFullError: If the extraction queue is saturated
+        """
+        info = await self.inflight.run(
+            ("playlist", url),
+            lambda: self._extract(
+                url,
+                guild_id,
+                Priority.INTERACTIVE,
+                downloader=self.playlist_downloader,
+            ),
+        )
+        tracks = [
+            Track.from_flat_entry(entry)
+            for entry in info.get("entries") or []
+            if entry
+            and entry.get("id")
+            and entry.get("title") not in UNAVAILABLE_PLAYLIST_ENTRIES
+        ]
+        return tracks[_playlist_start(url, tracks) :] if tracks else tracks
 
-    async def play_song(self, guild_id_or_ctx: int | Context, song_info: dict) -> bool:
+    async def play_song(self, guild_id_or_ctx: int | Context, song_info: Track) -> bool:
         """Play a song in the voice channel.
 
         Args:
             guild_id_or_ctx: Either guild ID or command Context
-            song_info: Song information dictionary
+            song_info: Track to play
 
         Returns:
             True if playback started
@@ -104,17 +473,31 @@ class PlayerManager:
 
         logger.info(
             "Playing song: %s in guild: %s",
-            song_info.get("title", "Unknown"),
+            song_info.title,
             (
                 self.bot.get_guild(guild_id).name
                 if self.bot.get_guild(guild_id)
                 else "Unknown"
             ),
         )
-        url = song_info["url"]
-        self.playlist_manager.current_song = song_info
-
-        audio_source = FFmpegOpusAudio(url, **ffmpeg_opts)
+        playlist = self.playlists.get(guild_id)
+        while True:
+            try:
+                song_info, audio_source = await self._open_track(guild_id, song_info)
+                break
+            except Exception as e:
+                logger.warning("Could not play %s: %s", song_info.title, e)
+                if text_channel:
+                    await text_channel.send(
+                        f"❌ Could not play **{song_info.title}**, skipping it."
+                    )
+                EVENTS.publish("song_end", guild_id)
+                if (song_info := playlist.skip_unplayable(song_info)) is None:
+                    await self.voice_manager.start_inactivity_timer(guild_id)
+                    return False
+        playlist.current_song = song_info
+        self._cache_if_replayed(song_info, will_repeat=playlist.loop_song)
+        self._measure_loudness(song_info)
         voice_client = self.voice_manager.voice_clients[guild_id]
 
         # Set up the after function to handle when a song finishes
@@ -130,34 +513,323 @@ class PlayerManager:
 
         # Start playing with the callback
         voice_client.play(audio_source, after=after_playing)
+        self.refresh_lookahead(guild_id)
+        EVENTS.publish("song_start", guild_id)
 
         embed = self.embed_builder.now_playing(song_info)
 
         # Send to appropriate text channel if available
         if text_channel:
-            await text_channel.send(embed=embed)
+            with DISCORD_SEND_SECONDS.time():
+                await text_channel.send(embed=embed)
 
         return True
 
+    async def seek(self, guild_id: int, position: float) -> float | None:
+        """Restart the current track at ``position`` seconds.
+
+        The source is swapped under the running player, so the song is not
+        reported as finished and the queue does not advance. A paused
+        player stays paused.
+
+        Args:
+            guild_id: Guild whose player to seek
+            position: Target position in seconds, clamped to the track
+
+        Returns:
+            The position playback restarted at, or ``None`` if nothing is
+            playing
+        """
+        voice_client = self.voice_manager.voice_clients.get(guild_id)
+        playlist = self.playlists.peek(guild_id)
+        if (
+            voice_client is None
+            or playlist is None
+            or playlist.current_song is None
+            or not (voice_client.is_playing() or voice_client.is_paused())
+        ):
+            return None
+
+        current = track = playlist.current_song
+        position = max(0.0, position)
+        if track.duration:
+            position = min(position, max(0.0, track.duration - 1))
+
+        if track.id not in self.opus_cache:
+            track = await self.resolve_stream(track, guild_id)
+        source = await self._create_source(guild_id, track, start=position)
+        if playlist.current_song is not current or not (
+            voice_client.is_playing() or voice_client.is_paused()
+        ):
+            # The track changed or stopped while the source was being opened
+            source.cleanup()
+            return None
+
+        paused = voice_client.is_paused()
+        old_source = voice_client.source
+        voice_client.source = source
+        if paused:
+            voice_client.pause()
+        playlist.current_song = track
+
+        # The player thread may still be reading from the old source, so
+        # close it once the swap has surely been picked up
+        if old_source is not None:
+            asyncio.get_running_loop().call_later(
+                SEEK_CLEANUP_DELAY, old_source.cleanup
+            )
+
+        # The warm-up timing of the next track depends on the position
+        self.cancel_lookahead(guild_id)
+        self.refresh_lookahead(guild_id)
+        EVENTS.publish("seek", guild_id)
+        return position
+
+    async def _open_track(
+        self, guild_id: int, track: Track
+    ) -> tuple[Track, GovernedOpusAudio]:
+        """Resolve a track and open its audio source, using look-ahead work.
+
+        Raises:
+            ExtractionQueueFullError: If the extraction queue is saturated
+            yt_dlp.utils.DownloadError: If the video cannot be resolved
+        """
+        if prepared := self._take_prepared(guild_id, track):
+            return prepared
+        if track.id not in self.opus_cache:
+            track = await self.resolve_stream(track, guild_id)
+        return track, await self._create_source(guild_id, track)
+
+    def get_position(self, guild_id: int) -> float | None:
+        """Get the playback position of a guild's current track in seconds."""
+        voice_client = self.voice_manager.voice_clients.get(guild_id)
+        source = getattr(voice_client, "source", None)
+        if isinstance(source, GovernedOpusAudio):
+            return source.position
+        return None
+
+    async def _create_source(
+        self, guild_id: int, track: Track, wait: bool = True, start: float = 0.0
+    ) -> GovernedOpusAudio | None:
+        """Open an audio source, preferring the on-disk Opus cache.
+
+        The encode bitrate is picked per track from the voice channel's
+        bitrate and the current encoder load.
+
+        Args:
+            guild_id: Guild the track will play in
+            track: Resolved track to open
+            wait: Whether to wait for an ffmpeg slot when the CPU is
+                saturated; otherwise ``None`` is returned right away
+            start: Position in seconds to start playback from
+        """
+        if path := self.opus_cache.get(track.id):
+            logger.debug("Playing %s from the Opus cache", track.title)
+
+        gain = self._loudness_gain(track, remux=bool(path) or track.is_opus)
+        encode = bool(gain) or not (path or track.is_opus)
+        if wait:
+            slot = await self.governor.acquire(encode)
+        elif (slot := self.governor.try_acquire(encode)) is None:
+            return None
+
+        voice_client = self.voice_manager.voice_clients.get(guild_id)
+        channel = getattr(voice_client, "channel", None)
+        bitrate = self.governor.pick_bitrate(slot, getattr(channel, "bitrate", None))
+        return GovernedOpusAudio(
+            path or track.stream_url,
+            slot=slot,
+            start=start,
+            **ffmpeg_seek_opts(
+                ffmpeg_options_for(
+                    track,
+                    bitrate=bitrate,
+                    threads=slot.threads,
+                    gain=gain,
+                    local=bool(path),
+                ),
+                start,
+            ),
+        )
+
+    def _loudness_gain(self, track: Track, remux: bool) -> float:
+        """Get the normalization gain in dB for a track, 0 if none applies.
+
+        Sources that could otherwise be remuxed are only re-encoded for a
+        sizeable gain, and not at all while the encoders are busy.
+        """
+        loudness = track.loudness
+        if loudness is None and (cached := self.cache.peek(track.webpage_url)):
+            loudness = cached.loudness
+        if loudness is None:
+            return 0.0
+
+        gain = loudness_gain(loudness)
+        if remux and (
+            abs(gain) < LOUDNESS_MIN_REENCODE_GAIN
+            or self.governor.load >= FFMPEG_BITRATE_LOAD_THRESHOLD
+        ):
+            return 0.0
+        return gain
+
+    def _measure_loudness(self, track: Track) -> None:
+        """Measure a track's loudness in the background if it is unknown.
+
+        The result is stored on the cached track, so later plays of it can
+        be normalized with a fixed gain.
+        """
+        if track.loudness is not None or track.id in self.loudness_analyzer:
+            return
+        if (cached := self.cache.peek(track.webpage_url)) and (
+            cached.loudness is not None
+        ):
+            return
+        if self.governor.load >= FFMPEG_BITRATE_LOAD_THRESHOLD:
+            return  # Not worth competing with playback for the CPU
+
+        def remember(loudness: float) -> None:
+            cached = self.cache.peek(track.webpage_url) or track
+            self.cache.add(track.webpage_url, replace(cached, loudness=loudness))
+            logger.debug("Measured %s at %.1f LUFS", track.title, loudness)
+
+        if path := self.opus_cache.get(track.id):
+            self.loudness_analyzer.analyse(track.id, path, remember, local=True)
+        elif track.stream_url:
+            self.loudness_analyzer.analyse(track.id, track.stream_url, remember)
+
+    def _cache_if_replayed(self, track: Track, will_repeat: bool = False) -> None:
+        """Store a track on disk once it is played a second time.
+
+        Tracks are also stored on their first play when they are about to
+        repeat, e.g. with song loop enabled.
+        """
+        if track.is_placeholder or track.id in self.opus_cache:
+            return
+
+        replayed = track.id in self._recent_plays
+        self._recent_plays[track.id] = None
+        self._recent_plays.move_to_end(track.id)
+        if len(self._recent_plays) > OPUS_CACHE_REPLAY_WINDOW:
+            self._recent_plays.popitem(last=False)
+
+        if replayed or will_repeat:
+            self.opus_cache.store(track.id, track.stream_url, passthrough=track.is_opus)
+
     async def _handle_song_finished(self, guild_id: int) -> None:
         """Handle song completion and start the next song if available."""
         # Get next song from playlist manager
-        next_song = self.playlist_manager.song_finished()
+        if (playlist := self.playlists.peek(guild_id)) is None:
+            return  # The bot left the voice channel
+        next_song = playlist.song_finished()
+        EVENTS.publish("song_end", guild_id)
 
         if next_song:
-            logger.info(f"Song finished, playing next: {next_song.get('title')}")
+            logger.info(f"Song finished, playing next: {next_song.title}")
             await self.play_song(guild_id, next_song)
         else:
             logger.info("No more songs in queue")
             # Optionally disconnect after some idle time
             await self.voice_manager.start_inactivity_timer(guild_id)
 
+    def forget_guild(self, guild_id: int) -> None:
+        """Release a guild's player state once the bot leaves its channel."""
+        self.cancel_lookahead(guild_id)
+        self.playlists.discard(guild_id)
+
+    def set_lookahead_depth(self, guild_id: int, depth: int) -> None:
+        """Set how many upcoming tracks to prepare for a guild."""
+        self.lookahead_depths[guild_id] = depth
+        self.refresh_lookahead(guild_id)
+
+    def get_lookahead_depth(self, guild_id: int) -> int:
+        """Get how many upcoming tracks are prepared for a guild."""
+        return self.lookahead_depths.get(guild_id, DEFAULT_LOOKAHEAD_DEPTH)
+
+    def refresh_lookahead(self, guild_id: int) -> None:
+        """(Re)start preparing the upcoming tracks after a queue change.
+
+        Work already under way for the right next track is kept; anything
+        prepared for a track that is no longer next is cancelled.
+        """
+        depth = self.get_lookahead_depth(guild_id)
+        playlist = self.playlists.peek(guild_id)
+        upcoming = playlist.peek_next_songs(depth) if playlist and depth else []
+        prepared = self._prepared.get(guild_id)
+        if prepared and upcoming and prepared.track is upcoming[0]:
+            return
+
+        self.cancel_lookahead(guild_id)
+        if upcoming:
+            task = asyncio.create_task(self._prepare_upcoming(guild_id, upcoming))
+            self._prepared[guild_id] = _PreparedTrack(upcoming[0], task)
+
+    def cancel_lookahead(self, guild_id: int) -> None:
+        """Cancel look-ahead work for a guild, e.g. on stop."""
+        if prepared := self._prepared.pop(guild_id, None):
+            prepared.cancel()
+
+    async def _prepare_upcoming(self, guild_id: int, upcoming: list[Track]) -> None:
+        """Resolve stream URLs for upcoming tracks and warm the next source."""
+        prepared = self._prepared[guild_id]
+        try:
+            track = upcoming[0]
+            if track.id not in self.opus_cache:
+                track = await self.resolve_stream(track, guild_id, Priority.PREFETCH)
+            prepared.resolved = track
+            for track in upcoming[1:]:
+                await self.resolve_stream(track, guild_id, Priority.PREFETCH)
+
+            # Spawn ffmpeg shortly before the current track ends so the
+            # upstream connection is open by the time it is needed. The
+            # position stands still while paused, so check it again after
+            # each wait instead of trusting the wall clock, but not so often
+            # that a pause right outside the window turns into a busy loop
+            current = self.playlists.get(guild_id).current_song
+            while current and current.duration:
+                position = self.get_position(guild_id)
+                if position is None:
+                    break
+                delay = current.duration - position - LOOKAHEAD_WARM_SECONDS
+                if delay <= 0:
+                    break
+                await asyncio.sleep(max(delay, LOOKAHEAD_POLL_SECONDS))
+
+            if prepared.resolved.id not in self.opus_cache:
+                # Also covers eviction from the Opus cache while waiting
+                prepared.resolved = await self.resolve_stream(
+                    prepared.resolved, guild_id, Priority.PREFETCH
+                )
+            # Never queue behind other guilds just to warm up; play_song
+            # will wait for a slot if there is still none by then
+            prepared.source = await self._create_source(
+                guild_id, prepared.resolved, wait=False
+            )
+            logger.debug("Prepared next track: %s", prepared.resolved.title)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning("Failed to prepare next track: %s", e)
+
+    def _take_prepared(
+        self, guild_id: int, track: Track
+    ) -> tuple[Track, GovernedOpusAudio] | None:
+        """Hand over the prepared source if it was prepared for ``track``."""
+        prepared = self._prepared.pop(guild_id, None)
+        if prepared is None:
+            return None
+        if prepared.track is not track or prepared.source is None:
+            prepared.cancel()
+            return None
+
+        source, prepared.source = prepared.source, None
+        return prepared.resolved, source
+
     async def play_next(self, context: Context, error: Exception | None = None) -> None:
         """Handle playing the next song in queue."""
         if error:
             logger.error("Error during playback: %s", str(error), exc_info=error)
 
-        if next_song := self.playlist_manager.get_next_song():
+        if next_song := self.playlists.get(context.guild.id).get_next_song():
             await self.play_song(context.guild.id, next_song)
         else:
             # Start the inactivity timer instead of disconnecting immediately
@@ -1,12 +1,14 @@
 """Playlist manager for the music bot."""
 
 import logging
-from collections.abc import Callable
+from collections.abc import Callable, Iterator
 
 from discord import Color, Embed
 from discord.ext.commands import Context
 
 from ...utils.constants import MAX_PLAYLIST_DISPLAY
+from ...utils.track import Track
+from ...utils.track_queue import TrackQueue
 
 logger = logging.getLogger(__name__)
 
@@ -16,19 +18,19 @@ class PlaylistManager:
 
     def __init__(self) -> None:
         """Initialize the playlist manager."""
-        self.playlist: list[dict] = []
-        self.backup: list[dict] = []
-        self.current_song: dict | None = None
+        self.playlist = TrackQueue()
+        self.backup = TrackQueue()
+        self.current_song: Track | None = None
         self.loop_queue = False
         self.loop_song = False
         self._song_ended_callbacks: list[Callable] = []
 
-    def add_to_queue(self, song_info: dict) -> None:
+    def add_to_queue(self, song_info: Track) -> None:
         """Add a song to the playlist."""
         self.playlist.append(song_info)
         # Log addition to verify queue state
         logger.debug(
-            f"Added song to queue: {song_info.get('title')}. Queue size: {len(self.playlist)}"
+            f"Added song to queue: {song_info.title}. Queue size: {len(self.playlist)}"
         )
 
     def clear_queue(self) -> None:
@@ -42,7 +44,7 @@ class PlaylistManager:
         """Register a callback for when a song ends to trigger next song."""
         self._song_ended_callbacks.append(callback)
 
-    def song_finished(self) -> dict | None:
+    def song_finished(self) -> Track | None:
         """Called when a song has finished playing naturally."""
         # If we're looping the current song, just return it again
         if self.loop_song and self.current_song:
@@ -52,44 +54,44 @@ class PlaylistManager:
         # Otherwise get the next song from the queue
         next_song = self.get_next_song()
         if next_song:
-            logger.debug(f"Song finished, next song: {next_song.get('title')}")
+            logger.debug(f"Song finished, next song: {next_song.title}")
         else:
             logger.debug("Song finished, no next song in queue")
 
         return next_song
 
-    def get_next_song(self) -> dict | None:
+    def get_next_song(self) -> Track | None:
         """Get the next song from the playlist."""
         # Handle empty playlist
         if not self.playlist:
             if self.loop_queue and self.backup:
                 logger.debug("Queue empty but loop enabled, restoring from backup")
-                self.playlist = self.backup.copy()
+                self.playlist.extend(self.backup)
             elif self.loop_queue and self.current_song:
                 # If queue is empty but loop is enabled and we have a current song
                 logger.debug("Queue empty with loop enabled, adding current song back")
-                self.playlist = [self.current_song]
+                self.playlist.append(self.current_song)
             else:
                 logger.debug("Queue empty, no song to play")
                 self.current_song = None
                 return None
 
         # Get next song
-        next_song = self.playlist.pop(0)
+        next_song = self.playlist.popleft()
         logger.debug(
-            f"Getting next song: {next_song.get('title')}. Remaining queue: {len(self.playlist)}"
+            f"Getting next song: {next_song.title}. Remaining queue: {len(self.playlist)}"
         )
 
         # Add song to backup if queue loop is enabled
         if self.loop_queue and next_song not in self.backup:
             self.backup.append(next_song)
-            logger.debug(f"Added to backup queue: {next_song.get('title')}")
+            logger.debug(f"Added to backup queue: {next_song.title}")
 
         # Update current song reference
         self.current_song = next_song
         return next_song
 
-    def skip_current(self) -> dict | None:
+    def skip_current(self) -> Track | None:
         """Skip the current song and return next song."""
         logger.debug("Skip requested")
         # If loop song is enabled, disable it and continue with next song
@@ -103,15 +105,27 @@ class PlaylistManager:
 
         # If queue is empty but loop is enabled
         if self.loop_queue:
-            self.playlist = self.backup.copy()
-            if self.current_song in self.playlist:
-                self.playlist.remove(self.current_song)
+            self.playlist.extend(self.backup)
+            if self.current_song:
+                self.playlist.discard(self.current_song)
             return self.get_next_song()
 
         # Clear current song reference if we're not getting a new song
         self.current_song = None
         return None
 
+    def skip_unplayable(self, song: Track) -> Track | None:
+        """Skip a song that failed to load and return the next song.
+
+        The song is also dropped from the loop backup and song loop is
+        turned off, so a broken video cannot stall a looping queue.
+        """
+        self.backup.discard(song)
+        self.loop_song = False
+        self.current_song = None
+        logger.debug(f"Skipping unplayable song: {song.title}")
+        return self.get_next_song()
+
     def toggle_loop_queue(self) -> bool:
         """Toggle queue loop and update backup."""
         self.loop_queue = not self.loop_queue
@@ -120,7 +134,7 @@ class PlaylistManager:
 
         if self.loop_queue:
             # Create backup including current song
-            self.backup = self.playlist.copy()
+            self.backup = TrackQueue(self.playlist)
             if self.current_song and self.current_song not in self.backup:
                 self.backup.append(self.current_song)
                 logger.debug(f"Created backup queue with {len(self.backup)} songs")
@@ -137,9 +151,58 @@ class PlaylistManager:
         logger.debug(f"Song loop {'enabled' if self.loop_song else 'disabled'}")
         return self.loop_song
 
-    def get_queue_songs(self) -> list[dict]:
+    def peek_next_songs(self, count: int) -> list[Track]:
+        """Get the songs that will play next, without modifying the queue."""
+        if self.loop_song and self.current_song:
+            return [self.current_song]
+
+        upcoming = self.playlist[:count]
+        if len(upcoming) < count and self.loop_queue:
+            upcoming += self.backup[: count - len(upcoming)]
+        return upcoming
+
+    def get_queue_songs(self) -> list[Track]:
         """Get all songs in queue (without modifying the queue)."""
-        return self.playlist.copy()
+        return list(self.playlist)
+
+    def remove_song(self, position: int) -> Track:
+        """Remove the song at a 1-based queue position.
+
+        The song is also dropped from the loop backup, so it does not come
+        back when the queue loops.
+
+        Raises:
+            IndexError: If the position is outside the queue
+        """
+        if position < 1:
+            raise IndexError("queue position out of range")
+        song = self.playlist.remove(position - 1)
+        self.backup.discard(song)
+        logger.debug(f"Removed song from queue: {song.title}")
+        return song
+
+    def move_song(self, source: int, destination: int) -> Track:
+        """Move a song between two 1-based queue positions.
+
+        Raises:
+            IndexError: If either position is outside the queue
+        """
+        if source < 1 or destination < 1:
+            raise IndexError("queue position out of range")
+        song = self.playlist.move(source - 1, destination - 1)
+        logger.debug(f"Moved song in queue: {song.title} to #{destination}")
+        return song
+
+    def shuffle(self) -> None:
+        """Shuffle the upcoming songs in place."""
+        self.playlist.shuffle()
+        logger.debug(f"Shuffled queue of {len(self.playlist)} songs")
+
+    def dedupe(self) -> int:
+        """Drop repeated songs from the queue, keeping first occurrences."""
+        removed = self.playlist.dedupe()
+        logger.debug(f"Removed {removed} duplicate songs from queue")
+        return removed
 
     async def show_queue(self, context: Context) -> None:
         """Display the current playlist."""
@@ -150,8 +213,8 @@ class PlaylistManager:
         embed = Embed(title="📝 Current Queue", color=Color.blue())
         for i, song in enumerate(self.playlist[:MAX_PLAYLIST_DISPLAY], 1):
             embed.add_field(
-                name=f"{i}. {song['title']}",
-                value=f"Duration: {song.get('duration', '??:??')}",
+                name=f"{i}. {song.title}",
+                value=f"Duration: {song.duration or '??:??'}",
                 inline=False,
             )
 
@@ -169,3 +232,41 @@ class PlaylistManager:
             f"{' '.join(artist['name'] for artist in track_info['artists'])}"
         )
         return search_query
+
+
+class PlaylistRegistry:
+    """Per-guild registry of playlist managers.
+
+    Each guild gets its own queue, current song and loop flags, created on
+    first use and discarded when the bot leaves the guild's voice channel.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the registry."""
+        self._playlists: dict[int, PlaylistManager] = {}
+
+    def __len__(self) -> int:
+        return len(self._playlists)
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(self._playlists)
+
+    def get(self, guild_id: int) -> PlaylistManager:
+        """Get the playlist manager for a guild, creating it if needed."""
+        if (playlist := self._playlists.get(guild_id)) is None:
+            playlist = self._playlists[guild_id] = PlaylistManager()
+            logger.debug("Created player state for guild %s", guild_id)
+        return playlist
+
+    def peek(self, guild_id: int) -> PlaylistManager | None:
+        """Get the playlist manager for a guild without creating one."""
+        return self._playlists.get(guild_id)
+
+    def discard(self, guild_id: int) -> None:
+        """Drop a guild's player state."""
+        if self._playlists.pop(guild_id, None) is not None:
+            logger.debug("Discarded player state for guild %s", guild_id)
+
+    def total_queued(self) -> int:
+        """Count the songs queued across every guild."""
+        return sum(len(playlist.playlist) for playlist in self._playlists.values())
@@ -2,12 +2,36 @@
 
 import asyncio
 import logging
+from collections.abc import Awaitable, Callable
+from functools import partial
+from typing import TypeVar
 
 from discord import Member, VoiceClient, VoiceState
 from discord.ext.commands import CommandError, Context
 
+from ...utils.constants import ALONE_GRACE_PERIOD
+from ...utils.events import EVENTS
+from ...utils.scheduler import DeadlineScheduler
+
 logger = logging.getLogger(__name__)
 
+T = TypeVar("T")
+
+
+def is_listening(member: Member, state: VoiceState) -> bool:
+    """Check whether a member in a voice state can hear the bot."""
+    return (
+        not member.bot
+        and state.channel is not None
+        and not (state.deaf or state.self_deaf)
+    )
+
+
+def _abandon(task: asyncio.Future) -> None:
+    """Cancel a task whose outcome no longer matters, even if it failed."""
+    task.cancel()
+    task.add_done_callback(lambda t: t.cancelled() or t.exception())
+
 
 class VoiceManager:
     """Manages voice connections for the music bot."""
@@ -16,87 +40,221 @@ class VoiceManager:
         """Initialize the voice manager."""
         self.voice_clients: dict[int, VoiceClient] = {}
         self.text_channels: dict[int, int] = {}  # Maps guild_id -> text_channel_id
-        self.inactivity_timers: dict[int, asyncio.Task] = {}
+        self.inactivity_timers = DeadlineScheduler(self._disconnect_if_idle)
+        self.alone_grace_period = ALONE_GRACE_PERIOD
+        self.alone_timers = DeadlineScheduler(self._disconnect_if_alone)
+        # Human, undeafened members in the bot's channel, per guild
+        self.listeners: dict[int, int] = {}
+        self._auto_paused: set[int] = set()
         self.INACTIVITY_TIMEOUT = 120  # 2 minutes
+        self._disconnect_callbacks: list[Callable[[int], None]] = []
+        self._connecting: dict[int, asyncio.Task] = {}
+
+    def register_disconnect_callback(self, callback: Callable[[int], None]) -> None:
+        """Register a callback run with the guild ID after leaving its channel."""
+        self._disconnect_callbacks.append(callback)
+
+    def _notify_disconnected(self, guild_id: int) -> None:
+        self.listeners.pop(guild_id, None)
+        self.alone_timers.cancel(guild_id)
+        self._auto_paused.discard(guild_id)
+        for callback in self._disconnect_callbacks:
+            callback(guild_id)
+        EVENTS.publish("disconnect", guild_id)
 
     async def ensure_voice(self, context: Context) -> None:
         """Ensure proper voice channel connection."""
+        self.check_voice(context)
+        await self.connect(context)
+
+    def check_voice(self, context: Context) -> None:
+        """Check that the author can use the bot in voice, without connecting.
+
+        Raises:
+            CommandError: If the author is not in a voice channel, or not in
+                the bot's one
+        """
         if context.voice_client is None:
-            if context.author.voice:
-                self.voice_clients[context.guild.id] = (
-                    await context.author.voice.channel.connect()
-                )
-                # Store the text channel where the command was issued
-                self.text_channels[context.guild.id] = context.channel.id
-            else:
+            if not context.author.voice:
                 raise CommandError("You must be in a voice channel!")
-        elif context.voice_client.channel != context.author.voice.channel:
+        elif (
+            context.author.voice is None
+            or context.voice_client.channel != context.author.voice.channel
+        ):
             raise CommandError("You must be in the same voice channel as the bot!")
 
-    async def start_inactivity_timer(self, guild_id: int) -> None:
-        """Start the inactivity timer for a guild."""
-        # Cancel any existing timer
-        if guild_id in self.inactivity_timers:
-            self.inactivity_timers[guild_id].cancel()
+    async def connect(self, context: Context) -> bool:
+        """Connect to the author's voice channel if not connected yet.
 
-        # Start new timer
-        self.inactivity_timers[guild_id] = asyncio.create_task(
-            self._disconnect_after_timeout(guild_id)
-        )
+        Concurrent calls for the same guild share one voice handshake.
 
-    async def _disconnect_after_timeout(self, guild_id: int) -> None:
-        """Disconnect after timeout if no activity."""
+        Returns:
+            True if this call started the connection
+        """
+        guild_id = context.guild.id
+        if context.voice_client is not None:
+            return False
+
+        started = guild_id not in self._connecting
+        if started:
+            task = asyncio.create_task(context.author.voice.channel.connect())
+            self._connecting[guild_id] = task
+            task.add_done_callback(lambda _: self._connecting.pop(guild_id, None))
+        # Shielded so a cancelled command never leaves a half-open handshake
+        voice_client = await asyncio.shield(self._connecting[guild_id])
+        self.voice_clients[guild_id] = voice_client
+        # Store the text channel where the command was issued
+        self.text_channels[guild_id] = context.channel.id
+        if started:
+            EVENTS.publish("connect", guild_id)
+        return started
+
+    async def connect_while(self, context: Context, work: Awaitable[T]) -> T:
+        """Connect to the author's voice channel while ``work`` runs.
+
+        The voice handshake and ``work``, typically a track lookup, overlap
+        instead of running one after the other. If the connection fails,
+        ``work`` is cancelled. If ``work`` fails or the caller is cancelled,
+        the connection is still completed, and then left to the inactivity
+        timer since nothing will play.
+
+        Raises:
+            Exception: Whatever the connection or ``work`` raised
+        """
+        connecting = asyncio.ensure_future(self.connect(context))
+        work_task = asyncio.ensure_future(work)
         try:
-            await asyncio.sleep(self.INACTIVITY_TIMEOUT)
-            # Only disconnect if we're not playing anything
-            if (
-                voice_client := self.voice_clients.get(guild_id)
-            ) and not voice_client.is_playing():
-                await self.disconnect(guild_id)
+            await asyncio.shield(connecting)
         except asyncio.CancelledError:
-            pass  # Timer was cancelled, do nothing
-        finally:
-            # Clean up timer
-            self.inactivity_timers.pop(guild_id, None)
+            _abandon(work_task)
+            connecting.add_done_callback(partial(self._idle_if_connected, context))
+            raise
+        except Exception:
+            _abandon(work_task)
+            raise
+
+        try:
+            return await work_task
+        except BaseException:
+            self._idle_if_connected(context, connecting)
+            raise
+
+    def _idle_if_connected(self, context: Context, connecting: asyncio.Task) -> None:
+        """Start the inactivity timer for a connection nothing will use."""
+        if connecting.cancelled() or connecting.exception() or not connecting.result():
+            return
+        guild_id = context.guild.id
+        if (voice_client := self.voice_clients.get(guild_id)) and not (
+            voice_client.is_playing() or voice_client.is_paused()
+        ):
+            self.inactivity_timers.schedule(guild_id, self.INACTIVITY_TIMEOUT)
+
+    async def start_inactivity_timer(self, guild_id: int) -> None:
+        """Start the inactivity timer for a guild, replacing any running one."""
+        self.inactivity_timers.schedule(guild_id, self.INACTIVITY_TIMEOUT)
+
+    async def _disconnect_if_idle(self, guild_id: int) -> None:
+        """Disconnect after timeout if no activity."""
+        # Only disconnect if we're not playing anything
+        if (
+            voice_client := self.voice_clients.get(guild_id)
+        ) and not voice_client.is_playing():
+            await self.disconnect(guild_id)
 
     async def handle_voice_state_update(
         self, member: Member, before: VoiceState, after: VoiceState
     ) -> None:
-        """Handle voice state updates to detect when to disconnect."""
-        if member.bot:
-            return  # Ignore bot voice updates
+        """Handle voice state updates to pause and leave empty channels.
 
+        The listener count of the bot's channel is updated from the change
+        alone, so busy servers never have the channel members recounted.
+        """
         guild_id = member.guild.id
-        if guild_id not in self.voice_clients:
+        if (voice_client := self.voice_clients.get(guild_id)) is None:
             return
 
+        if member.bot:
+            if member.id == member.guild.me.id:
+                if after.channel is None:
+                    # The bot itself was disconnected, e.g. kicked from the channel
+                    del self.voice_clients[guild_id]
+                    self._notify_disconnected(guild_id)
+                    return
+                if after.channel != before.channel:
+                    # Moved to another channel, count its listeners afresh
+                    self.listeners.pop(guild_id, None)
+                    self._update_alone_state(guild_id)
+            return  # Ignore other bot voice updates
+
+        channel = voice_client.channel
+        if channel is None or guild_id not in self.listeners:
+            self._update_alone_state(guild_id)
+            return
+
+        was_listening = is_listening(member, before) and before.channel == channel
+        now_listening = is_listening(member, after) and after.channel == channel
+        if was_listening != now_listening:
+            self.listeners[guild_id] += 1 if now_listening else -1
+            self._update_alone_state(guild_id)
+
+    def count_listeners(self, guild_id: int) -> int:
+        """Get the number of members who can hear the bot in a guild.
+
+        Counted from the channel members once, then kept up to date from
+        voice state updates.
+        """
+        if guild_id not in self.listeners:
+            voice_client = self.voice_clients.get(guild_id)
+            channel = getattr(voice_client, "channel", None)
+            self.listeners[guild_id] = sum(
+                1
+                for member in getattr(channel, "members", ())
+                if member.voice is not None and is_listening(member, member.voice)
+            )
+        return self.listeners[guild_id]
+
+    def _update_alone_state(self, guild_id: int) -> None:
+        """Pause when the last listener leaves, resume when one comes back."""
         voice_client = self.voice_clients[guild_id]
+        if self.count_listeners(guild_id) == 0:
+            if guild_id in self.alone_timers:
+                return
+            if voice_client.is_playing():
+                voice_client.pause()
+                self._auto_paused.add(guild_id)
+                EVENTS.publish("pause", guild_id)
+            self.alone_timers.schedule(guild_id, self.alone_grace_period)
+        else:
+            self.alone_timers.cancel(guild_id)
+            if guild_id in self._auto_paused:
+                self._auto_paused.discard(guild_id)
+                if voice_client.is_paused():
+                    voice_client.resume()
+                    EVENTS.publish("resume", guild_id)
 
-        # Check if the bot is alone in the channel
-        if voice_client.channel and len(voice_client.channel.members) == 1:
-            # Only the bot is left
+    async def _disconnect_if_alone(self, guild_id: int) -> None:
+        """Leave a channel that stayed without listeners for the grace period."""
+        if guild_id in self.voice_clients and self.count_listeners(guild_id) == 0:
             await self.disconnect(guild_id)
 
     async def disconnect(self, guild_id: int) -> None:
         """Disconnect from a voice channel."""
         # Cancel any running timer
-        if guild_id in self.inactivity_timers:
-            self.inactivity_timers[guild_id].cancel()
-            self.inactivity_timers.pop(guild_id)
+        self.inactivity_timers.cancel(guild_id)
 
-        if guild_id in self.voice_clients:
-            await self.voice_clients[guild_id].disconnect()
-            del self.voice_clients[guild_id]
+        if (voice_client := self.voice_clients.pop(guild_id, None)) is not None:
+            await voice_client.disconnect()
+            self._notify_disconnected(guild_id)
 
     async def cleanup(self) -> None:
         """Disconnect from all voice channels and clean up timers."""
         # Cancel all timers
-        for timer in self.inactivity_timers.values():
-            timer.cancel()
-        self.inactivity_timers.clear()
+        await self.inactivity_timers.close()
+        await self.alone_timers.close()
 
         # Disconnect from all voice channels
         for guild_id in list(self.voice_clients.keys()):
             if self.voice_clients[guild_id].is_connected():
                 await self.voice_clients[guild_id].disconnect()
             del self.voice_clients[guild_id]
+            self._notify_disconnected(guild_id)
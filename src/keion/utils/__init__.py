@@ -1,15 +1,29 @@
 """Utility modules for Keion Discord bot."""
 
-from .audio import ffmpeg_opts, youtube_dl_options
+from .audio import (
+    ffmpeg_cached_opts,
+    ffmpeg_options_for,
+    ffmpeg_opts,
+    ffmpeg_seek_opts,
+    youtube_dl_options,
+    youtube_dl_playlist_options,
+)
 from .cache import SongCache
 from .embed import EmbedBuilder
 from .spotify_client import SpotifyAPIError, SpotifyClient
+from .track import SpotifyMetadata, Track
 
 __all__ = [
     "EmbedBuilder",
     "SongCache",
     "SpotifyAPIError",
     "SpotifyClient",
+    "SpotifyMetadata",
+    "Track",
+    "ffmpeg_cached_opts",
+    "ffmpeg_options_for",
     "ffmpeg_opts",
+    "ffmpeg_seek_opts",
     "youtube_dl_options",
+    "youtube_dl_playlist_options",
 ]
@@ -1,6 +1,16 @@
 """Audio processing utilities for the music bot."""
 
-from .constants import FFMPEG_BEFORE_OPTIONS, FFMPEG_OPTIONS
+from typing import Any
+
+from .constants import (
+    FFMPEG_BEFORE_OPTIONS,
+    FFMPEG_BITRATE,
+    FFMPEG_OPTIONS,
+    FFMPEG_PASSTHROUGH_OPTIONS,
+    FFMPEG_THREADS,
+    PLAYLIST_MAX_ENTRIES,
+)
+from .track import Track
 
 youtube_dl_options: dict[str, str] = {
     "format": "bestaudio[abr<=96]/bestaudio/best",
@@ -20,7 +30,90 @@ youtube_dl_options: dict[str, str] = {
     "youtube_include_hls_manifest": False,
 }
 
-ffmpeg_opts: dict[str, str] = {
+# Lists playlist entries without resolving any of their formats
+youtube_dl_playlist_options: dict[str, str] = {
+    **youtube_dl_options,
+    "noplaylist": False,
+    "extract_flat": "in_playlist",
+    "playlistend": PLAYLIST_MAX_ENTRIES,
+}
+
+
+def ffmpeg_encode_opts(
+    bitrate: int = FFMPEG_BITRATE, threads: int = FFMPEG_THREADS, gain: float = 0.0
+) -> dict[str, Any]:
+    """Get the FFmpeg options for re-encoding a stream with libopus.
+
+    Args:
+        bitrate: Target Opus bitrate in kbps
+        threads: Threads the ffmpeg process may use
+        gain: Linear gain in dB applied while encoding
+    """
+    options = f"{FFMPEG_OPTIONS} -threads {threads}"
+    if gain:
+        options += f" -af volume={gain:.1f}dB"
+    return {
+        "before_options": FFMPEG_BEFORE_OPTIONS,
+        "options": options,
+        "bitrate": bitrate,
+    }
+
+
+ffmpeg_opts: dict[str, Any] = ffmpeg_encode_opts()
+
+# Opus streams are remuxed without re-encoding
+ffmpeg_passthrough_opts: dict[str, str] = {
     "before_options": FFMPEG_BEFORE_OPTIONS,
-    "options": FFMPEG_OPTIONS,
+    "options": FFMPEG_PASSTHROUGH_OPTIONS,
+    "codec": "copy",
+}
+
+# Cached files are local Ogg/Opus files
+ffmpeg_cached_opts: dict[str, str] = {
+    "options": FFMPEG_PASSTHROUGH_OPTIONS,
+    "codec": "copy",
 }
+
+
+def ffmpeg_options_for(
+    track: Track,
+    bitrate: int = FFMPEG_BITRATE,
+    threads: int = FFMPEG_THREADS,
+    gain: float = 0.0,
+    local: bool = False,
+) -> dict[str, Any]:
+    """Get the FFmpeg options for streaming a track.
+
+    Opus sources, including cached files, are copied packet for packet
+    unless a gain has to be applied; anything else is re-encoded with
+    libopus at ``bitrate`` using ``threads`` threads.
+
+    Args:
+        track: Track being played
+        bitrate: Target Opus bitrate in kbps when re-encoding
+        threads: Threads the ffmpeg process may use
+        gain: Linear gain in dB, forces re-encoding when non-zero
+        local: Whether the source is a cached Ogg/Opus file
+    """
+    if not gain and local:
+        return ffmpeg_cached_opts
+    if not gain and track.is_opus:
+        return ffmpeg_passthrough_opts
+
+    options = ffmpeg_encode_opts(bitrate, threads, gain)
+    if local:
+        # The reconnect options only apply to network inputs
+        del options["before_options"]
+    return options
+
+
+def ffmpeg_seek_opts(options: dict[str, Any], start: float) -> dict[str, Any]:
+    """Get a copy of FFmpeg options that starts playback at ``start`` seconds.
+
+    The seek goes before the input, so ffmpeg jumps there with range
+    requests instead of decoding everything before the position.
+    """
+    if start <= 0:
+        return options
+    before_options = options.get("before_options", "")
+    return {**options, "before_options": f"-ss {start:.3f} {before_options}".strip()}
@@ -1,9 +1,26 @@
 """Cache management utilities for the music bot."""
 
+import asyncio
+import logging
+import sys
 import time
+from collections import OrderedDict
 from functools import lru_cache
 from typing import Any
 
+from .constants import (
+    SEARCH_CACHE_MAX_BYTES,
+    SEARCH_CACHE_MAX_ENTRIES,
+    SEARCH_CACHE_TTL,
+    SONG_CACHE_MAX_BYTES,
+    SONG_CACHE_MAX_ENTRIES,
+    SONG_CACHE_SWEEP_INTERVAL,
+    SONG_CACHE_TTL,
+    STREAM_URL_CACHE_MAX_ENTRIES,
+)
+
+logger = logging.getLogger(__name__)
+
 
 # LRU cache for frequently accessed data
 @lru_cache(maxsize=100)
@@ -31,46 +48,255 @@ class TimeCache:
         self._cache[key] = (value, time.time())
 
 
+def estimate_size(obj: Any, _seen: set[int] | None = None) -> int:
+    """Estimate the memory footprint of an object in bytes.
+
+    Walks dicts, sequences and slotted objects recursively, counting every
+    object once. This is an approximation meant for cache budgeting, not an
+    exact accounting of interpreter memory.
+    """
+    if _seen is None:
+        _seen = set()
+    if id(obj) in _seen:
+        return 0
+    _seen.add(id(obj))
+
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(
+            estimate_size(key, _seen) + estimate_size(value, _seen)
+            for key, value in obj.items()
+        )
+    elif isinstance(obj, list | tuple | set | frozenset):
+        size += sum(estimate_size(item, _seen) for item in obj)
+    elif hasattr(obj, "__slots__"):
+        size += sum(
+            estimate_size(getattr(obj, slot), _seen)
+            for slot in obj.__slots__
+            if hasattr(obj, slot)
+        )
+    return size
+
+
+class _CacheEntry:
+    """Single song cache entry."""
+
+    __slots__ = ("info", "last_accessed", "size")
+
+    def __init__(self, info: Any, size: int, now: float) -> None:
+        self.info = info
+        self.size = size
+        self.last_accessed = now
+
+
 class SongCache:
-    """LRU cache implementation for song information."""
+    """LRU + TTL cache for song information bounded by entries and bytes.
 
-    def __init__(self, max_size: int = 50, ttl: int = 3600):
+    Entries are kept in an ordered dict in access order, so lookups,
+    insertions and evictions are all O(1). Because the TTL is measured from
+    the last access, the expired entries are always at the front of the
+    order and the background sweeper only touches entries it removes.
+    """
+
+    def __init__(
+        self,
+        max_size: int = SONG_CACHE_MAX_ENTRIES,
+        ttl: int = SONG_CACHE_TTL,
+        max_bytes: int = SONG_CACHE_MAX_BYTES,
+        sweep_interval: float = SONG_CACHE_SWEEP_INTERVAL,
+    ):
         """Initialize the song cache.
 
         Args:
             max_size: Maximum number of songs to cache
-            ttl: Time-to-live in seconds for cache entries
+            ttl: Time-to-live in seconds for cache entries, since last access
+            max_bytes: Memory budget in estimated bytes across all entries
+            sweep_interval: Seconds between background expiry sweeps
         """
-        self._cache: dict[str, dict[str, Any]] = {}
+        self._cache: OrderedDict[str, _CacheEntry] = OrderedDict()
         self.max_size = max_size
+        self.max_bytes = max_bytes
         self.ttl = ttl
+        self.sweep_interval = sweep_interval
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._sweeper: asyncio.Task | None = None
+
+    def __len__(self) -> int:
+        return len(self._cache)
+
+    def __contains__(self, url: str) -> bool:
+        return url in self._cache
 
-    def get(self, url: str) -> dict | None:
+    def get(self, url: str) -> Any | None:
         """Retrieve a song from cache if it exists and is valid."""
+        entry = self._cache.get(url)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        now = time.monotonic()
+        if now - entry.last_accessed > self.ttl:
+            self._remove(url)
+            self.misses += 1
+            return None
+
+        entry.last_accessed = now
+        self._cache.move_to_end(url)
+        self.hits += 1
+        return entry.info
+
+    def peek(self, url: str) -> Any | None:
+        """Read a song if cached and valid, without counting it as a lookup.
+
+        Neither the hit and miss counters nor the LRU order are touched, so
+        the bot's own bookkeeping reads do not skew the cache statistics.
+        """
+        entry = self._cache.get(url)
+        if entry is None or time.monotonic() - entry.last_accessed > self.ttl:
+            return None
+        return entry.info
+
+    def add(self, url: str, info: Any) -> None:
+        """Add a song to the cache, evicting least recently used entries."""
+        size = estimate_size(info)
         if url in self._cache:
-            entry = self._cache[url]
-            if time.time() - entry["last_accessed"] <= self.ttl:
-                entry["last_accessed"] = time.time()
-                entry["play_count"] += 1
-                return entry["info"]
-        return None
+            self._remove(url)
+        if size > self.max_bytes:
+            logger.debug("Not caching %s: %d bytes exceeds budget", url, size)
+            return
+
+        self._cache[url] = _CacheEntry(info, size, time.monotonic())
+        self.total_bytes += size
+
+        while len(self._cache) > self.max_size or self.total_bytes > self.max_bytes:
+            _, evicted = self._cache.popitem(last=False)
+            self.total_bytes -= evicted.size
+            self.evictions += 1
+
+    def sweep(self) -> int:
+        """Remove expired entries and return how many were removed."""
+        deadline = time.monotonic() - self.ttl
+        removed = 0
+        while self._cache:
+            url, entry = next(iter(self._cache.items()))
+            if entry.last_accessed >= deadline:
+                break
+            self._remove(url)
+            removed += 1
+        return removed
+
+    def clear(self) -> None:
+        """Remove every entry from the cache."""
+        self._cache.clear()
+        self.total_bytes = 0
+
+    def start_sweeper(self) -> None:
+        """Start the periodic background expiry sweep."""
+        if self._sweeper is None or self._sweeper.done():
+            self._sweeper = asyncio.create_task(self._sweep_periodically())
+
+    async def stop_sweeper(self) -> None:
+        """Stop the background expiry sweep."""
+        if self._sweeper is None:
+            return
+        self._sweeper.cancel()
+        try:
+            await self._sweeper
+        except asyncio.CancelledError:
+            pass
+        self._sweeper = None
+
+    async def _sweep_periodically(self) -> None:
+        """Sweep expired entries every ``sweep_interval`` seconds."""
+        while True:
+            await asyncio.sleep(self.sweep_interval)
+            if removed := self.sweep():
+                logger.debug("Swept %d expired song cache entries", removed)
+
+    def _remove(self, url: str) -> None:
+        entry = self._cache.pop(url)
+        self.total_bytes -= entry.size
+
+
+class SearchCache(SongCache):
+    """LRU + TTL cache mapping normalized search queries to track URLs.
+
+    Resolved URLs are looked up in the song cache, so a repeated search
+    skips the search extraction and, while the metadata is cached, any
+    extraction at all.
+    """
+
+    def __init__(
+        self,
+        max_size: int = SEARCH_CACHE_MAX_ENTRIES,
+        ttl: int = SEARCH_CACHE_TTL,
+        max_bytes: int = SEARCH_CACHE_MAX_BYTES,
+        sweep_interval: float = SONG_CACHE_SWEEP_INTERVAL,
+    ):
+        """Initialize the search cache.
+
+        Args:
+            max_size: Maximum number of queries to cache
+            ttl: Time-to-live in seconds for cache entries, since last access
+            max_bytes: Memory budget in estimated bytes across all entries
+            sweep_interval: Seconds between background expiry sweeps
+        """
+        super().__init__(max_size, ttl, max_bytes, sweep_interval)
+
+
+class StreamURLCache:
+    """Cache of signed stream URLs keyed by track ID.
+
+    Unlike song metadata, stream URLs expire at an absolute time encoded in
+    the URL itself, so entries are only returned while they remain valid
+    for the requested number of seconds.
+    """
+
+    def __init__(self, max_size: int = STREAM_URL_CACHE_MAX_ENTRIES):
+        """Initialize the stream URL cache.
+
+        Args:
+            max_size: Maximum number of stream URLs to cache
+        """
+        self._cache: OrderedDict[str, tuple[str, float | None, str | None]] = (
+            OrderedDict()
+        )
+        self.max_size = max_size
+
+    def __len__(self) -> int:
+        return len(self._cache)
+
+    def get(
+        self, track_id: str, valid_for: float = 0
+    ) -> tuple[str, float | None, str | None] | None:
+        """Return ``(url, expires_at, audio_codec)`` if still valid.
+
+        Entries must stay valid for at least ``valid_for`` more seconds.
+        """
+        entry = self._cache.get(track_id)
+        if entry is None:
+            return None
+
+        _, expires_at, _ = entry
+        if expires_at is not None and expires_at - time.time() < valid_for:
+            del self._cache[track_id]
+            return None
+
+        self._cache.move_to_end(track_id)
+        return entry
 
-    def add(self, url: str, info: dict) -> None:
-        """Add a song to the cache with LRU implementation."""
-        now = time.time()
-
-        # Clear expired entries
-        expired = [
-            u
-            for u, data in self._cache.items()
-            if now - data["last_accessed"] > self.ttl
-        ]
-        for u in expired:
-            del self._cache[u]
-
-        # Remove least played if still full
-        if len(self._cache) >= self.max_size:
-            least_played = min(self._cache.items(), key=lambda x: x[1]["play_count"])[0]
-            del self._cache[least_played]
-
-        self._cache[url] = {"info": info, "last_accessed": now, "play_count": 0}
+    def add(
+        self,
+        track_id: str,
+        url: str,
+        expires_at: float | None,
+        audio_codec: str | None = None,
+    ) -> None:
+        """Store a stream URL, evicting the least recently used if full."""
+        self._cache[track_id] = (url, expires_at, audio_codec)
+        self._cache.move_to_end(track_id)
+        if len(self._cache) > self.max_size:
+            self._cache.popitem(last=False)
@@ -1,17 +1,132 @@
 """Constants used throughout the application."""
 
+import os
+
 # HTTP Status Codes
 HTTP_OK = 200
 HTTP_UNAUTHORIZED = 401
+HTTP_TOO_MANY_REQUESTS = 429
 
 # Playlist Display
 MAX_PLAYLIST_DISPLAY = 10
 
+# Queues
+QUEUE_BLOCK_SIZE = 64  # entries per block of a TrackQueue
+
+# YouTube Playlists
+PLAYLIST_MAX_ENTRIES = 1000
+YOUTUBE_MIX_PREFIX = "RD"  # list IDs of auto-generated, endless mixes
+# Titles flat extraction gives entries that can no longer be played
+UNAVAILABLE_PLAYLIST_ENTRIES = frozenset({"[Private video]", "[Deleted video]"})
+
+# Song Cache
+SONG_CACHE_MAX_ENTRIES = 20_000
+SONG_CACHE_MAX_BYTES = 128 * 1024 * 1024  # 128 MiB of estimated info dict size
+SONG_CACHE_TTL = 24 * 3600  # metadata does not go stale, keep it a day
+SONG_CACHE_SWEEP_INTERVAL = 60  # seconds between background expiry sweeps
+
+# Spotify API
+SPOTIFY_REQUEST_TIMEOUT = 10  # seconds per request
+SPOTIFY_CONNECTION_LIMIT = 10  # pooled keep-alive connections
+SPOTIFY_TOKEN_REFRESH_MARGIN = 60  # refresh tokens this long before expiry
+SPOTIFY_MAX_ATTEMPTS = 3
+SPOTIFY_MAX_RETRY_AFTER = 10  # longest rate-limit wait honoured, in seconds
+SPOTIFY_TRACKS_BATCH_SIZE = 50  # maximum IDs accepted by /v1/tracks
+SPOTIFY_IMPORT_CONCURRENCY = 4  # tracks resolved to YouTube at once on import
+SPOTIFY_IMPORT_MAX_ATTEMPTS = 5  # tries per track while the extraction queue is full
+SPOTIFY_IMPORT_PROGRESS_INTERVAL = 2.0  # seconds between progress message edits
+
+# Search Cache
+SEARCH_CACHE_MAX_ENTRIES = 50_000
+SEARCH_CACHE_MAX_BYTES = 16 * 1024 * 1024  # 16 MiB
+SEARCH_CACHE_TTL = 6 * 3600  # search rankings drift, re-search after 6 hours
+
+# Stream URLs
+STREAM_URL_CACHE_MAX_ENTRIES = 5_000
+STREAM_URL_EXPIRY_MARGIN = 300  # re-resolve URLs this close to expiring
+
+# On-disk Opus cache
+OPUS_CACHE_DIR = os.getenv("OPUS_CACHE_DIR", "/var/cache/ffmpeg/opus")
+OPUS_CACHE_MAX_BYTES = int(os.getenv("OPUS_CACHE_MAX_BYTES", str(2 * 1024**3)))
+OPUS_CACHE_CONCURRENCY = 1  # background transcodes running at once
+OPUS_CACHE_REPLAY_WINDOW = 1_000  # recent plays remembered to spot replays
+
+# Loudness normalization
+LOUDNESS_TARGET = -14.0  # LUFS, what YouTube and Spotify normalize to
+LOUDNESS_MAX_BOOST = 6.0  # dB, more would push quiet masters into clipping
+LOUDNESS_MAX_CUT = 20.0  # dB
+LOUDNESS_MIN_REENCODE_GAIN = 3.0  # dB worth re-encoding an Opus source for
+LOUDNESS_ANALYSIS_CONCURRENCY = 1
+
+# Extraction
+EXTRACTION_WORKERS = int(os.getenv("EXTRACTION_WORKERS", "4"))
+EXTRACTION_QUEUE_SIZE = int(os.getenv("EXTRACTION_QUEUE_SIZE", "64"))
+EXTRACTION_MAX_PENDING_PER_GUILD = 8
+YTDL_POOL_MAX_USES = 200  # extractions before a YoutubeDL instance is recycled
+YTDL_POOL_MAX_AGE = 3600  # seconds before a YoutubeDL instance is recycled
+
+# Look-ahead
+DEFAULT_LOOKAHEAD_DEPTH = 1  # upcoming tracks to resolve while playing
+MAX_LOOKAHEAD_DEPTH = 5
+LOOKAHEAD_WARM_SECONDS = 20  # spawn the next ffmpeg this long before the end
+LOOKAHEAD_POLL_SECONDS = 1.0  # minimum wait between warm-up position checks
+
+# Timers
+TIMER_RESOLUTION = 1.0  # seconds; deadlines this close share one wakeup
+
+# Voice
+# Seconds the bot waits, paused, in a channel without listeners before leaving
+ALONE_GRACE_PERIOD = float(os.getenv("ALONE_GRACE_PERIOD", "60"))
+
+# Event loop monitoring
+LOOP_LAG_INTERVAL = 0.1  # seconds between lag samples
+# Lag in seconds past which the blocked loop's stack is logged
+LOOP_LAG_THRESHOLD = float(os.getenv("LOOP_LAG_THRESHOLD", "0.25"))
+LOOP_LAG_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+LOOP_LAG_MAX_STALLS = 20  # recent stack snapshots kept
+
+# Metrics
+METRICS_LATENCY_BUCKETS = (
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+)  # seconds
+
+# Dashboard
+DASHBOARD_DEBOUNCE = 0.25  # seconds of events folded into one update
+DASHBOARD_HEARTBEAT = 15.0  # seconds of silence before a heartbeat
+DASHBOARD_CLIENT_QUEUE = 32  # unsent messages before a client is dropped
+
+# Seeking
+SEEK_STEP_SECONDS = 10  # default jump of forward and rewind
+SEEK_CLEANUP_DELAY = 1.0  # seconds before a replaced source is closed
+
 # FFmpeg Settings
 FFMPEG_BEFORE_OPTIONS = (
     "-reconnect 1 -reconnect_streamed 1 "
     "-reconnect_delay_max 5 -thread_queue_size 4096"
 )
-FFMPEG_OPTIONS = (
-    "-vn -c:a libopus -b:a 96k -bufsize 64k " "-threads 2 -application lowdelay"
-)
+# Encoded with libopus; bitrate and thread count are picked per stream
+FFMPEG_OPTIONS = "-vn -bufsize 64k -application lowdelay"
+FFMPEG_BITRATE = 96  # kbps, the most our source formats carry
+FFMPEG_DEGRADED_BITRATE = 48  # kbps, used while the CPU is saturated
+FFMPEG_MIN_BITRATE = 32  # kbps
+FFMPEG_BITRATE_LOAD_THRESHOLD = 0.5  # encoder load above which bitrate drops
+FFMPEG_THREADS = int(os.getenv("FFMPEG_THREADS", "2"))  # per ffmpeg process
+FFMPEG_STREAMS_PER_CPU = int(os.getenv("FFMPEG_STREAMS_PER_CPU", "6"))
+
+# Opus sources are remuxed into Ogg packets without re-encoding
+FFMPEG_PASSTHROUGH_OPTIONS = "-vn"
+
+# Writes a stream into an Ogg/Opus file for the on-disk cache
+FFMPEG_CACHE_OPTIONS = "-vn -map_metadata -1 -c:a libopus -b:a 96k -threads 1 -f opus"
+FFMPEG_CACHE_COPY_OPTIONS = "-vn -map_metadata -1 -c:a copy -f opus"
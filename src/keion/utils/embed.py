@@ -7,6 +7,8 @@ from pathlib import Path
 
 from discord import Color, Embed
 
+from .track import Track
+
 logger = logging.getLogger(__name__)
 
 
@@ -24,33 +26,22 @@ class EmbedBuilder:
             logger.error("Failed to load message templates: %s", str(e))
             raise
 
-    def now_playing(self, song_info: dict) -> Embed:
+    def now_playing(self, song_info: Track | dict) -> Embed:
         """Create a Now Playing embed."""
-        title = song_info["title"]
-        url = song_info.get("webpage_url", song_info.get("url", ""))
+        if isinstance(song_info, dict):
+            song_info = Track.from_info(song_info)
 
         embed = Embed(
-            title=title,  # Plain title
-            description=f"[View on YouTube]({url})",  # Link in description
+            title=song_info.title,  # Plain title
+            description=f"[View on YouTube]({song_info.webpage_url})",
             color=Color.purple(),
         )
 
-        # Use Spotify metadata if available
-        if spotify_meta := song_info.get("spotify_metadata"):
-            artist = ", ".join(artist["name"] for artist in spotify_meta["artists"])
-            thumbnail_url = (
-                spotify_meta["album"]["images"][0]["url"]
-                if spotify_meta["album"]["images"]
-                else None
-            )
-        else:
-            artist = song_info.get("artist") or song_info.get(
-                "uploader", "Unknown Artist"
-            )
-            thumbnail_url = song_info.get("thumbnail")
+        # Spotify metadata takes precedence when available
+        artist = song_info.artist
+        thumbnail_url = song_info.artwork_url
 
-        duration = song_info.get("duration")
-        duration_str = self._format_duration(duration)
+        duration_str = self._format_duration(song_info.duration)
 
         # Add a field with artist and duration
         embed.add_field(
@@ -0,0 +1,42 @@
+"""In-process event bus for player state changes."""
+
+import logging
+from collections.abc import Callable
+
+logger = logging.getLogger(__name__)
+
+Subscriber = Callable[[str, int | None], None]
+
+
+class EventBus:
+    """Synchronous publish/subscribe of player events.
+
+    Events are a name, e.g. ``song_start`` or ``queue``, and the ID of the
+    guild they concern. Subscribers run inline on the event loop, so they
+    should only record the change and defer any real work.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the bus without subscribers."""
+        self._subscribers: list[Subscriber] = []
+
+    def subscribe(self, subscriber: Subscriber) -> Callable[[], None]:
+        """Call ``subscriber`` with every published event.
+
+        Returns:
+            A function that removes the subscription
+        """
+        self._subscribers.append(subscriber)
+        return lambda: self._subscribers.remove(subscriber)
+
+    def publish(self, event: str, guild_id: int | None = None) -> None:
+        """Notify subscribers of an event. Must be called on the event loop."""
+        for subscriber in list(self._subscribers):
+            try:
+                subscriber(event, guild_id)
+            except Exception:
+                logger.exception("Event subscriber failed for %s", event)
+
+
+# Bus shared by the bot and the web dashboard
+EVENTS = EventBus()
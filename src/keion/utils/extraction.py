@@ -0,0 +1,328 @@
+"""Scheduling of blocking yt-dlp extractions."""
+
+import asyncio
+import logging
+import re
+import threading
+import time
+import unicodedata
+from collections import OrderedDict, deque
+from collections.abc import Awaitable, Callable, Hashable, Iterator
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from enum import IntEnum
+from functools import partial
+from typing import Any
+
+import yt_dlp
+
+from .constants import (
+    EXTRACTION_MAX_PENDING_PER_GUILD,
+    EXTRACTION_QUEUE_SIZE,
+    EXTRACTION_WORKERS,
+    YTDL_POOL_MAX_AGE,
+    YTDL_POOL_MAX_USES,
+)
+
+logger = logging.getLogger(__name__)
+
+_APOSTROPHE_PATTERN = re.compile(r"['\u2019`]")
+_PUNCTUATION_PATTERN = re.compile(r"[\W_]+")
+
+
+def normalize_query(query: str) -> str:
+    """Fold case, whitespace and punctuation so equivalent searches match."""
+    folded = unicodedata.normalize("NFKC", query).casefold()
+    folded = _APOSTROPHE_PATTERN.sub("", folded)
+    return _PUNCTUATION_PATTERN.sub(" ", folded).strip() or folded.strip()
+
+
+class Priority(IntEnum):
+    """Extraction priority, lower values run first."""
+
+    INTERACTIVE = 0  # a user is waiting on the result
+    PREFETCH = 1  # background look-ahead work
+
+
+class ExtractionQueueFullError(Exception):
+    """Raised when the extraction queue cannot accept more work."""
+
+    pass
+
+
+@dataclass(slots=True)
+class _PooledDownloader:
+    downloader: yt_dlp.YoutubeDL
+    created_at: float = field(default_factory=time.monotonic)
+    uses: int = 0
+
+
+class YoutubeDLPool:
+    """Thread-safe pool of ``YoutubeDL`` instances.
+
+    ``YoutubeDL`` keeps mutable state for the extraction in progress, so an
+    instance must never be shared by two threads at once. Each extraction
+    checks out its own instance; idle instances are reused most recently
+    returned first so they stay warm, and are recycled after a number of
+    uses or once they get old.
+    """
+
+    def __init__(
+        self,
+        options: dict[str, Any],
+        max_idle: int = EXTRACTION_WORKERS,
+        max_uses: int = YTDL_POOL_MAX_USES,
+        max_age: float = YTDL_POOL_MAX_AGE,
+    ) -> None:
+        """Initialize the pool.
+
+        Args:
+            options: Options passed to every ``YoutubeDL`` instance
+            max_idle: Maximum number of idle instances kept for reuse
+            max_uses: Extractions after which an instance is recycled
+            max_age: Seconds after which an instance is recycled
+        """
+        self.options = options
+        self.max_idle = max_idle
+        self.max_uses = max_uses
+        self.max_age = max_age
+        self._idle: list[_PooledDownloader] = []
+        self._lock = threading.Lock()
+        self.created = 0
+
+    @contextmanager
+    def checkout(self) -> Iterator[yt_dlp.YoutubeDL]:
+        """Check out an instance for exclusive use by the calling thread."""
+        with self._lock:
+            entry = self._idle.pop() if self._idle else None
+        if entry is None:
+            entry = _PooledDownloader(yt_dlp.YoutubeDL(self.options))
+            self.created += 1
+
+        try:
+            yield entry.downloader
+        finally:
+            entry.uses += 1
+            self._release(entry)
+
+    def extract_info(self, url: str, download: bool = False) -> dict[str, Any]:
+        """Run ``YoutubeDL.extract_info`` on a pooled instance."""
+        with self.checkout() as downloader:
+            return downloader.extract_info(url, download=download)
+
+    def close(self) -> None:
+        """Close every idle instance."""
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for entry in idle:
+            entry.downloader.close()
+
+    def _release(self, entry: _PooledDownloader) -> None:
+        """Return an instance to the pool, or close it if it should retire."""
+        expired = (
+            entry.uses >= self.max_uses
+            or time.monotonic() - entry.created_at >= self.max_age
+        )
+        if not expired:
+            with self._lock:
+                if len(self._idle) < self.max_idle:
+                    self._idle.append(entry)
+                    return
+        entry.downloader.close()
+
+
+@dataclass(slots=True)
+class _Job:
+    func: Callable[..., Any]
+    args: tuple[Any, ...]
+    priority: Priority
+    future: asyncio.Future
+
+
+class ExtractionScheduler:
+    """Bounded, prioritized and per-guild fair runner for blocking extractions.
+
+    Jobs wait in one queue per guild and priority. Workers always take
+    interactive work before prefetch work and rotate between guilds, so one
+    guild queueing many lookups cannot starve the others. Prefetch work never
+    occupies every worker, leaving room for interactive requests.
+    """
+
+    def __init__(
+        self,
+        max_workers: int = EXTRACTION_WORKERS,
+        max_pending: int = EXTRACTION_QUEUE_SIZE,
+        max_pending_per_guild: int = EXTRACTION_MAX_PENDING_PER_GUILD,
+    ) -> None:
+        """Initialize the scheduler.
+
+        Args:
+            max_workers: Number of extraction worker threads
+            max_pending: Maximum number of queued jobs across all guilds
+            max_pending_per_guild: Maximum number of queued jobs per guild
+        """
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.max_pending_per_guild = max_pending_per_guild
+        self.max_prefetch_workers = max(1, max_workers - 1)
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="extract"
+        )
+        self._queues: dict[Priority, OrderedDict[int | None, deque[_Job]]] = {
+            priority: OrderedDict() for priority in Priority
+        }
+        self._pending_per_guild: dict[int | None, int] = {}
+        self._running: dict[Priority, int] = dict.fromkeys(Priority, 0)
+        self.pending = 0
+        self._closed = False
+
+    @property
+    def running(self) -> int:
+        """Number of extractions currently running on a worker."""
+        return sum(self._running.values())
+
+    async def run(
+        self,
+        func: Callable[..., Any],
+        *args: Any,
+        guild_id: int | None = None,
+        priority: Priority = Priority.INTERACTIVE,
+    ) -> Any:
+        """Run ``func(*args)`` on an extraction worker and return its result.
+
+        Raises:
+            ExtractionQueueFullError: If the queue, or the guild's share of
+                it, is full
+        """
+        if self._closed:
+            raise RuntimeError("Extraction scheduler is shut down")
+        if self.pending >= self.max_pending:
+            raise ExtractionQueueFullError("Extraction queue is full")
+        if self._pending_per_guild.get(guild_id, 0) >= self.max_pending_per_guild:
+            raise ExtractionQueueFullError("Too many pending extractions for guild")
+
+        job = _Job(func, args, priority, asyncio.get_running_loop().create_future())
+        self._queues[priority].setdefault(guild_id, deque()).append(job)
+        self._pending_per_guild[guild_id] = self._pending_per_guild.get(guild_id, 0) + 1
+        self.pending += 1
+        self._dispatch()
+        return await job.future
+
+    def shutdown(self) -> None:
+        """Cancel queued jobs and stop the worker threads."""
+        self._closed = True
+        for queue in self._queues.values():
+            for jobs in queue.values():
+                for job in jobs:
+                    job.future.cancel()
+            queue.clear()
+        self._pending_per_guild.clear()
+        self.pending = 0
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def _dispatch(self) -> None:
+        """Start queued jobs while workers are available."""
+        loop = asyncio.get_running_loop()
+        while (
+            not self._closed
+            and self.running < self.max_workers
+            and (job := self._next_job())
+        ):
+            if job.future.cancelled():
+                continue
+            self._running[job.priority] += 1
+            future = self._executor.submit(job.func, *job.args)
+            future.add_done_callback(
+                partial(loop.call_soon_threadsafe, self._on_done, job)
+            )
+
+    def _next_job(self) -> _Job | None:
+        """Pop the next job by priority, rotating across guilds."""
+        for priority in Priority:
+            if (
+                priority is Priority.PREFETCH
+                and self._running[priority] >= self.max_prefetch_workers
+            ):
+                continue
+
+            queue = self._queues[priority]
+            if not queue:
+                continue
+
+            guild_id, jobs = next(iter(queue.items()))
+            job = jobs.popleft()
+            if jobs:
+                queue.move_to_end(guild_id)
+            else:
+                del queue[guild_id]
+
+            self.pending -= 1
+            remaining = self._pending_per_guild[guild_id] - 1
+            if remaining:
+                self._pending_per_guild[guild_id] = remaining
+            else:
+                del self._pending_per_guild[guild_id]
+            return job
+        return None
+
+    def _on_done(self, job: _Job, future: Future) -> None:
+        """Forward a finished job's outcome and start the next job."""
+        self._running[job.priority] -= 1
+        if future.cancelled():
+            job.future.cancel()
+        elif not job.future.cancelled():
+            if (error := future.exception()) is not None:
+                job.future.set_exception(error)
+            else:
+                job.future.set_result(future.result())
+        self._dispatch()
+
+
+class SingleFlight:
+    """Coalesce concurrent calls for the same key into a single call.
+
+    The first caller for a key starts the work; callers arriving while it is
+    in flight await the same result. The shared work is shielded, so one
+    caller giving up does not cancel it for the others.
+
+    Callers only join work of the same or a higher priority. An interactive
+    caller finding a prefetch in flight starts its own call instead of
+    waiting behind the prefetch share of the extraction workers, and later
+    callers join that one.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the in-flight table."""
+        self._inflight: dict[Hashable, tuple[asyncio.Future, Priority]] = {}
+
+    def __len__(self) -> int:
+        return len(self._inflight)
+
+    async def run(
+        self,
+        key: Hashable,
+        func: Callable[[], Awaitable[Any]],
+        priority: Priority = Priority.INTERACTIVE,
+    ) -> Any:
+        """Await ``func()``, sharing the call with concurrent callers of ``key``.
+
+        Args:
+            key: Identifies calls that produce the same result
+            func: Starts the work when no suitable call is in flight
+            priority: Priority ``func`` runs its work at
+        """
+        flight = self._inflight.get(key)
+        if flight is None or flight[1] > priority:
+            future = asyncio.ensure_future(func())
+            self._inflight[key] = (future, priority)
+            future.add_done_callback(partial(self._on_done, key))
+        else:
+            future = flight[0]
+        return await asyncio.shield(future)
+
+    def _on_done(self, key: Hashable, future: asyncio.Future) -> None:
+        if (flight := self._inflight.get(key)) and flight[0] is future:
+            del self._inflight[key]
+        if not future.cancelled():
+            future.exception()  # mark as retrieved if every caller went away
@@ -0,0 +1,261 @@
+"""CPU-aware admission control for ffmpeg streams."""
+
+import asyncio
+import logging
+import os
+from collections import deque
+from pathlib import Path
+
+from discord import FFmpegOpusAudio
+from discord.opus import Encoder
+
+from .constants import (
+    FFMPEG_BITRATE,
+    FFMPEG_BITRATE_LOAD_THRESHOLD,
+    FFMPEG_DEGRADED_BITRATE,
+    FFMPEG_MIN_BITRATE,
+    FFMPEG_STREAMS_PER_CPU,
+    FFMPEG_THREADS,
+)
+
+logger = logging.getLogger(__name__)
+
+CGROUP_ROOT = Path("/sys/fs/cgroup")
+
+
+def read_cgroup_cpu_quota(root: Path = CGROUP_ROOT) -> float | None:
+    """Return the CPU quota of this container in CPUs, if one is set.
+
+    Reads ``cpu.max`` on cgroup v2 and ``cpu.cfs_quota_us`` on cgroup v1.
+    """
+    try:
+        quota, period = (root / "cpu.max").read_text().split()[:2]
+        return None if quota == "max" else int(quota) / int(period)
+    except (OSError, ValueError):
+        pass
+
+    try:
+        quota = int((root / "cpu" / "cpu.cfs_quota_us").read_text())
+        period = int((root / "cpu" / "cpu.cfs_period_us").read_text())
+        return quota / period if quota > 0 else None
+    except (OSError, ValueError, ZeroDivisionError):
+        return None
+
+
+def available_cpus(root: Path = CGROUP_ROOT) -> float:
+    """Return how many CPUs this process may use, honouring cgroup quotas."""
+    if hasattr(os, "sched_getaffinity"):
+        cpus = float(len(os.sched_getaffinity(0)))
+    else:
+        cpus = float(os.cpu_count() or 1)
+    quota = read_cgroup_cpu_quota(root)
+    return min(cpus, quota) if quota else cpus
+
+
+class StreamSlot:
+    """Permission for one ffmpeg process to run, granted by the governor."""
+
+    __slots__ = ("_governor", "_released", "degraded", "encode", "threads")
+
+    def __init__(
+        self, governor: "FFmpegGovernor", encode: bool, threads: int, degraded: bool
+    ) -> None:
+        self.encode = encode
+        self.threads = threads
+        self.degraded = degraded
+        self._governor = governor
+        self._released = False
+
+    def release(self) -> None:
+        """Give the slot back. Releasing twice is harmless.
+
+        Safe to call from the voice player thread, which cleans up sources
+        once they finish playing.
+        """
+        if not self._released:
+            self._released = True
+            self._governor._release_threadsafe(self)
+
+
+class FFmpegGovernor:
+    """Admission control for ffmpeg processes under a CPU quota.
+
+    Only re-encoding streams count against the budget; remuxed Opus streams
+    cost next to nothing. Up to ``capacity`` encodes run at full quality;
+    past that, new streams are degraded to one thread and a lower bitrate,
+    and past twice the capacity they wait for a slot, so an overloaded host
+    delays new songs instead of making every guild stutter.
+    """
+
+    def __init__(
+        self,
+        cpus: float | None = None,
+        max_threads: int = FFMPEG_THREADS,
+        streams_per_cpu: int = FFMPEG_STREAMS_PER_CPU,
+    ) -> None:
+        """Initialize the governor.
+
+        Args:
+            cpus: CPUs available to ffmpeg, read from the cgroup by default
+            max_threads: Most threads a single ffmpeg process may use
+            streams_per_cpu: Full-quality encodes one CPU can sustain
+        """
+        self.cpus = cpus if cpus is not None else available_cpus()
+        self.max_threads = max(1, max_threads)
+        self.capacity = max(1, int(self.cpus * streams_per_cpu))
+        self.max_streams = self.capacity * 2
+        self.encoding = 0
+        self.passthrough = 0
+        self._waiters: deque[asyncio.Future] = deque()
+        self._loop: asyncio.AbstractEventLoop | None = None
+        logger.info(
+            "FFmpeg governor: %.2f CPUs, %d full-quality encodes",
+            self.cpus,
+            self.capacity,
+        )
+
+    @property
+    def load(self) -> float:
+        """Encoding streams relative to full-quality capacity."""
+        return self.encoding / self.capacity
+
+    @property
+    def waiting(self) -> int:
+        """Number of streams waiting for a slot."""
+        return sum(not waiter.done() for waiter in self._waiters)
+
+    def pick_bitrate(self, slot: StreamSlot, channel_bitrate: int | None) -> int:
+        """Pick the Opus bitrate in kbps for a newly started encode.
+
+        The voice channel's bitrate caps it, since Discord carries no more
+        than that. Above ``FFMPEG_BITRATE_LOAD_THRESHOLD`` load it slides
+        down towards ``FFMPEG_DEGRADED_BITRATE``, and degraded slots never
+        exceed that.
+
+        Args:
+            slot: Slot the encode runs under
+            channel_bitrate: Bitrate of the voice channel in bits per second
+        """
+        ceiling = FFMPEG_BITRATE
+        if channel_bitrate:
+            ceiling = min(ceiling, channel_bitrate // 1000)
+
+        if slot.degraded:
+            bitrate = FFMPEG_DEGRADED_BITRATE
+        elif self.load > FFMPEG_BITRATE_LOAD_THRESHOLD:
+            pressure = (self.load - FFMPEG_BITRATE_LOAD_THRESHOLD) / (
+                1 - FFMPEG_BITRATE_LOAD_THRESHOLD
+            )
+            bitrate = FFMPEG_BITRATE - pressure * (
+                FFMPEG_BITRATE - FFMPEG_DEGRADED_BITRATE
+            )
+        else:
+            bitrate = FFMPEG_BITRATE
+
+        # Opus bitrates are conventionally multiples of 8 kbps
+        bitrate = int(min(bitrate, ceiling)) // 8 * 8
+        return max(FFMPEG_MIN_BITRATE, bitrate)
+
+    def try_acquire(self, encode: bool = True) -> StreamSlot | None:
+        """Get a slot without waiting, or ``None`` if the host is saturated."""
+        try:
+            self._loop = asyncio.get_running_loop()
+        except RuntimeError:
+            pass
+
+        if not encode:
+            self.passthrough += 1
+            return StreamSlot(self, encode=False, threads=1, degraded=False)
+        if self.encoding >= self.max_streams or self.waiting:
+            return None
+        return self._grant()
+
+    async def acquire(self, encode: bool = True) -> StreamSlot:
+        """Get a slot, waiting for one to free up if the host is saturated."""
+        if slot := self.try_acquire(encode):
+            return slot
+
+        logger.info("FFmpeg saturated, queueing stream")
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            return await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                waiter.result().release()
+            raise
+
+    def _grant(self) -> StreamSlot:
+        degraded = self.encoding >= self.capacity
+        self.encoding += 1
+        if degraded:
+            threads = 1
+        else:
+            threads = max(1, min(self.max_threads, int(self.cpus / self.encoding)))
+        return StreamSlot(self, encode=True, threads=threads, degraded=degraded)
+
+    def _release_threadsafe(self, slot: StreamSlot) -> None:
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if self._loop is None or running is self._loop or self._loop.is_closed():
+            self._release(slot)
+        else:
+            self._loop.call_soon_threadsafe(self._release, slot)
+
+    def _release(self, slot: StreamSlot) -> None:
+        if not slot.encode:
+            self.passthrough -= 1
+            return
+
+        self.encoding -= 1
+        while self._waiters and self.encoding < self.max_streams:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(self._grant())
+
+
+class GovernedOpusAudio(FFmpegOpusAudio):
+    """``FFmpegOpusAudio`` that gives its governor slot back on cleanup.
+
+    It also counts the frames it has handed out, which gives the playback
+    position without asking ffmpeg.
+    """
+
+    def __init__(
+        self, source: str, *, slot: StreamSlot, start: float = 0.0, **kwargs
+    ) -> None:
+        """Start ffmpeg, releasing ``slot`` right away if that fails.
+
+        Args:
+            source: Stream URL or file to play
+            slot: Governor slot held while ffmpeg runs
+            start: Position in seconds ffmpeg was told to start from
+            **kwargs: Passed on to ``FFmpegOpusAudio``
+        """
+        self.slot = slot
+        self.start = start
+        self.frames = 0
+        try:
+            super().__init__(source, **kwargs)
+        except Exception:
+            slot.release()
+            raise
+
+    @property
+    def position(self) -> float:
+        """Seconds into the track of the last frame read."""
+        return self.start + self.frames * Encoder.FRAME_LENGTH / 1000
+
+    def read(self) -> bytes:
+        data = super().read()
+        if data:
+            self.frames += 1
+        return data
+
+    def cleanup(self) -> None:
+        try:
+            super().cleanup()
+        finally:
+            self.slot.release()
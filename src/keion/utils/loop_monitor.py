@@ -0,0 +1,141 @@
+"""Event loop lag sampling and blocking-call detection."""
+
+import asyncio
+import bisect
+import logging
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from datetime import UTC, datetime
+from typing import Any
+
+from .constants import (
+    LOOP_LAG_BUCKETS,
+    LOOP_LAG_INTERVAL,
+    LOOP_LAG_MAX_STALLS,
+    LOOP_LAG_THRESHOLD,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class LoopLagMonitor:
+    """Measures how late the event loop runs scheduled callbacks.
+
+    A task sleeps for ``interval`` over and over and records how much longer
+    each sleep took into a histogram. A watchdog thread notices when that
+    task has not run for ``threshold`` seconds past its wakeup, and logs
+    the event loop thread's stack while it is still blocked, which points at
+    the sync call responsible.
+    """
+
+    def __init__(
+        self,
+        interval: float = LOOP_LAG_INTERVAL,
+        threshold: float = LOOP_LAG_THRESHOLD,
+        buckets: tuple[float, ...] = LOOP_LAG_BUCKETS,
+        max_stalls: int = LOOP_LAG_MAX_STALLS,
+    ) -> None:
+        """Initialize the monitor.
+
+        Args:
+            interval: Seconds between lag samples
+            threshold: Lag in seconds past which a stack snapshot is taken
+            buckets: Upper bounds in seconds of the lag histogram buckets
+            max_stalls: Number of recent stack snapshots kept
+        """
+        self.interval = interval
+        self.threshold = threshold
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # Last bucket is +Inf
+        self.samples = 0
+        self.total_lag = 0.0
+        self.max_lag = 0.0
+        self.stalls: deque[dict[str, Any]] = deque(maxlen=max_stalls)
+        self._stalls_lock = threading.Lock()
+        self._expected_wakeup = 0.0
+        self._loop_thread_id: int | None = None
+        self._task: asyncio.Task | None = None
+        self._watchdog: threading.Thread | None = None
+        self._stopped = threading.Event()
+
+    def start(self) -> None:
+        """Start sampling the running event loop."""
+        if self._task is not None:
+            return
+        self._loop_thread_id = threading.get_ident()
+        self._expected_wakeup = time.monotonic() + self.interval
+        self._stopped.clear()
+        self._task = asyncio.create_task(self._sample())
+        self._watchdog = threading.Thread(
+            target=self._watch, name="loop-lag-watchdog", daemon=True
+        )
+        self._watchdog.start()
+
+    async def stop(self) -> None:
+        """Stop sampling."""
+        self._stopped.set()
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        if self._watchdog is not None:
+            await asyncio.to_thread(self._watchdog.join)
+            self._watchdog = None
+
+    def record(self, lag: float) -> None:
+        """Add one lag measurement in seconds to the histogram."""
+        self.counts[bisect.bisect_left(self.buckets, lag)] += 1
+        self.samples += 1
+        self.total_lag += lag
+        self.max_lag = max(self.max_lag, lag)
+
+    def snapshot(self) -> dict[str, Any]:
+        """Get the lag statistics and recent stalls as plain data."""
+        with self._stalls_lock:
+            stalls = list(self.stalls)
+        histogram = {
+            str(bound): count
+            for bound, count in zip((*self.buckets, "+Inf"), self.counts, strict=True)
+        }
+        return {
+            "interval": self.interval,
+            "threshold": self.threshold,
+            "samples": self.samples,
+            "mean_lag": self.total_lag / self.samples if self.samples else 0.0,
+            "max_lag": self.max_lag,
+            "histogram": histogram,
+            "stalls": stalls,
+        }
+
+    async def _sample(self) -> None:
+        while True:
+            self._expected_wakeup = time.monotonic() + self.interval
+            await asyncio.sleep(self.interval)
+            self.record(max(0.0, time.monotonic() - self._expected_wakeup))
+
+    def _watch(self) -> None:
+        """Watchdog thread: snapshot the loop thread while it is blocked."""
+        reported = None
+        while not self._stopped.wait(self.threshold / 2):
+            expected = self._expected_wakeup
+            lag = time.monotonic() - expected
+            if lag < self.threshold or reported == expected:
+                continue
+            reported = expected  # One snapshot per stall
+
+            frame = sys._current_frames().get(self._loop_thread_id)
+            if frame is None:
+                continue
+            stack = "".join(traceback.format_stack(frame))
+            with self._stalls_lock:
+                self.stalls.append(
+                    {
+                        "time": datetime.now(UTC).isoformat(),
+                        "lag": round(lag, 3),
+                        "stack": stack,
+                    }
+                )
+            logger.warning("Event loop blocked for %.3fs so far, at:\n%s", lag, stack)
@@ -0,0 +1,133 @@
+"""Background loudness measurement for tracks."""
+
+import asyncio
+import logging
+import re
+import shlex
+from collections.abc import Callable
+
+from .constants import (
+    FFMPEG_BEFORE_OPTIONS,
+    LOUDNESS_ANALYSIS_CONCURRENCY,
+    LOUDNESS_MAX_BOOST,
+    LOUDNESS_MAX_CUT,
+    LOUDNESS_TARGET,
+)
+
+logger = logging.getLogger(__name__)
+
+# Last line of the ebur128 summary, e.g. "    I:         -14.2 LUFS"
+_INTEGRATED_PATTERN = re.compile(r"^\s*I:\s+(-?[\d.]+|-inf) LUFS", re.MULTILINE)
+
+
+def parse_integrated_loudness(output: str) -> float | None:
+    """Return the integrated loudness in LUFS from ffmpeg's ebur128 summary."""
+    matches = _INTEGRATED_PATTERN.findall(output)
+    if not matches or matches[-1] == "-inf":
+        return None
+    return float(matches[-1])
+
+
+def loudness_gain(loudness: float) -> float:
+    """Return the gain in dB that brings a track to ``LOUDNESS_TARGET``."""
+    return max(-LOUDNESS_MAX_CUT, min(LOUDNESS_MAX_BOOST, LOUDNESS_TARGET - loudness))
+
+
+class LoudnessAnalyzer:
+    """Measures the integrated loudness of tracks in the background.
+
+    Each track is decoded once through ffmpeg's ``ebur128`` filter; the
+    result lets later plays apply a fixed gain instead of running a dynamic
+    normalizer in real time.
+    """
+
+    def __init__(
+        self,
+        max_concurrent: int = LOUDNESS_ANALYSIS_CONCURRENCY,
+        executable: str = "ffmpeg",
+    ) -> None:
+        """Initialize the analyzer.
+
+        Args:
+            max_concurrent: Number of analyses allowed to run at once
+            executable: FFmpeg executable used for the analysis
+        """
+        self.executable = executable
+        self._pending: dict[str, asyncio.Task] = {}
+        self._semaphore = asyncio.Semaphore(max_concurrent)
+
+    def __contains__(self, track_id: str) -> bool:
+        return track_id in self._pending
+
+    def analyse(
+        self,
+        track_id: str,
+        source: str,
+        on_done: Callable[[float], None],
+        local: bool = False,
+    ) -> None:
+        """Measure a track in the background and pass the result to ``on_done``.
+
+        Does nothing if the track is already being measured.
+
+        Args:
+            track_id: ID of the track being measured
+            source: Stream URL or local file to read
+            on_done: Called with the integrated loudness in LUFS
+            local: Whether ``source`` is a local file rather than a URL
+        """
+        if track_id in self._pending:
+            return
+        task = asyncio.create_task(self._analyse(source, on_done, local))
+        self._pending[track_id] = task
+        task.add_done_callback(lambda _: self._pending.pop(track_id, None))
+
+    async def close(self) -> None:
+        """Cancel analyses in progress."""
+        tasks = list(self._pending.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _analyse(
+        self, source: str, on_done: Callable[[float], None], local: bool
+    ) -> None:
+        async with self._semaphore:
+            try:
+                process = await asyncio.create_subprocess_exec(
+                    self.executable,
+                    "-nostdin",
+                    "-hide_banner",
+                    "-nostats",
+                    *([] if local else shlex.split(FFMPEG_BEFORE_OPTIONS)),
+                    "-i",
+                    source,
+                    "-vn",
+                    "-threads",
+                    "1",
+                    "-af",
+                    "ebur128=framelog=quiet",
+                    "-f",
+                    "null",
+                    "-",
+                    stdout=asyncio.subprocess.DEVNULL,
+                    stderr=asyncio.subprocess.PIPE,
+                )
+            except OSError as e:
+                logger.warning("Failed to start loudness analysis: %s", e)
+                return
+
+            try:
+                _, stderr = await process.communicate()
+            except asyncio.CancelledError:
+                if process.returncode is None:
+                    process.kill()
+                    await process.wait()
+                raise
+
+        output = stderr.decode(errors="replace")
+        loudness = parse_integrated_loudness(output)
+        if process.returncode != 0 or loudness is None:
+            logger.warning("Loudness analysis failed: %s", output.strip()[-200:])
+            return
+        on_done(loudness)
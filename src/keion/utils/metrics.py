@@ -0,0 +1,209 @@
+"""Lightweight metrics in the Prometheus text exposition format."""
+
+import bisect
+import math
+import time
+from abc import ABC, abstractmethod
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from typing import TypeVar
+
+from .constants import METRICS_LATENCY_BUCKETS
+
+Labels = tuple[str, ...]
+Sample = float | dict[Labels, float]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", r"\\").replace('"', r"\"").replace("\n", r"\n")
+
+
+def _format_labels(names: Labels, values: Labels, extra: str = "") -> str:
+    pairs = [
+        f'{name}="{_escape(value)}"' for name, value in zip(names, values, strict=True)
+    ]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value))
+
+
+class Metric(ABC):
+    """Base class of a named metric with optional labels."""
+
+    type = "untyped"
+
+    def __init__(self, name: str, documentation: str, labels: Labels = ()) -> None:
+        """Initialize the metric.
+
+        Args:
+            name: Metric name, e.g. ``keion_voice_clients``
+            documentation: Help text shown by Prometheus
+            labels: Names of the labels every sample carries
+        """
+        self.name = name
+        self.documentation = documentation
+        self.labels = labels
+
+    def render(self) -> Iterator[str]:
+        """Yield the exposition lines of this metric."""
+        yield f"# HELP {self.name} {_escape(self.documentation)}"
+        yield f"# TYPE {self.name} {self.type}"
+        yield from self._samples()
+
+    @abstractmethod
+    def _samples(self) -> Iterator[str]:
+        """Yield the sample lines of this metric."""
+
+
+class Histogram(Metric):
+    """Distribution of observed values over fixed buckets.
+
+    Each set of label values gets its bucket counts allocated once, so an
+    observation is a binary search and two additions.
+    """
+
+    type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labels: Labels = (),
+        buckets: tuple[float, ...] = METRICS_LATENCY_BUCKETS,
+    ) -> None:
+        """Initialize the histogram.
+
+        Args:
+            name: Metric name, e.g. ``keion_command_duration_seconds``
+            documentation: Help text shown by Prometheus
+            labels: Names of the labels every sample carries
+            buckets: Sorted upper bounds of the buckets, without +Inf
+        """
+        super().__init__(name, documentation, labels)
+        self.buckets = buckets
+        # labels -> [count per bucket..., +Inf count, sum]
+        self._values: dict[Labels, list[float]] = {}
+
+    def observe(self, value: float, *labels: str) -> None:
+        """Record one observation for a set of label values."""
+        if (counts := self._values.get(labels)) is None:
+            counts = self._values[labels] = [0.0] * (len(self.buckets) + 2)
+        counts[bisect.bisect_left(self.buckets, value)] += 1
+        counts[-1] += value
+
+    @contextmanager
+    def time(self, *labels: str) -> Iterator[None]:
+        """Observe the time spent in a ``with`` block, in seconds."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, *labels)
+
+    def _samples(self) -> Iterator[str]:
+        for labels, counts in self._values.items():
+            cumulative = 0.0
+            for bound, count in zip(
+                (*self.buckets, math.inf), counts[:-1], strict=True
+            ):
+                cumulative += count
+                le = f'le="{_format_value(bound)}"'
+                yield (
+                    f"{self.name}_bucket{_format_labels(self.labels, labels, le)} "
+                    f"{_format_value(cumulative)}"
+                )
+            label_str = _format_labels(self.labels, labels)
+            yield f"{self.name}_sum{label_str} {_format_value(counts[-1])}"
+            yield f"{self.name}_count{label_str} {_format_value(cumulative)}"
+
+
+class CallbackMetric(Metric):
+    """Metric whose value is read from the application when scraped.
+
+    Used for state that is already tracked elsewhere, such as cache hit
+    counts or the number of voice clients, so it costs nothing until
+    Prometheus asks for it.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        callback: Callable[[], Sample | None],
+        labels: Labels = (),
+        metric_type: str = "gauge",
+    ) -> None:
+        """Initialize the metric.
+
+        Args:
+            name: Metric name, e.g. ``keion_voice_clients``
+            documentation: Help text shown by Prometheus
+            callback: Returns the value, a mapping of label values to
+                values, or ``None`` when there is nothing to report
+            labels: Names of the labels in the callback's mapping
+            metric_type: ``gauge`` or ``counter``
+        """
+        super().__init__(name, documentation, labels)
+        self.callback = callback
+        self.type = metric_type
+
+    def _samples(self) -> Iterator[str]:
+        value = self.callback()
+        if value is None:
+            return
+        values = value if isinstance(value, dict) else {(): value}
+        for labels, sample in values.items():
+            yield (
+                f"{self.name}{_format_labels(self.labels, labels)} "
+                f"{_format_value(sample)}"
+            )
+
+
+MetricT = TypeVar("MetricT", bound=Metric)
+
+
+class MetricsRegistry:
+    """Collection of metrics rendered together for a scrape."""
+
+    def __init__(self) -> None:
+        """Initialize an empty registry."""
+        self._metrics: dict[str, Metric] = {}
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._metrics
+
+    def register(self, metric: MetricT) -> MetricT:
+        """Add a metric, replacing any registered under the same name."""
+        self._metrics[metric.name] = metric
+        return metric
+
+    def unregister(self, name: str) -> None:
+        """Remove a metric, if registered."""
+        self._metrics.pop(name, None)
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labels: Labels = (),
+        buckets: tuple[float, ...] = METRICS_LATENCY_BUCKETS,
+    ) -> Histogram:
+        """Create and register a histogram."""
+        return self.register(Histogram(name, documentation, labels, buckets))
+
+    def render(self) -> str:
+        """Render every metric in the Prometheus text format."""
+        lines = []
+        for metric in list(self._metrics.values()):
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+# Registry served at /metrics
+REGISTRY = MetricsRegistry()
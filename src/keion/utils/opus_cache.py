@@ -0,0 +1,219 @@
+"""Persistent on-disk cache of transcoded Opus tracks."""
+
+import asyncio
+import hashlib
+import logging
+import os
+import secrets
+import shlex
+from collections import OrderedDict
+from pathlib import Path
+
+from .constants import (
+    FFMPEG_BEFORE_OPTIONS,
+    FFMPEG_CACHE_COPY_OPTIONS,
+    FFMPEG_CACHE_OPTIONS,
+    OPUS_CACHE_CONCURRENCY,
+    OPUS_CACHE_DIR,
+    OPUS_CACHE_MAX_BYTES,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class OpusDiskCache:
+    """Content-addressed store of Ogg/Opus files with an LRU byte budget.
+
+    Files are named by the SHA-256 of the track ID and fanned out into
+    subdirectories by the first two hex digits. Each file is written to a
+    temporary name and renamed into place, so a crash never leaves a
+    truncated file under a real name. Access times are kept in the file
+    modification times, so the LRU order survives restarts.
+    """
+
+    def __init__(
+        self,
+        directory: str | os.PathLike = OPUS_CACHE_DIR,
+        max_bytes: int = OPUS_CACHE_MAX_BYTES,
+        max_concurrent: int = OPUS_CACHE_CONCURRENCY,
+        executable: str = "ffmpeg",
+    ) -> None:
+        """Initialize the cache.
+
+        Args:
+            directory: Directory holding the cached files
+            max_bytes: Total size of cached files before the least recently
+                used ones are deleted
+            max_concurrent: Number of transcodes allowed to run at once
+            executable: FFmpeg executable used to transcode streams
+        """
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.executable = executable
+        self.enabled = False
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._index: OrderedDict[str, int] = OrderedDict()  # key -> size, LRU first
+        self._pending: dict[str, asyncio.Task] = {}
+        self._semaphore = asyncio.Semaphore(max_concurrent)
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def __contains__(self, track_id: str) -> bool:
+        return self.enabled and self.key_for(track_id) in self._index
+
+    @staticmethod
+    def key_for(track_id: str) -> str:
+        """Get the content address of a track."""
+        return hashlib.sha256(track_id.encode()).hexdigest()
+
+    def path_for(self, key: str) -> Path:
+        """Get the file path for a content address."""
+        return self.directory / key[:2] / f"{key}.opus"
+
+    def load(self) -> None:
+        """Index the files already on disk.
+
+        This does blocking filesystem work and should run in a thread.
+        Leftover temporary files from interrupted writes are removed. The
+        cache stays disabled if the directory is not writable.
+        """
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+        except OSError as e:
+            logger.warning("Opus cache disabled, cannot use %s: %s", self.directory, e)
+            return
+
+        found = []
+        for path in self.directory.glob("*/*"):
+            try:
+                if path.suffix == ".tmp":
+                    path.unlink()
+                elif path.suffix == ".opus":
+                    stat = path.stat()
+                    found.append((stat.st_mtime, path.stem, stat.st_size))
+            except OSError as e:
+                logger.debug("Skipping cached file %s: %s", path, e)
+
+        self._index.clear()
+        self.total_bytes = 0
+        for _, key, size in sorted(found):
+            self._index[key] = size
+            self.total_bytes += size
+        self.enabled = True
+        self._evict()
+        logger.info(
+            "Opus cache holds %d files (%d bytes)", len(self._index), self.total_bytes
+        )
+
+    def get(self, track_id: str) -> str | None:
+        """Get the path of a cached track, marking it recently used."""
+        if not self.enabled:
+            return None
+
+        key = self.key_for(track_id)
+        if key not in self._index:
+            self.misses += 1
+            return None
+
+        path = self.path_for(key)
+        try:
+            os.utime(path)
+        except OSError:
+            # Deleted behind our back
+            self.total_bytes -= self._index.pop(key)
+            self.misses += 1
+            return None
+
+        self._index.move_to_end(key)
+        self.hits += 1
+        return str(path)
+
+    def store(self, track_id: str, stream_url: str, passthrough: bool = False) -> None:
+        """Transcode a stream into the cache in the background.
+
+        Opus streams are only remuxed when ``passthrough`` is set. Does
+        nothing if the track is already cached or being stored.
+        """
+        if not self.enabled:
+            return
+        key = self.key_for(track_id)
+        if key in self._index or key in self._pending:
+            return
+
+        task = asyncio.create_task(self._store(key, stream_url, passthrough))
+        self._pending[key] = task
+        task.add_done_callback(lambda _: self._pending.pop(key, None))
+
+    async def close(self) -> None:
+        """Cancel transcodes in progress."""
+        tasks = list(self._pending.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _store(self, key: str, stream_url: str, passthrough: bool) -> None:
+        """Transcode a stream to a temporary file and move it into place."""
+        options = FFMPEG_CACHE_COPY_OPTIONS if passthrough else FFMPEG_CACHE_OPTIONS
+        async with self._semaphore:
+            path = self.path_for(key)
+            temp_path = path.with_name(f"{path.name}.{secrets.token_hex(4)}.tmp")
+            try:
+                path.parent.mkdir(exist_ok=True)
+                process = await asyncio.create_subprocess_exec(
+                    self.executable,
+                    "-nostdin",
+                    "-loglevel",
+                    "error",
+                    *shlex.split(FFMPEG_BEFORE_OPTIONS),
+                    "-i",
+                    stream_url,
+                    *shlex.split(options),
+                    str(temp_path),
+                    stdout=asyncio.subprocess.DEVNULL,
+                    stderr=asyncio.subprocess.PIPE,
+                )
+            except OSError as e:
+                logger.warning("Failed to start caching transcode: %s", e)
+                return
+
+            try:
+                _, stderr = await process.communicate()
+                if process.returncode != 0:
+                    logger.warning(
+                        "Caching transcode failed: %s",
+                        stderr.decode(errors="replace").strip(),
+                    )
+                    return
+
+                size = temp_path.stat().st_size
+                os.replace(temp_path, path)
+            except asyncio.CancelledError:
+                if process.returncode is None:
+                    process.kill()
+                    await process.wait()
+                raise
+            except OSError as e:
+                logger.warning("Failed to store cached track: %s", e)
+                return
+            finally:
+                temp_path.unlink(missing_ok=True)
+
+            self._index[key] = size
+            self.total_bytes += size
+            self._evict()
+            logger.debug("Cached transcoded track %s (%d bytes)", key, size)
+
+    def _evict(self) -> None:
+        """Delete least recently used files until within the byte budget."""
+        while self.total_bytes > self.max_bytes and self._index:
+            key, size = self._index.popitem(last=False)
+            self.total_bytes -= size
+            self.evictions += 1
+            try:
+                self.path_for(key).unlink(missing_ok=True)
+            except OSError as e:
+                logger.warning("Failed to evict cached track %s: %s", key, e)
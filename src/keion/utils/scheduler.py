@@ -0,0 +1,128 @@
+"""Shared deadline scheduler for per-guild timers."""
+
+import asyncio
+import heapq
+import itertools
+import logging
+from collections.abc import Awaitable, Callable, Hashable
+
+from .constants import TIMER_RESOLUTION
+
+logger = logging.getLogger(__name__)
+
+
+class DeadlineScheduler:
+    """Runs a callback for each key whose deadline has passed.
+
+    Deadlines live in a heap served by a single task, instead of one
+    sleeping task per key. Rescheduling and cancelling are O(log n): the
+    old heap entry is left in place and skipped when it surfaces, and the
+    heap is rebuilt once stale entries outnumber live ones. Deadlines are
+    rounded up to ``resolution`` seconds so keys expiring close together
+    are handled in one wakeup.
+    """
+
+    def __init__(
+        self,
+        callback: Callable[[Hashable], Awaitable[None]],
+        resolution: float = TIMER_RESOLUTION,
+    ) -> None:
+        """Initialize the scheduler.
+
+        Args:
+            callback: Coroutine function called with each expired key
+            resolution: Granularity of deadlines in seconds
+        """
+        self.callback = callback
+        self.resolution = resolution
+        self._heap: list[tuple[float, int, Hashable]] = []
+        self._deadlines: dict[Hashable, tuple[float, int]] = {}
+        self._counter = itertools.count()
+        self._wakeup = asyncio.Event()
+        self._runner: asyncio.Task | None = None
+        self._running: set[asyncio.Task] = set()
+
+    def __len__(self) -> int:
+        return len(self._deadlines)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._deadlines
+
+    def schedule(self, key: Hashable, delay: float) -> None:
+        """Run the callback for ``key`` in ``delay`` seconds.
+
+        Replaces any deadline already set for the key.
+        """
+        loop = asyncio.get_running_loop()
+        ticks = -(-(loop.time() + delay) // self.resolution)  # round up
+        deadline = ticks * self.resolution
+        entry = (deadline, next(self._counter))
+        self._deadlines[key] = entry
+        heapq.heappush(self._heap, (*entry, key))
+        self._compact()
+
+        if self._runner is None or self._runner.done():
+            self._runner = asyncio.create_task(self._run())
+        elif self._heap[0][1] == entry[1]:
+            self._wakeup.set()  # The runner is sleeping for a later deadline
+
+    def cancel(self, key: Hashable) -> None:
+        """Drop the deadline for ``key``, if any."""
+        self._deadlines.pop(key, None)
+        self._compact()
+
+    async def close(self) -> None:
+        """Drop every deadline and stop the scheduler task."""
+        self._deadlines.clear()
+        self._heap.clear()
+        tasks = [*self._running, *([self._runner] if self._runner else [])]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._runner = None
+
+    def _compact(self) -> None:
+        """Rebuild the heap once it is mostly stale entries."""
+        if len(self._heap) > 2 * len(self._deadlines) + 64:
+            self._heap = [(*entry, key) for key, entry in self._deadlines.items()]
+            heapq.heapify(self._heap)
+
+    def _pop_expired(self, now: float) -> list[Hashable]:
+        expired = []
+        while self._heap and self._heap[0][0] <= now:
+            deadline, seq, key = heapq.heappop(self._heap)
+            if self._deadlines.get(key) == (deadline, seq):
+                del self._deadlines[key]
+                expired.append(key)
+        return expired
+
+    def _next_deadline(self) -> float | None:
+        while self._heap:
+            deadline, seq, key = self._heap[0]
+            if self._deadlines.get(key) == (deadline, seq):
+                return deadline
+            heapq.heappop(self._heap)  # Stale entry
+        return None
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while (deadline := self._next_deadline()) is not None:
+            self._wakeup.clear()
+            timeout = deadline - loop.time()
+            if timeout > 0:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout)
+                except TimeoutError:
+                    pass
+                continue
+
+            for key in self._pop_expired(loop.time()):
+                task = asyncio.create_task(self._fire(key))
+                self._running.add(task)
+                task.add_done_callback(self._running.discard)
+
+    async def _fire(self, key: Hashable) -> None:
+        try:
+            await self.callback(key)
+        except Exception:
+            logger.exception("Timer callback failed for %s", key)
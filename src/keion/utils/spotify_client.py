@@ -1,12 +1,25 @@
 """Spotify API client implementation."""
 
+import asyncio
+import base64
 import os
+import time
+from collections.abc import AsyncIterator
 from typing import Any
-from urllib.parse import urlencode
 
-import requests
+import aiohttp
 
-from .constants import HTTP_OK, HTTP_UNAUTHORIZED
+from .constants import (
+    HTTP_OK,
+    HTTP_TOO_MANY_REQUESTS,
+    HTTP_UNAUTHORIZED,
+    SPOTIFY_CONNECTION_LIMIT,
+    SPOTIFY_MAX_ATTEMPTS,
+    SPOTIFY_MAX_RETRY_AFTER,
+    SPOTIFY_REQUEST_TIMEOUT,
+    SPOTIFY_TOKEN_REFRESH_MARGIN,
+    SPOTIFY_TRACKS_BATCH_SIZE,
+)
 
 
 class SpotifyAPIError(Exception):
@@ -16,9 +29,17 @@ class SpotifyAPIError(Exception):
 
 
 class SpotifyClient:
-    """Client for interacting with Spotify Web API."""
+    """Asynchronous client for interacting with Spotify Web API.
 
-    def __init__(self):
+    Requests share one keep-alive connection pool and never block the event
+    loop. The access token is refreshed ahead of its ``expires_in`` deadline
+    rather than after a 401.
+    """
+
+    TOKEN_ENDPOINT = "https://accounts.spotify.com/api/token"
+    API_BASE = "https://api.spotify.com/v1"
+
+    def __init__(self, timeout: float = SPOTIFY_REQUEST_TIMEOUT):
         """Initialize Spotify client with credentials from environment."""
         self.client_id = os.getenv("SPOTIFY_CLIENT_ID")
         self.client_secret = os.getenv("SPOTIFY_CLIENT_SECRET")
@@ -26,68 +47,141 @@ class SpotifyClient:
         if not all([self.client_id, self.client_secret]):
             raise ValueError("Spotify credentials not found in environment")
 
-        self._secrets: tuple[str, str] = (self.client_id, self.client_secret)
-        self._session = requests.Session()
-
-        # Set up session with initial headers
-        self._session.headers.update(
-            {"Content-Type": "application/x-www-form-urlencoded"}
-        )
-        self._session.params.update({"market": "US"})
-
-        # Get initial token and update headers
-        self._session.headers.update(
-            {
-                "Content-Type": "application/json",
-                "Authorization": f"Bearer {self._get_token()}",
-            }
-        )
-
-    def _get_token(self) -> str:
-        """Obtain access token using client credentials flow."""
-        token_endpoint = "https://accounts.spotify.com/api/token"
-        response = self._session.post(
-            token_endpoint,
-            data={"grant_type": "client_credentials"},
-            auth=self._secrets,
-        )
-
-        if response.status_code != HTTP_OK:
-            raise SpotifyAPIError("Failed to authenticate with Spotify")
-
-        return response.json()["access_token"]
-
-    def _refresh_token_if_needed(self, response: requests.Response) -> bool:
-        """Refresh token if expired and update session headers."""
-        if response.status_code == HTTP_UNAUTHORIZED:
-            token = self._get_token()
-            self._session.headers.update({"Authorization": f"Bearer {token}"})
-            return True
-        return False
-
-    def get_track_info(self, track_id: str) -> dict[str, Any]:
-        """Get track information from Spotify API."""
-        response = self._session.get(f"https://api.spotify.com/v1/tracks/{track_id}")
-
-        if self._refresh_token_if_needed(response):
-            return self.get_track_info(track_id)
-
-        if response.status_code != HTTP_OK:
-            raise SpotifyAPIError(
-                f"Failed to fetch track information: {response.status_code}"
+        credentials = f"{self.client_id}:{self.client_secret}".encode()
+        self._auth_header = f"Basic {base64.b64encode(credentials).decode()}"
+        self._timeout = aiohttp.ClientTimeout(total=timeout)
+        self._session: aiohttp.ClientSession | None = None
+        self._token: str | None = None
+        self._token_expires_at = 0.0
+        self._token_lock = asyncio.Lock()
+
+    async def close(self) -> None:
+        """Close the underlying HTTP session."""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        """Get the shared session, creating it on first use."""
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                timeout=self._timeout,
+                connector=aiohttp.TCPConnector(limit=SPOTIFY_CONNECTION_LIMIT),
             )
+        return self._session
+
+    async def _get_token(self) -> str:
+        """Return a valid access token, refreshing it shortly before expiry."""
+        if self._token and time.monotonic() < self._token_expires_at:
+            return self._token
+
+        async with self._token_lock:
+            # Another request may have refreshed it while we waited
+            if self._token and time.monotonic() < self._token_expires_at:
+                return self._token
+
+            try:
+                async with self._get_session().post(
+                    self.TOKEN_ENDPOINT,
+                    data={"grant_type": "client_credentials"},
+                    headers={"Authorization": self._auth_header},
+                ) as response:
+                    if response.status != HTTP_OK:
+                        raise SpotifyAPIError("Failed to authenticate with Spotify")
+                    payload = await response.json()
+            except (aiohttp.ClientError, TimeoutError) as e:
+                raise SpotifyAPIError(
+                    f"Failed to authenticate with Spotify: {e}"
+                ) from e
+
+            self._token = payload["access_token"]
+            self._token_expires_at = (
+                time.monotonic()
+                + payload.get("expires_in", 3600)
+                - SPOTIFY_TOKEN_REFRESH_MARGIN
+            )
+            return self._token
+
+    async def _get(self, path: str, params: dict[str, Any] | None = None) -> dict:
+        """Send an authenticated GET request and return the JSON body.
+
+        A 401 invalidates the token and a 429 waits for ``Retry-After``;
+        either is retried at most ``SPOTIFY_MAX_ATTEMPTS`` times in total.
+        """
+        params = {"market": "US", **(params or {})}
+        for _ in range(SPOTIFY_MAX_ATTEMPTS):
+            token = await self._get_token()
+            try:
+                async with self._get_session().get(
+                    f"{self.API_BASE}{path}",
+                    params=params,
+                    headers={"Authorization": f"Bearer {token}"},
+                ) as response:
+                    if response.status == HTTP_OK:
+                        return await response.json()
+                    status = response.status
+                    retry_after = response.headers.get("Retry-After", "")
+            except (aiohttp.ClientError, TimeoutError) as e:
+                raise SpotifyAPIError(f"Spotify request failed: {e}") from e
+
+            if status == HTTP_UNAUTHORIZED:
+                self._token_expires_at = 0.0
+            elif status == HTTP_TOO_MANY_REQUESTS:
+                delay = float(retry_after) if retry_after.isdigit() else 1.0
+                await asyncio.sleep(min(delay, SPOTIFY_MAX_RETRY_AFTER))
+            else:
+                raise SpotifyAPIError(f"Spotify request failed: {status}")
+
+        raise SpotifyAPIError(f"Spotify request failed after retries: {status}")
+
+    async def get_track_info(self, track_id: str) -> dict[str, Any]:
+        """Get track information from Spotify API."""
+        return await self._get(f"/tracks/{track_id}")
 
-        return response.json()
-
-    def search_track(self, query: str) -> dict[str, Any]:
+    async def search_track(self, query: str) -> dict[str, Any]:
         """Search for a track on Spotify."""
-        params = urlencode({"q": query, "type": "track", "limit": 1})
-        response = self._session.get(f"https://api.spotify.com/v1/search?{params}")
-
-        if self._refresh_token_if_needed(response):
-            return self.search_track(query)
-
-        if response.status_code != HTTP_OK:
-            raise SpotifyAPIError(f"Failed to search for track: {response.status_code}")
-
-        return response.json()
+        return await self._get("/search", {"q": query, "type": "track", "limit": 1})
+
+    async def get_tracks(self, track_ids: list[str]) -> list[dict[str, Any]]:
+        """Get up to ``SPOTIFY_TRACKS_BATCH_SIZE`` tracks in one request."""
+        response = await self._get("/tracks", {"ids": ",".join(track_ids)})
+        return [track for track in response["tracks"] if track]
+
+    async def iter_collection_track_ids(
+        self, kind: str, collection_id: str
+    ) -> AsyncIterator[list[str]]:
+        """Yield the track IDs of an album or playlist, one page at a time."""
+        if kind == "album":
+            path, params = f"/albums/{collection_id}/tracks", {"limit": 50}
+        elif kind == "playlist":
+            path = f"/playlists/{collection_id}/tracks"
+            params = {"limit": 100, "fields": "items(track(id)),next"}
+        else:
+            raise ValueError(f"Unsupported Spotify collection: {kind}")
+
+        offset = 0
+        while True:
+            page = await self._get(path, {**params, "offset": offset})
+            items = page.get("items", [])
+            if kind == "playlist":
+                items = [item["track"] for item in items if item.get("track")]
+            # Local files and unavailable tracks have no ID
+            if track_ids := [item["id"] for item in items if item.get("id")]:
+                yield track_ids
+            if not page.get("next") or not items:
+                return
+            offset += params["limit"]
+
+    async def iter_collection_tracks(
+        self, kind: str, collection_id: str
+    ) -> AsyncIterator[dict[str, Any]]:
+        """Yield the full track objects of an album or playlist in order.
+
+        Tracks are fetched through the batch endpoint, ``/tracks?ids=``,
+        ``SPOTIFY_TRACKS_BATCH_SIZE`` at a time.
+        """
+        async for page in self.iter_collection_track_ids(kind, collection_id):
+            for start in range(0, len(page), SPOTIFY_TRACKS_BATCH_SIZE):
+                batch = page[start : start + SPOTIFY_TRACKS_BATCH_SIZE]
+                for track in await self.get_tracks(batch):
+                    yield track
@@ -0,0 +1,195 @@
+"""Compact track records used across the music bot."""
+
+import re
+import time
+from dataclasses import dataclass, replace
+from typing import Any, Self
+from urllib.parse import parse_qs, urlparse
+
+# Signed googlevideo URLs carry their expiry either as a query parameter
+# (``?expire=1700000000``) or as a path segment (``/expire/1700000000/``).
+_EXPIRE_PATH_PATTERN = re.compile(r"/expire/(\d+)")
+
+
+def parse_stream_expiry(url: str | None) -> float | None:
+    """Return the UNIX timestamp at which a signed stream URL expires."""
+    if not url:
+        return None
+    try:
+        parsed = urlparse(url)
+    except ValueError:
+        return None
+
+    if expire := parse_qs(parsed.query).get("expire"):
+        try:
+            return float(expire[0])
+        except ValueError:
+            return None
+    if match := _EXPIRE_PATH_PATTERN.search(parsed.path):
+        return float(match.group(1))
+    return None
+
+
+def parse_audio_codec(info: dict[str, Any]) -> str | None:
+    """Return the audio codec of a yt-dlp format, e.g. ``"opus"``.
+
+    Falls back to the container extension when yt-dlp does not report the
+    codec, since ``.opus`` files can only hold Opus.
+    """
+    acodec = info.get("acodec")
+    if acodec and acodec != "none":
+        return acodec.split(".")[0].lower()
+    if info.get("ext") == "opus":
+        return "opus"
+    return None
+
+
+@dataclass(frozen=True, slots=True)
+class SpotifyMetadata:
+    """The subset of a Spotify track object the bot displays."""
+
+    id: str
+    name: str
+    artists: tuple[str, ...]
+    album_image: str | None = None
+
+    @classmethod
+    def from_api(cls, track: dict[str, Any]) -> Self:
+        """Build metadata from a Spotify Web API track object."""
+        images = track.get("album", {}).get("images") or []
+        return cls(
+            id=track["id"],
+            name=track["name"],
+            artists=tuple(artist["name"] for artist in track.get("artists", [])),
+            album_image=images[0]["url"] if images else None,
+        )
+
+
+@dataclass(frozen=True, slots=True)
+class Track:
+    """Immutable record holding only the song fields the bot uses.
+
+    yt-dlp info dicts carry format lists, thumbnails and HTTP headers that
+    weigh tens of kilobytes each; queues, caches and the web API only ever
+    need the handful of fields kept here.
+    """
+
+    id: str
+    title: str
+    webpage_url: str
+    stream_url: str | None = None
+    stream_expires_at: float | None = None
+    audio_codec: str | None = None
+    duration: int | None = None
+    uploader: str | None = None
+    thumbnail: str | None = None
+    loudness: float | None = None  # integrated LUFS, measured in the background
+    spotify_metadata: SpotifyMetadata | None = None
+
+    @classmethod
+    def from_info(
+        cls, info: dict[str, Any], spotify_metadata: SpotifyMetadata | None = None
+    ) -> Self:
+        """Build a track from a yt-dlp info dict."""
+        stream_url = info.get("url")
+        duration = info.get("duration")
+        return cls(
+            id=str(info.get("id") or info.get("webpage_url") or stream_url or ""),
+            title=info.get("title", "Unknown"),
+            webpage_url=info.get("webpage_url") or stream_url or "",
+            stream_url=stream_url,
+            stream_expires_at=parse_stream_expiry(stream_url),
+            audio_codec=parse_audio_codec(info),
+            duration=int(duration) if duration is not None else None,
+            # Prefer the credited artist over the channel name when present
+            uploader=info.get("artist") or info.get("uploader"),
+            thumbnail=info.get("thumbnail"),
+            spotify_metadata=spotify_metadata,
+        )
+
+    @classmethod
+    def from_flat_entry(cls, entry: dict[str, Any]) -> Self:
+        """Build a placeholder from a flat-extracted playlist entry.
+
+        Placeholders carry no stream URL; they are resolved into full
+        tracks shortly before they play.
+        """
+        url = entry.get("url") or ""
+        duration = entry.get("duration")
+        return cls(
+            id=entry["id"],
+            title=entry.get("title") or "Unknown",
+            webpage_url=(
+                url
+                if url.startswith("http")
+                else f"https://www.youtube.com/watch?v={entry['id']}"
+            ),
+            duration=int(duration) if duration is not None else None,
+            uploader=entry.get("channel") or entry.get("uploader"),
+        )
+
+    @property
+    def is_placeholder(self) -> bool:
+        """Whether the track still has to be resolved before playing."""
+        return self.stream_url is None
+
+    @property
+    def is_opus(self) -> bool:
+        """Whether the stream is already Opus and can skip re-encoding."""
+        return self.audio_codec == "opus"
+
+    def stream_expires_within(self, seconds: float) -> bool:
+        """Whether the stream URL is missing or expires within ``seconds``.
+
+        URLs without a parseable expiry are assumed not to expire.
+        """
+        if not self.stream_url:
+            return True
+        if self.stream_expires_at is None:
+            return False
+        return self.stream_expires_at - time.time() < seconds
+
+    def with_stream(
+        self,
+        stream_url: str,
+        expires_at: float | None = None,
+        audio_codec: str | None = None,
+    ) -> Self:
+        """Return a copy of this track pointing at a fresh stream URL.
+
+        A fresh URL may point at a different format, so the audio codec is
+        replaced too; ``None`` means unknown.
+        """
+        if expires_at is None:
+            expires_at = parse_stream_expiry(stream_url)
+        return replace(
+            self,
+            stream_url=stream_url,
+            stream_expires_at=expires_at,
+            audio_codec=audio_codec,
+        )
+
+    @property
+    def artist(self) -> str:
+        """Artist name for display, preferring Spotify metadata."""
+        if self.spotify_metadata and self.spotify_metadata.artists:
+            return ", ".join(self.spotify_metadata.artists)
+        return self.uploader or "Unknown Artist"
+
+    @property
+    def artwork_url(self) -> str | None:
+        """Artwork URL for display, preferring the Spotify album image."""
+        if self.spotify_metadata and self.spotify_metadata.album_image:
+            return self.spotify_metadata.album_image
+        return self.thumbnail
+
+    def to_dict(self) -> dict[str, Any]:
+        """Serialize the public, display-relevant fields."""
+        return {
+            "id": self.id,
+            "title": self.title,
+            "webpage_url": self.webpage_url,
+            "duration": self.duration,
+            "artist": self.artist,
+            "thumbnail": self.artwork_url,
+        }
@@ -0,0 +1,339 @@
+"""Indexed song queue supporting fast edits at any position."""
+
+import random
+from collections.abc import Iterable, Iterator, Sequence
+from dataclasses import dataclass
+from itertools import chain, count
+from typing import overload
+
+from .constants import QUEUE_BLOCK_SIZE
+from .track import Track
+
+_entry_ids = count(1)
+
+
+@dataclass(frozen=True, slots=True)
+class QueueEntry:
+    """A track queued at one position, identified by a stable entry ID.
+
+    The same song may be queued several times; each occurrence gets its own
+    entry ID, while ``track.id`` identifies the song itself.
+    """
+
+    track: Track
+    entry_id: int
+
+
+class TrackQueue(Sequence[Track]):
+    """Ordered queue of tracks stored as a list of small blocks.
+
+    Popping the head and appending are O(1): blocks emptied at the head are
+    skipped over by a head offset and only dropped, together with a rebuild
+    of the index, once they make up half of the blocks. Reading, inserting
+    or removing at an arbitrary position locates the block through a
+    Fenwick tree over the block lengths, which is O(log n), then edits a
+    block of at most ``2 * block_size`` entries. Entries are found by their
+    entry ID through a map to their block, and membership and duplicate
+    checks go through the entry IDs queued per song, so tracks are never
+    compared field by field.
+    """
+
+    def __init__(
+        self, tracks: Iterable[Track] = (), block_size: int = QUEUE_BLOCK_SIZE
+    ) -> None:
+        """Initialize the queue.
+
+        Args:
+            tracks: Tracks to queue initially
+            block_size: Target number of entries per block
+        """
+        self.block_size = block_size
+        self._blocks: list[list[QueueEntry]] = []
+        self._head = 0  # blocks before this one were emptied by popleft
+        # Rebuilt lazily after blocks are added or dropped
+        self._tree: list[int] | None = None
+        self._positions: dict[int, int] = {}  # id(block) -> block index
+        self._len = 0
+        self._blocks_by_entry: dict[int, list[QueueEntry]] = {}
+        self._entries_by_song: dict[str, set[int]] = {}
+        self.extend(tracks)
+
+    def __len__(self) -> int:
+        return self._len
+
+    def __iter__(self) -> Iterator[Track]:
+        return (entry.track for entry in chain.from_iterable(self._blocks))
+
+    def __contains__(self, track: object) -> bool:
+        return isinstance(track, Track) and track.id in self._entries_by_song
+
+    @overload
+    def __getitem__(self, index: int) -> Track: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> list[Track]: ...
+
+    def __getitem__(self, index: int | slice) -> Track | list[Track]:
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(self._len))]
+        return self.entry(index).track
+
+    def __repr__(self) -> str:
+        return f"TrackQueue({list(self)!r})"
+
+    def entry(self, index: int) -> QueueEntry:
+        """Get the entry at ``index``."""
+        block, offset = self._locate(index)
+        return self._blocks[block][offset]
+
+    def entries(self) -> Iterator[QueueEntry]:
+        """Iterate over the queued entries in order."""
+        return chain.from_iterable(self._blocks)
+
+    def count(self, track: Track) -> int:
+        """Count how many times a song is queued."""
+        return len(self._entries_by_song.get(track.id, ()))
+
+    def position(self, entry_id: int) -> int:
+        """Get the position of an entry by its entry ID.
+
+        Raises:
+            KeyError: If no entry with that ID is queued
+        """
+        block = self._blocks_by_entry[entry_id]
+        return self._prefix(self._block_index(block)) + self._offset(block, entry_id)
+
+    def append(self, track: Track) -> QueueEntry:
+        """Queue a track at the end."""
+        entry = QueueEntry(track, next(_entry_ids))
+        if self._blocks and len(self._blocks[-1]) < self.block_size:
+            self._blocks[-1].append(entry)
+            self._update(len(self._blocks) - 1, 1)
+        else:
+            self._blocks.append([entry])
+            self._tree = None
+        self._added(entry, self._blocks[-1])
+        return entry
+
+    def extend(self, tracks: Iterable[Track]) -> None:
+        """Queue several tracks at the end."""
+        for track in tracks:
+            self.append(track)
+
+    def insert(self, index: int, track: Track) -> QueueEntry:
+        """Queue a track before position ``index``."""
+        entry = QueueEntry(track, next(_entry_ids))
+        self._insert_entry(index, entry)
+        return entry
+
+    def popleft(self) -> Track:
+        """Remove and return the first track.
+
+        Raises:
+            IndexError: If the queue is empty
+        """
+        if not self._len:
+            raise IndexError("pop from an empty queue")
+        return self._delete(self._head, 0).track
+
+    def remove(self, index: int) -> Track:
+        """Remove and return the track at ``index``."""
+        block, offset = self._locate(index)
+        return self._delete(block, offset).track
+
+    def remove_entry(self, entry_id: int) -> Track:
+        """Remove and return the track of an entry by its entry ID.
+
+        Raises:
+            KeyError: If no entry with that ID is queued
+        """
+        block = self._blocks_by_entry[entry_id]
+        return self._delete(
+            self._block_index(block), self._offset(block, entry_id)
+        ).track
+
+    def discard(self, track: Track) -> bool:
+        """Remove the first occurrence of a song, if it is queued."""
+        if not (entry_ids := self._entries_by_song.get(track.id)):
+            return False
+        self.remove_entry(min(entry_ids, key=self.position))
+        return True
+
+    def move(self, source: int, destination: int) -> Track:
+        """Move the track at ``source`` so that it ends up at ``destination``."""
+        destination = self._normalize(destination)
+        block, offset = self._locate(source)
+        entry = self._delete(block, offset)
+        self._insert_entry(destination, entry)
+        return entry.track
+
+    def shuffle(self, rng: random.Random | None = None) -> None:
+        """Shuffle the queue in place with a Fisher-Yates pass."""
+        randrange = (rng or random).randrange
+        for i in range(self._len - 1, 0, -1):
+            j = randrange(i + 1)
+            if i != j:
+                block_i, offset_i = self._locate(i)
+                block_j, offset_j = self._locate(j)
+                first, second = self._blocks[block_i], self._blocks[block_j]
+                first[offset_i], second[offset_j] = second[offset_j], first[offset_i]
+                self._blocks_by_entry[first[offset_i].entry_id] = first
+                self._blocks_by_entry[second[offset_j].entry_id] = second
+
+    def dedupe(self) -> int:
+        """Keep only the first occurrence of every song.
+
+        Returns:
+            The number of entries removed
+        """
+        seen: set[str] = set()
+        removed = 0
+        for block in self._blocks:
+            kept = []
+            for entry in block:
+                if entry.track.id in seen:
+                    self._entries_by_song[entry.track.id].discard(entry.entry_id)
+                    del self._blocks_by_entry[entry.entry_id]
+                    removed += 1
+                else:
+                    seen.add(entry.track.id)
+                    kept.append(entry)
+            block[:] = kept
+
+        if removed:
+            self._blocks = [block for block in self._blocks if block]
+            self._head = 0
+            self._tree = None
+            self._len -= removed
+        return removed
+
+    def clear(self) -> None:
+        """Remove every entry."""
+        self._blocks.clear()
+        self._head = 0
+        self._tree = None
+        self._len = 0
+        self._blocks_by_entry.clear()
+        self._entries_by_song.clear()
+
+    def _normalize(self, index: int, *, allow_end: bool = False) -> int:
+        """Turn a possibly negative index into a checked offset."""
+        size = self._len + 1 if allow_end else self._len
+        if index < 0:
+            index += self._len
+        if not 0 <= index < size:
+            raise IndexError("queue index out of range")
+        return index
+
+    def _locate(self, index: int) -> tuple[int, int]:
+        """Find the block holding position ``index`` and the offset in it."""
+        index = self._normalize(index)
+        if self._tree is None:
+            self._build_tree()
+        tree = self._tree
+        block = 0
+        step = 1 << (len(tree) - 1).bit_length()
+        while step:
+            node = block + step
+            if node < len(tree) and tree[node] <= index:
+                block = node
+                index -= tree[node]
+            step >>= 1
+        return block, index
+
+    def _build_tree(self) -> None:
+        """Build the Fenwick tree of block lengths and the block positions."""
+        tree = [0] + [len(block) for block in self._blocks]
+        for node in range(1, len(tree)):
+            parent = node + (node & -node)
+            if parent < len(tree):
+                tree[parent] += tree[node]
+        self._tree = tree
+        self._positions = {id(block): i for i, block in enumerate(self._blocks)}
+
+    def _prefix(self, block: int) -> int:
+        """Count the entries in the blocks before ``block``."""
+        if self._tree is None:
+            self._build_tree()
+        total = 0
+        while block:
+            total += self._tree[block]
+            block -= block & -block
+        return total
+
+    def _block_index(self, block: list[QueueEntry]) -> int:
+        """Get the position of a block in the block list."""
+        if self._tree is None:
+            self._build_tree()
+        return self._positions[id(block)]
+
+    @staticmethod
+    def _offset(block: list[QueueEntry], entry_id: int) -> int:
+        """Get the offset of an entry within its block."""
+        return next(i for i, entry in enumerate(block) if entry.entry_id == entry_id)
+
+    def _update(self, block: int, delta: int) -> None:
+        """Record a change in the length of one block."""
+        if self._tree is None:
+            return
+        node = block + 1
+        while node < len(self._tree):
+            self._tree[node] += delta
+            node += node & -node
+
+    def _insert_entry(self, index: int, entry: QueueEntry) -> None:
+        index = self._normalize(index, allow_end=True)
+        if index == self._len:
+            if self._blocks:
+                block_index, offset = len(self._blocks) - 1, len(self._blocks[-1])
+            else:
+                self._blocks.append([])
+                self._tree = None
+                block_index, offset = 0, 0
+        else:
+            block_index, offset = self._locate(index)
+
+        block = self._blocks[block_index]
+        block.insert(offset, entry)
+        self._update(block_index, 1)
+        self._added(entry, block)
+        if len(block) > 2 * self.block_size:
+            tail = block[self.block_size :]
+            del block[self.block_size :]
+            self._blocks.insert(block_index + 1, tail)
+            self._tree = None
+            for moved in tail:
+                self._blocks_by_entry[moved.entry_id] = tail
+
+    def _delete(self, block_index: int, offset: int) -> QueueEntry:
+        block = self._blocks[block_index]
+        entry = block.pop(offset)
+        self._update(block_index, -1)
+        self._len -= 1
+        del self._blocks_by_entry[entry.entry_id]
+        entry_ids = self._entries_by_song[entry.track.id]
+        entry_ids.remove(entry.entry_id)
+        if not entry_ids:
+            del self._entries_by_song[entry.track.id]
+
+        if not self._len:
+            self._blocks.clear()
+            self._head = 0
+            self._tree = None
+        elif block_index == self._head:
+            # Keep emptied head blocks, and the index, until they pile up
+            while not self._blocks[self._head]:
+                self._head += 1
+            if 2 * self._head > len(self._blocks):
+                del self._blocks[: self._head]
+                self._head = 0
+                self._tree = None
+        elif not block:
+            del self._blocks[block_index]
+            self._tree = None
+        return entry
+
+    def _added(self, entry: QueueEntry, block: list[QueueEntry]) -> None:
+        self._len += 1
+        self._blocks_by_entry[entry.entry_id] = block
+        self._entries_by_song.setdefault(entry.track.id, set()).add(entry.entry_id)
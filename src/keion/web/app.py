@@ -3,9 +3,12 @@
 from pathlib import Path
 
 from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
 
+from ..utils.metrics import REGISTRY
+from .dashboard import DashboardBroadcaster
 from .routes import api, pages
 
 app = FastAPI(title="Keion Web Interface")
@@ -17,6 +20,15 @@ templates_path = Path(__file__).parent / "templates"
 app.mount("/static", StaticFiles(directory=str(static_path)), name="static")
 templates = Jinja2Templates(directory=str(templates_path))
 
+# Pushes player state changes to the dashboard sockets
+app.state.dashboard = DashboardBroadcaster(app)
+
 # Include routers
 app.include_router(pages.router)
 app.include_router(api.router, prefix="/api")
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics() -> PlainTextResponse:
+    """Serve metrics in the Prometheus text format."""
+    return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4")
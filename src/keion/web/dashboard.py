@@ -0,0 +1,191 @@
+"""Push updates of the dashboard state to WebSocket clients."""
+
+import asyncio
+import contextlib
+import json
+import logging
+from typing import Any
+
+from fastapi import FastAPI, WebSocket, WebSocketDisconnect
+
+from ..utils.constants import (
+    DASHBOARD_CLIENT_QUEUE,
+    DASHBOARD_DEBOUNCE,
+    DASHBOARD_HEARTBEAT,
+)
+from ..utils.events import EVENTS, EventBus
+from .utils import collect_players, collect_stats
+
+logger = logging.getLogger(__name__)
+
+
+def diff_snapshots(old: dict[str, Any], new: dict[str, Any]) -> dict[str, Any]:
+    """Get the changes between two dashboard snapshots.
+
+    Stats are diffed by key, players by guild ID: changed players are sent
+    whole and departed ones by ID. Playback positions move all the time, so
+    they are kept apart from the players and sent as one small mapping.
+    """
+    changes: dict[str, Any] = {}
+    if stats := {
+        key: value
+        for key, value in new["stats"].items()
+        if old["stats"].get(key) != value
+    }:
+        changes["stats"] = stats
+
+    old_players = {player["guild_id"]: player for player in old["players"]}
+    new_players = {player["guild_id"]: player for player in new["players"]}
+    updated = [
+        player
+        for guild_id, player in new_players.items()
+        if old_players.get(guild_id) != player
+    ]
+    removed = [guild_id for guild_id in old_players if guild_id not in new_players]
+    if updated or removed:
+        changes["players"] = {"updated": updated, "removed": removed}
+    if new["positions"] != old["positions"]:
+        changes["positions"] = new["positions"]
+    return changes
+
+
+class _Client:
+    """A connected dashboard socket and its outgoing message queue."""
+
+    def __init__(self, websocket: WebSocket) -> None:
+        self.websocket = websocket
+        # Set to None once the client is dropped
+        self.queue: asyncio.Queue[str] | None = asyncio.Queue(DASHBOARD_CLIENT_QUEUE)
+
+
+class DashboardBroadcaster:
+    """Shares one dashboard snapshot between every connected socket.
+
+    Player events mark the state dirty; a refresh shortly after builds a
+    single snapshot, diffs it against the previous one and queues the same
+    encoded diff for every client. New clients, and clients asking to
+    resync, get a freshly built full snapshot. Idle sockets get heartbeats,
+    and clients whose queue fills up are disconnected instead of buffering
+    without bound.
+    """
+
+    def __init__(
+        self,
+        app: FastAPI,
+        events: EventBus = EVENTS,
+        debounce: float = DASHBOARD_DEBOUNCE,
+        heartbeat: float = DASHBOARD_HEARTBEAT,
+    ) -> None:
+        """Initialize the broadcaster.
+
+        Args:
+            app: Application whose state holds the bot
+            events: Bus publishing player events
+            debounce: Seconds to gather events into one refresh
+            heartbeat: Seconds of silence before a heartbeat is sent
+        """
+        self.app = app
+        self.debounce = debounce
+        self.heartbeat = heartbeat
+        self.clients: set[_Client] = set()
+        self.seq = 0
+        self._snapshot: dict[str, Any] | None = None
+        self._refresh_task: asyncio.Task | None = None
+        events.subscribe(self._on_event)
+
+    def _on_event(self, event: str, guild_id: int | None) -> None:
+        if not self.clients:
+            self._snapshot = None  # Rebuilt when someone connects
+            return
+        if self._refresh_task is None or self._refresh_task.done():
+            self._refresh_task = asyncio.create_task(self._refresh())
+
+    def _build_snapshot(self) -> dict[str, Any]:
+        bot = self.app.state.bot
+        players = collect_players(bot)
+        positions = {
+            player["guild_id"]: player.pop("position", None) for player in players
+        }
+        return {
+            "stats": collect_stats(bot),
+            "players": players,
+            "positions": positions,
+        }
+
+    def _message(self, kind: str, **data: Any) -> str:
+        return json.dumps({"type": kind, "seq": self.seq, **data})
+
+    async def _refresh(self) -> None:
+        await asyncio.sleep(self.debounce)
+        self._update()
+
+    def _update(self) -> dict[str, Any]:
+        """Build a fresh snapshot and send connected clients what changed."""
+        snapshot = self._build_snapshot()
+        changes = diff_snapshots(self._snapshot, snapshot) if self._snapshot else None
+        self._snapshot = snapshot
+        if changes is None:
+            self.seq += 1
+            self._broadcast(self._message("snapshot", **snapshot))
+        elif changes:
+            self.seq += 1
+            self._broadcast(self._message("diff", **changes))
+        return snapshot
+
+    def _broadcast(self, message: str) -> None:
+        for client in list(self.clients):
+            self._send(client, message)
+
+    def _send(self, client: _Client, message: str) -> None:
+        try:
+            client.queue.put_nowait(message)
+        except asyncio.QueueFull:
+            logger.info("Dropping slow dashboard client")
+            self.clients.discard(client)
+            client.queue = None
+
+    def _send_snapshot(self, client: _Client) -> None:
+        """Send one client a fresh snapshot, and the others what changed."""
+        self.clients.discard(client)
+        snapshot = self._update()
+        self.clients.add(client)
+        self._send(client, self._message("snapshot", **snapshot))
+
+    async def serve(self, websocket: WebSocket) -> None:
+        """Stream dashboard updates to a socket until it disconnects.
+
+        Any message from the client is answered with a full snapshot, for
+        clients that lost track of the diffs.
+        """
+        await websocket.accept()
+        client = _Client(websocket)
+        self._send_snapshot(client)
+
+        writer = asyncio.create_task(self._write(client))
+        try:
+            while not writer.done():
+                await websocket.receive_text()
+                if client in self.clients:
+                    self._send_snapshot(client)
+        except (WebSocketDisconnect, RuntimeError):
+            pass  # Disconnected, or closed by the writer
+        finally:
+            self.clients.discard(client)
+            writer.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await writer
+
+    async def _write(self, client: _Client) -> None:
+        """Send queued messages, heartbeats when idle, until dropped."""
+        try:
+            while (queue := client.queue) is not None:
+                try:
+                    message = await asyncio.wait_for(queue.get(), self.heartbeat)
+                except TimeoutError:
+                    if client.queue is None:
+                        break
+                    message = self._message("heartbeat")
+                await client.websocket.send_text(message)
+            await client.websocket.close(code=1013)  # Try again later
+        except (WebSocketDisconnect, RuntimeError) as e:
+            logger.debug("Dashboard client went away: %s", e)
@@ -22,6 +22,8 @@ except ImportError:
 # Project Imports
 from ...cogs.music import MusicCog  # Adjust path as needed
 from ...utils.cache import TimeCache  # Adjust path as needed
+from ...utils.events import EVENTS
+from ...utils.extraction import ExtractionQueueFullError
 
 router = APIRouter()
 stats_cache = TimeCache(ttl=30)  # Cache stats for 30 seconds
@@ -60,9 +62,7 @@ async def get_stats_api(
     stats = {
         "servers": len(bot.guilds),
         "active_voice": len(music_cog.voice_manager.voice_clients),
-        "total_songs": len(
-            music_cog.playlist_manager.playlist
-        ),  # Assuming global playlist length? Or should be per-player?
+        "total_songs": music_cog.playlists.total_queued(),
         "uptime": uptime_str,
     }
 
@@ -70,6 +70,15 @@ async def get_stats_api(
     return stats
 
 
+@router.get("/loop")
+async def get_loop_lag(request: Request) -> dict[str, Any]:
+    """Get event loop lag statistics and stacks of recent stalls."""
+    loop_monitor = getattr(request.app.state, "loop_monitor", None)
+    if loop_monitor is None:
+        raise HTTPException(status_code=503, detail="Loop monitor not running.")
+    return loop_monitor.snapshot()
+
+
 @router.get("/players")
 async def get_players_api(
     request: Request,
@@ -85,19 +94,16 @@ async def get_players_api(
     for guild_id, voice_client in music_cog.voice_manager.voice_clients.items():
         guild = bot.get_guild(guild_id)
         if guild and voice_client.is_connected():
-            current_song = (
-                music_cog.playlist_manager.current_song
-            )  # Adapt if playlist is per-guild
-            playlist = list(
-                music_cog.playlist_manager.playlist
-            )  # Adapt if playlist is per-guild
+            guild_playlist = music_cog.playlists.peek(guild_id)
+            current_song = guild_playlist.current_song if guild_playlist else None
+            playlist = list(guild_playlist.playlist) if guild_playlist else []
 
             players_data.append(
                 {
                     "guild_name": guild.name,
                     "guild_id": guild_id,
-                    "current_song": current_song["title"] if current_song else None,
-                    "playlist": playlist,  # Include playlist
+                    "current_song": current_song.title if current_song else None,
+                    "playlist": [song.to_dict() for song in playlist],
                     "queue_length": len(playlist),
                     "is_playing": voice_client.is_playing(),
                     "is_paused": voice_client.is_paused(),
@@ -185,15 +191,12 @@ async def control_player(
             if (
                 voice_client.is_playing() or voice_client.is_paused()
             ):  # Allow skipping even if paused
-                current_song = (
-                    music_cog.playlist_manager.current_song
-                )  # Adapt if per-guild
+                guild_playlist = music_cog.playlists.peek(guild_id)
+                current_song = guild_playlist.current_song if guild_playlist else None
                 voice_client.stop()  # Triggers next song potentially
                 message = "Skipped to the next song."
                 song_title = (
-                    f"**{current_song['title']}**"
-                    if current_song
-                    else "the current song"
+                    f"**{current_song.title}**" if current_song else "the current song"
                 )
                 embed_description = f"⏭️ Skipped {song_title} via web UI."
                 success = True
@@ -206,14 +209,14 @@ async def control_player(
         elif action == "stop":
             # This usually implies stop playback and disconnect
             # Ensure this matches your cog's stop logic
+            music_cog.player_manager.cancel_lookahead(guild_id)
             await music_cog.voice_manager.disconnect(guild_id)
-            # Optionally clear the queue here if that's desired behavior for "stop"
-            # music_cog.playlist_manager.clear_queue(guild_id) # If per-guild queue
             message = "Player stopped and disconnected."
             embed_description = "⏹️ Music playback stopped via web UI."
             success = True
 
         if success:
+            EVENTS.publish(action, guild_id)
             # --- Send Discord Embed ---
             if (
                 Embed and Colour and guild and embed_description
@@ -273,6 +276,37 @@ async def control_player(
         )
 
 
+@router.post("/player/{guild_id}/seek")
+async def seek_player(
+    request: Request, guild_id: int, position: float = Form(...)
+) -> JSONResponse:
+    """Jump to a position in seconds in the current song of a guild."""
+    bot = request.app.state.bot
+    music_cog: MusicCog = bot.get_cog("MusicCog")
+
+    if not music_cog:
+        return JSONResponse(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            content={"detail": "Music Cog not loaded."},
+        )
+
+    try:
+        position = await music_cog.player_manager.seek(guild_id, position)
+    except Exception as e:
+        print(f"Error seeking in guild {guild_id}: {e}")
+        return JSONResponse(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            content={"detail": "An internal error occurred while seeking."},
+        )
+
+    if position is None:
+        return JSONResponse(
+            status_code=status.HTTP_404_NOT_FOUND,
+            content={"detail": "Nothing is playing in this server."},
+        )
+    return JSONResponse(content={"position": position})
+
+
 @router.post("/player/add")
 async def add_song(
     request: Request, query: str = Form(...), guild_id: int = Form(...)
@@ -293,7 +327,7 @@ async def add_song(
     try:
         # Get song info (assuming this is async)
         # You might need to pass guild_id if relevant for searching/adding
-        info = await music_cog.player_manager.get_music_info(query)
+        info = await music_cog.player_manager.get_music_info(query, guild_id)
 
         if not info:
             return JSONResponse(
@@ -304,13 +338,10 @@ async def add_song(
                 },
             )
 
-        # Add to queue (assuming add_to_queue handles guild_id if needed)
-        # You might need to adapt this if your playlist is per-guild
-        music_cog.playlist_manager.add_to_queue(
-            info, guild_id=guild_id
-        )  # Pass guild_id if necessary
+        playlist = music_cog.playlists.get(guild_id)
+        playlist.add_to_queue(info)
 
-        response_message = f"Added '{info.get('title', 'song')}' to the queue."
+        response_message = f"Added '{info.title}' to the queue."
         status_message = "success"
 
         if (
@@ -318,18 +349,16 @@ async def add_song(
             and not voice_client.is_playing()
             and not voice_client.is_paused()
         ):
-            # Get next song (potentially for this guild_id)
-            next_song = music_cog.playlist_manager.get_next_song(
-                guild_id=guild_id
-            )  # Pass guild_id if necessary
+            next_song = playlist.get_next_song()
             if next_song:
                 await music_cog.player_manager.play_song(guild_id, next_song)
-                response_message = f"Playing '{next_song.get('title', 'song')}' now."
+                response_message = f"Playing '{next_song.title}' now."
             else:
                 # Added but couldn't get next song? Should not happen if just added.
-                response_message = (
-                    f"Added '{info.get('title', 'song')}', but couldn't start playback."
-                )
+                response_message = f"Added '{info.title}', but couldn't start playback."
+        elif voice_client:
+            music_cog.player_manager.refresh_lookahead(guild_id)
+        EVENTS.publish("queue", guild_id)
 
         # Send feedback embed (similar to control_player)
         if Embed and Colour:
@@ -364,6 +393,14 @@ async def add_song(
             content={"status": status_message, "message": response_message},
         )
 
+    except ExtractionQueueFullError:
+        return JSONResponse(
+            status_code=503,
+            content={
+                "status": "error",
+                "message": "Too many songs are being looked up, try again soon.",
+            },
+        )
     except Exception as e:
         print(
             f"Error adding song (query: {query}, guild: {guild_id}): {e}"
@@ -52,14 +52,9 @@ async def get_stats_component(request: Request):
 
 @router.websocket("/ws")
 async def websocket_endpoint(websocket: WebSocket):
-    """WebSocket endpoint for real-time updates."""
-    await websocket.accept()
-    try:
-        while True:
-            await websocket.receive_text()
-            # Send updates about player status
-            stats = await get_stats(websocket)
-            players = await get_players(websocket)
-            await websocket.send_json({"stats": stats, "players": players})
-    except Exception:
-        await websocket.close()
+    """WebSocket endpoint for real-time updates.
+
+    Sends a full snapshot on connect, then only the changes as player
+    events happen.
+    """
+    await websocket.app.state.dashboard.serve(websocket)
@@ -1,6 +1,6 @@
 document.addEventListener('DOMContentLoaded', () => {
-    // WebSocket setup
-    // setupWebSocket(); // Consider if WS is still needed with polling, or enhance it
+    // Refresh components as soon as the bot reports a change
+    setupWebSocket();
 
     // Set up auto-refresh for components using polling
     setupAutoRefresh();
@@ -271,10 +271,34 @@ function createToastContainer() {
 }
 
 
-// NOTE: WebSocket code removed for brevity as the focus shifted to polling/HTMX,
-// but can be added back if real-time updates beyond polling are needed.
-// function setupWebSocket() { ... }
-// function updateUI(data) { ... }
+// Polling stays as the fallback; the socket only makes updates arrive sooner.
+function setupWebSocket() {
+    const playersContainer = document.getElementById('players-container');
+    const statsContainer = document.getElementById('stats-container');
+    if (!playersContainer && !statsContainer) {
+        return;
+    }
+
+    const protocol = window.location.protocol === 'https:' ? 'wss:' : 'ws:';
+    const socket = new WebSocket(`${protocol}//${window.location.host}/ws`);
+
+    socket.addEventListener('message', (event) => {
+        const message = JSON.parse(event.data);
+        if (message.type === 'heartbeat') {
+            return;
+        }
+        // Snapshots and diffs only say what changed; the server renders the HTML
+        if (playersContainer && (message.players || message.positions)) {
+            htmx.ajax('GET', '/components/players', { target: playersContainer, swap: 'innerHTML' });
+        }
+        if (statsContainer && message.stats) {
+            htmx.ajax('GET', '/components/stats', { target: statsContainer, swap: 'innerHTML' });
+        }
+    });
+
+    // Reconnect after a short delay, e.g. when the bot restarts
+    socket.addEventListener('close', () => setTimeout(setupWebSocket, 5000));
+}
 
 
 // Add loading indicators (using HTMX events) - Optional visual flair
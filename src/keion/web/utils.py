@@ -1,9 +1,9 @@
 """Utility functions for web interface."""
 
-import collections
 from datetime import UTC, datetime  # Added timezone
 from typing import Any
 
+from discord.ext.commands import Bot
 from fastapi import Request, WebSocket
 
 # Adjust import path based on your project structure
@@ -50,8 +50,11 @@ async def get_stats(req_or_ws: Request | WebSocket) -> dict[str, Any]:
     Returns:
         Dictionary containing bot statistics
     """
-    # Get bot instance from app state
-    bot = req_or_ws.app.state.bot
+    return collect_stats(req_or_ws.app.state.bot)
+
+
+def collect_stats(bot: Bot) -> dict[str, Any]:
+    """Get bot statistics from the bot instance."""
     music_cog: MusicCog = bot.get_cog("MusicCog")
 
     if not music_cog:
@@ -68,28 +71,21 @@ async def get_stats(req_or_ws: Request | WebSocket) -> dict[str, Any]:
     start_time = getattr(bot, "start_time", None)  # Use None if not set
     uptime_str = format_uptime(start_time)
 
-    # Assuming a global playlist for total_songs. Adapt if per-guild.
-    total_songs_in_queues = 0
-    if hasattr(music_cog.playlist_manager, "get_total_queued_count"):
-        total_songs_in_queues = music_cog.playlist_manager.get_total_queued_count()
-    elif hasattr(music_cog.playlist_manager, "playlist"):
-        # Fallback: Check if it's a single global queue (like deque)
-        if isinstance(
-            music_cog.playlist_manager.playlist, (list | type(collections.deque()))
-        ):
-            total_songs_in_queues = len(music_cog.playlist_manager.playlist)
-
     return {
         "servers": len(bot.guilds),
         "active_voice": len(music_cog.voice_manager.voice_clients),
-        "total_songs": total_songs_in_queues,  # Sum of songs across all queues
+        "total_songs": music_cog.playlists.total_queued(),
         "uptime": uptime_str,
     }
 
 
 async def get_players(req_or_ws: Request | WebSocket) -> list[dict[str, Any]]:
     """Get all active music players, including their full playlists."""
-    bot = req_or_ws.app.state.bot
+    return collect_players(req_or_ws.app.state.bot)
+
+
+def collect_players(bot: Bot) -> list[dict[str, Any]]:
+    """Get all active music players from the bot instance."""
     music_cog: MusicCog = bot.get_cog("MusicCog")
 
     if not music_cog:
@@ -99,34 +95,32 @@ async def get_players(req_or_ws: Request | WebSocket) -> list[dict[str, Any]]:
     for guild_id, voice_client in music_cog.voice_manager.voice_clients.items():
         guild = bot.get_guild(guild_id)
         if guild and voice_client.is_connected():
+            guild_playlist = music_cog.playlists.peek(guild_id)
             # Get current song
-            current_song = music_cog.playlist_manager.current_song
+            current_song = guild_playlist.current_song if guild_playlist else None
 
             # Get playlist - ensure it returns a serializable format
-            playlist = []
-            for (
-                song
-            ) in music_cog.playlist_manager.get_queue_songs():  # Use the new method
-                if isinstance(song, dict):
-                    playlist.append(
-                        {
-                            "title": song.get("title", "Unknown"),
-                            "duration": song.get("duration", 0),
-                            "requester": song.get("requester", "Unknown"),
-                        }
-                    )
+            playlist = [
+                {
+                    "title": song.title,
+                    "duration": song.duration or 0,
+                    "requester": "Unknown",
+                }
+                for song in (guild_playlist.get_queue_songs() if guild_playlist else [])
+            ]
 
             players.append(
                 {
                     "guild_name": guild.name,
                     "guild_id": guild_id,
                     "current_song_title": (
-                        current_song.get("title", "Unknown") if current_song else None
+                        current_song.title if current_song else None
                     ),
                     "playlist": playlist,
                     "queue_length": len(playlist),
                     "is_playing": voice_client.is_playing(),
                     "is_paused": voice_client.is_paused(),
+                    "position": music_cog.player_manager.get_position(guild_id),
                 }
             )
 
@@ -12,6 +12,7 @@ from discord.ext import commands
 
 from keion.cogs.music import MusicCog
 from keion.utils.logging import setup_logging
+from keion.utils.loop_monitor import LoopLagMonitor
 from keion.web.app import app
 
 # Initialize logger
@@ -41,6 +42,11 @@ async def lifespan(app):
     bot = create_bot()
     app.state.bot = bot  # Store bot instance in app state
 
+    # The bot and the web server share this loop, so watch it for stalls
+    loop_monitor = LoopLagMonitor()
+    loop_monitor.start()
+    app.state.loop_monitor = loop_monitor
+
     # Register the music cog
     await bot.add_cog(MusicCog(bot))
 
@@ -55,6 +61,7 @@ async def lifespan(app):
     # Cleanup
     if not bot.is_closed():
         await bot.close()
+    await loop_monitor.stop()
 
 
 app.router.lifespan_context = lifespan
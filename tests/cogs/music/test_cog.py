@@ -1,4 +1,78 @@
 """Tests for the MusicCog commands."""
 
-# TODO: Add tests for play, skip, pause, resume, stop, queue, loop commands
-# Need to mock Context, VoiceClient, Managers, etc.
+from unittest.mock import MagicMock
+
+import pytest
+from discord import VoiceClient
+from discord.ext.commands import Context
+
+from keion.cogs.music.cog import MusicCog
+from keion.utils.events import EVENTS
+from keion.utils.track import Track
+
+# TODO: Add tests for play, skip, resume, stop, queue, loop commands
+
+GUILD_ID = 123
+
+
+@pytest.fixture
+def cog(monkeypatch):
+    monkeypatch.setenv("SPOTIFY_CLIENT_ID", "id")
+    monkeypatch.setenv("SPOTIFY_CLIENT_SECRET", "secret")
+    return MusicCog(MagicMock())
+
+
+@pytest.fixture
+def context():
+    context = MagicMock(spec=Context)
+    context.guild.id = GUILD_ID
+    return context
+
+
+@pytest.fixture
+def events():
+    published = []
+    unsubscribe = EVENTS.subscribe(lambda event, guild_id: published.append(event))
+    yield published
+    unsubscribe()
+
+
+@pytest.mark.asyncio
+async def test_pause_publishes_event(cog, context, events):
+    voice_client = MagicMock(spec=VoiceClient)
+    voice_client.is_playing.return_value = True
+    cog.voice_manager.voice_clients[GUILD_ID] = voice_client
+
+    await cog.pause.callback(cog, context)
+
+    voice_client.pause.assert_called_once()
+    assert events == ["pause"]
+
+
+@pytest.mark.asyncio
+async def test_pause_nothing_playing_publishes_nothing(cog, context, events):
+    await cog.pause.callback(cog, context)
+
+    context.send.assert_called_once()
+    assert events == []
+
+
+@pytest.mark.asyncio
+async def test_shuffle_publishes_queue_event(cog, context, events):
+    playlist = cog.playlists.get(GUILD_ID)
+    for i in range(3):
+        playlist.add_to_queue(
+            Track(id=str(i), title=f"Song {i}", webpage_url=f"https://example.com/{i}")
+        )
+
+    await cog.shuffle.callback(cog, context)
+
+    assert events == ["queue"]
+
+
+@pytest.mark.asyncio
+async def test_remove_missing_position_publishes_nothing(cog, context, events):
+    await cog.remove.callback(cog, context, 1)
+
+    context.send.assert_called_once()
+    assert events == []
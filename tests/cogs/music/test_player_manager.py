@@ -1,4 +1,192 @@
 """Tests for the PlayerManager."""
 
-# TODO: Add tests for get_music_info (including Spotify), play_song, _handle_song_finished
-# Need to mock Bot, Managers, yt_dlp, SpotifyClient, FFmpegOpusAudio, etc.
+from dataclasses import replace
+from unittest.mock import AsyncMock, MagicMock, PropertyMock, patch
+
+import pytest
+from yt_dlp.utils import DownloadError
+
+from keion.cogs.music.player_manager import (
+    PlayerManager,
+    is_youtube_playlist,
+    parse_timestamp,
+)
+from keion.cogs.music.playlist_manager import PlaylistRegistry
+from keion.utils.ffmpeg_governor import GovernedOpusAudio
+from keion.utils.track import Track
+
+GUILD_ID = 1
+
+
+@pytest.fixture
+def player_manager(monkeypatch) -> PlayerManager:
+    """A PlayerManager with a fake bot and voice manager."""
+    monkeypatch.setenv("SPOTIFY_CLIENT_ID", "id")
+    monkeypatch.setenv("SPOTIFY_CLIENT_SECRET", "secret")
+    voice_manager = MagicMock(
+        voice_clients={GUILD_ID: MagicMock()},
+        text_channels={GUILD_ID: 2},
+        start_inactivity_timer=AsyncMock(),
+    )
+    bot = MagicMock()
+    bot.get_channel.return_value.send = AsyncMock()
+    manager = PlayerManager(bot, PlaylistRegistry(), voice_manager)
+    monkeypatch.setattr(manager, "_create_source", AsyncMock())
+    return manager
+
+
+def make_track(track_id: str) -> Track:
+    return Track(
+        id=track_id,
+        title=f"Song {track_id}",
+        webpage_url=f"https://www.youtube.com/watch?v={track_id}",
+        loudness=-14.0,  # Known, so nothing is measured in the background
+    )
+
+
+@pytest.mark.parametrize(
+    ("value", "expected"),
+    [("90", 90), ("1:30", 90), ("1:02:03", 3723), (" 0:07.5 ", 7.5)],
+)
+def test_parse_timestamp(value: str, expected: float):
+    """Test parsing seek positions."""
+    assert parse_timestamp(value) == expected
+
+
+@pytest.mark.parametrize("value", ["", "-5", "1:2:3:4", "abc", "1:"])
+def test_parse_timestamp_rejects_invalid(value: str):
+    """Test that malformed seek positions are rejected."""
+    with pytest.raises(ValueError, match="Invalid timestamp"):
+        parse_timestamp(value)
+
+
+@pytest.mark.parametrize(
+    "url",
+    [
+        "https://www.youtube.com/playlist?list=PL123",
+        "https://m.youtube.com/watch?v=X&list=PL123&index=2",
+        "https://music.youtube.com/watch?v=X&list=OLAK5uy_123",
+        "https://youtu.be/X?list=PL123",
+    ],
+)
+def test_is_youtube_playlist(url: str):
+    """Test that YouTube URLs with a playlist are recognized."""
+    assert is_youtube_playlist(url)
+
+
+@pytest.mark.parametrize(
+    "url",
+    [
+        "https://www.youtube.com/watch?v=X",
+        "https://youtu.be/X",
+        "https://www.youtube.com/watch?v=X&list=",
+        "https://www.youtube.com/watch?v=X&list=RDX",
+        "https://music.youtube.com/watch?v=X&list=RDAMVMX",
+        "https://example.com/watch?v=X&list=PL123",
+        "some song name",
+    ],
+)
+def test_is_youtube_playlist_rejects_single_videos(url: str):
+    """Test that single videos, mixes and other URLs are not playlists."""
+    assert not is_youtube_playlist(url)
+
+
+@pytest.mark.asyncio
+async def test_warm_up_waits_out_pauses(player_manager: PlayerManager):
+    """Test that the next source is not opened early after a pause."""
+    playlist = player_manager.playlists.get(GUILD_ID)
+    playlist.current_song = replace(make_track("now"), duration=10)
+    upcoming = make_track("next").with_stream("http://example.com/next.mp3")
+    playlist.add_to_queue(upcoming)
+    source = MagicMock(spec=GovernedOpusAudio)
+    # Paused at 9.99s for two checks, then played to the end
+    type(source).position = position = PropertyMock(side_effect=[9.99, 9.99, 10.0])
+    player_manager.voice_manager.voice_clients[GUILD_ID].source = source
+
+    with (
+        patch("keion.cogs.music.player_manager.LOOKAHEAD_WARM_SECONDS", 0),
+        patch("keion.cogs.music.player_manager.asyncio.sleep") as sleep,
+    ):
+        player_manager.refresh_lookahead(GUILD_ID)
+        prepared = player_manager._prepared[GUILD_ID]
+        await prepared.task
+
+    assert position.call_count == 3
+    # Polled at the minimum interval, not every 10ms left in the track
+    assert [call.args[0] for call in sleep.await_args_list] == [1.0, 1.0]
+    assert prepared.resolved is upcoming
+    assert prepared.source is player_manager._create_source.return_value
+
+
+@pytest.mark.asyncio
+async def test_play_song_skips_tracks_that_fail_to_resolve(
+    player_manager: PlayerManager,
+):
+    """Test that a track that cannot be resolved is skipped, not fatal."""
+    broken, good = make_track("broken"), make_track("good")
+
+    async def resolve_stream(track: Track, *_) -> Track:
+        if track is broken:
+            raise DownloadError("Video unavailable")
+        return track
+
+    player_manager.resolve_stream = AsyncMock(side_effect=resolve_stream)
+    playlist = player_manager.playlists.get(GUILD_ID)
+    playlist.add_to_queue(broken)
+    playlist.add_to_queue(good)
+
+    assert await player_manager.play_song(GUILD_ID, playlist.get_next_song())
+
+    assert playlist.current_song is good
+    player_manager.voice_manager.voice_clients[GUILD_ID].play.assert_called_once()
+    channel = player_manager.bot.get_channel.return_value
+    assert "Song broken" in channel.send.await_args_list[0].args[0]
+
+
+@pytest.mark.asyncio
+async def test_play_song_goes_idle_when_nothing_is_playable(
+    player_manager: PlayerManager,
+):
+    """Test that the inactivity timer starts once the queue runs out."""
+    player_manager.resolve_stream = AsyncMock(
+        side_effect=DownloadError("Private video")
+    )
+    playlist = player_manager.playlists.get(GUILD_ID)
+    playlist.loop_queue = True
+    playlist.add_to_queue(make_track("private"))
+
+    assert not await player_manager.play_song(GUILD_ID, playlist.get_next_song())
+
+    assert playlist.current_song is None
+    player_manager.voice_manager.voice_clients[GUILD_ID].play.assert_not_called()
+    player_manager.voice_manager.start_inactivity_timer.assert_awaited_once_with(
+        GUILD_ID
+    )
+
+
+@pytest.mark.parametrize(
+    ("url", "expected"),
+    [
+        ("https://www.youtube.com/playlist?list=PL1", ["a", "c", "e"]),
+        ("https://www.youtube.com/watch?v=c&list=PL1&index=3", ["c", "e"]),
+        ("https://youtu.be/e?list=PL1", ["e"]),
+        ("https://www.youtube.com/watch?v=gone&list=PL1&index=2", ["c", "e"]),
+    ],
+)
+@pytest.mark.asyncio
+async def test_playlist_starts_at_linked_video(
+    player_manager: PlayerManager, url: str, expected: list[str]
+):
+    """Test that playlists skip dead entries and start at the linked video."""
+    entries = [
+        {"id": "a", "title": "A"},
+        {"id": "b", "title": "[Private video]"},
+        {"id": "c", "title": "C"},
+        {"id": "d", "title": "[Deleted video]"},
+        {"id": "e", "title": "E"},
+    ]
+    player_manager._extract = AsyncMock(return_value={"entries": entries})
+
+    tracks = await player_manager.get_playlist_tracks(url, GUILD_ID)
+
+    assert [track.id for track in tracks] == expected
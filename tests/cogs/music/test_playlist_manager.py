@@ -1,6 +1,7 @@
 import pytest
 
-from keion.cogs.music.playlist_manager import PlaylistManager
+from keion.cogs.music.playlist_manager import PlaylistManager, PlaylistRegistry
+from keion.utils.track import Track
 
 
 @pytest.fixture
@@ -11,7 +12,7 @@ def playlist_manager():
 
 def test_add_to_queue(playlist_manager: PlaylistManager):
     """Test adding a song to the queue."""
-    song_info = {"title": "Test Song", "url": "http://example.com"}
+    song_info = Track(id="0", title="Test Song", webpage_url="http://example.com")
     playlist_manager.add_to_queue(song_info)
     assert len(playlist_manager.playlist) == 1
     assert playlist_manager.playlist[0] == song_info
@@ -19,7 +20,7 @@ def test_add_to_queue(playlist_manager: PlaylistManager):
 
 def test_clear_queue(playlist_manager: PlaylistManager):
     """Test clearing the queue."""
-    song_info = {"title": "Test Song", "url": "http://example.com"}
+    song_info = Track(id="0", title="Test Song", webpage_url="http://example.com")
     playlist_manager.add_to_queue(song_info)
     playlist_manager.current_song = song_info
     playlist_manager.clear_queue()
@@ -35,8 +36,8 @@ def test_get_next_song_empty(playlist_manager: PlaylistManager):
 
 def test_get_next_song(playlist_manager: PlaylistManager):
     """Test getting the next song from the queue."""
-    song1 = {"title": "Song 1", "url": "http://example.com/1"}
-    song2 = {"title": "Song 2", "url": "http://example.com/2"}
+    song1 = Track(id="1", title="Song 1", webpage_url="http://example.com/1")
+    song2 = Track(id="2", title="Song 2", webpage_url="http://example.com/2")
     playlist_manager.add_to_queue(song1)
     playlist_manager.add_to_queue(song2)
 
@@ -60,8 +61,8 @@ def test_skip_current_empty(playlist_manager: PlaylistManager):
 
 def test_skip_current_with_queue(playlist_manager: PlaylistManager):
     """Test skipping the current song when others are in queue."""
-    song1 = {"title": "Song 1", "url": "http://example.com/1"}
-    song2 = {"title": "Song 2", "url": "http://example.com/2"}
+    song1 = Track(id="1", title="Song 1", webpage_url="http://example.com/1")
+    song2 = Track(id="2", title="Song 2", webpage_url="http://example.com/2")
     playlist_manager.add_to_queue(song1)
     playlist_manager.add_to_queue(song2)
     playlist_manager.current_song = playlist_manager.get_next_song()  # song1 is current
@@ -94,7 +95,7 @@ def test_toggle_loop_song(playlist_manager: PlaylistManager):
 
 def test_song_finished_no_loop(playlist_manager: PlaylistManager):
     """Test song finished logic without looping."""
-    song1 = {"title": "Song 1", "url": "http://example.com/1"}
+    song1 = Track(id="1", title="Song 1", webpage_url="http://example.com/1")
     playlist_manager.add_to_queue(song1)
     playlist_manager.current_song = playlist_manager.get_next_song()  # song1 is current
 
@@ -105,7 +106,7 @@ def test_song_finished_no_loop(playlist_manager: PlaylistManager):
 
 def test_song_finished_loop_song(playlist_manager: PlaylistManager):
     """Test song finished logic with song loop enabled."""
-    song1 = {"title": "Song 1", "url": "http://example.com/1"}
+    song1 = Track(id="1", title="Song 1", webpage_url="http://example.com/1")
     playlist_manager.add_to_queue(song1)
     playlist_manager.current_song = playlist_manager.get_next_song()  # song1 is current
     playlist_manager.toggle_loop_song()
@@ -117,8 +118,8 @@ def test_song_finished_loop_song(playlist_manager: PlaylistManager):
 
 def test_song_finished_loop_queue(playlist_manager: PlaylistManager):
     """Test song finished logic with queue loop enabled."""
-    song1 = {"title": "Song 1", "url": "http://example.com/1"}
-    song2 = {"title": "Song 2", "url": "http://example.com/2"}
+    song1 = Track(id="1", title="Song 1", webpage_url="http://example.com/1")
+    song2 = Track(id="2", title="Song 2", webpage_url="http://example.com/2")
     playlist_manager.add_to_queue(song1)
     playlist_manager.add_to_queue(song2)
     playlist_manager.toggle_loop_queue()  # Enable loop, backup created [song1, song2]
@@ -137,3 +138,62 @@ def test_song_finished_loop_queue(playlist_manager: PlaylistManager):
     assert next_song == song1  # Queue restored from backup, next is song1
     assert playlist_manager.current_song == song1  # Current is song1
     assert len(playlist_manager.playlist) == 1  # playlist is now [song2]
+
+
+def test_peek_next_songs(playlist_manager: PlaylistManager):
+    """Test peeking at upcoming songs without modifying the queue."""
+    song1 = Track(id="1", title="Song 1", webpage_url="http://example.com/1")
+    song2 = Track(id="2", title="Song 2", webpage_url="http://example.com/2")
+    playlist_manager.add_to_queue(song1)
+    playlist_manager.add_to_queue(song2)
+
+    assert playlist_manager.peek_next_songs(1) == [song1]
+    assert playlist_manager.peek_next_songs(5) == [song1, song2]
+    assert len(playlist_manager.playlist) == 2
+
+    playlist_manager.get_next_song()
+    playlist_manager.toggle_loop_song()
+    assert playlist_manager.peek_next_songs(3) == [song1]
+
+
+def test_registry_isolates_guilds():
+    """Test that each guild gets its own independent playlist."""
+    registry = PlaylistRegistry()
+    song = Track(id="1", title="Song 1", webpage_url="http://example.com/1")
+
+    registry.get(1).add_to_queue(song)
+    registry.get(2).toggle_loop_queue()
+
+    assert list(registry.get(1).playlist) == [song]
+    assert not registry.get(2).playlist
+    assert not registry.get(1).loop_queue
+    assert registry.total_queued() == 1
+
+
+def test_registry_peek_and_discard():
+    """Test that peeking does not create state and discarding drops it."""
+    registry = PlaylistRegistry()
+    assert registry.peek(1) is None
+    assert len(registry) == 0
+
+    playlist = registry.get(1)
+    assert registry.peek(1) is playlist
+
+    registry.discard(1)
+    registry.discard(1)  # Discarding twice is harmless
+    assert registry.peek(1) is None
+    assert len(registry) == 0
+
+
+def test_remove_song_drops_it_from_loop(playlist_manager: PlaylistManager):
+    """Test that a removed song does not come back when the queue loops."""
+    song1 = Track(id="1", title="Song 1", webpage_url="http://example.com/1")
+    song2 = Track(id="2", title="Song 2", webpage_url="http://example.com/2")
+    playlist_manager.add_to_queue(song1)
+    playlist_manager.add_to_queue(song2)
+    playlist_manager.toggle_loop_queue()
+
+    assert playlist_manager.remove_song(2) == song2
+    assert song2 not in playlist_manager.backup
+    with pytest.raises(IndexError):
+        playlist_manager.remove_song(0)
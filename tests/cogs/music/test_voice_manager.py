@@ -1,11 +1,14 @@
+import asyncio
 from unittest.mock import AsyncMock, MagicMock
 
 import pytest
-from discord import VoiceClient
+from discord import VoiceClient, VoiceState
 from discord.ext.commands import CommandError, Context
 
 from keion.cogs.music.voice_manager import VoiceManager
 
+GUILD_ID = 123
+
 
 @pytest.fixture
 def voice_manager():
@@ -60,3 +63,170 @@ async def test_disconnect():
 
     voice_client.disconnect.assert_called_once()
     assert guild_id not in vm.voice_clients
+
+
+@pytest.mark.asyncio
+async def test_disconnect_notifies_callbacks():
+    """Test that disconnecting runs the registered disconnect callbacks."""
+    vm = VoiceManager()
+    callback = MagicMock()
+    vm.register_disconnect_callback(callback)
+    vm.voice_clients[GUILD_ID] = AsyncMock(spec=VoiceClient)
+
+    await vm.disconnect(GUILD_ID)
+
+    callback.assert_called_once_with(GUILD_ID)
+
+
+@pytest.mark.asyncio
+async def test_bot_removed_from_channel_notifies_callbacks():
+    """Test that the bot being disconnected externally drops its state."""
+    vm = VoiceManager()
+    callback = MagicMock()
+    vm.register_disconnect_callback(callback)
+    vm.voice_clients[GUILD_ID] = AsyncMock(spec=VoiceClient)
+
+    member = MagicMock()
+    member.guild.id = GUILD_ID
+    member.id = member.guild.me.id
+    after = MagicMock()
+    after.channel = None
+
+    await vm.handle_voice_state_update(member, MagicMock(), after)
+
+    callback.assert_called_once_with(GUILD_ID)
+    assert GUILD_ID not in vm.voice_clients
+
+
+def _connecting_context(connect: AsyncMock) -> MagicMock:
+    context = MagicMock(spec=Context)
+    context.voice_client = None
+    context.guild.id = GUILD_ID
+    context.author.voice.channel.connect = connect
+    return context
+
+
+@pytest.mark.asyncio
+async def test_connect_while_overlaps_work():
+    """Test that the voice handshake runs alongside the lookup."""
+    vm = VoiceManager()
+    handshake = asyncio.Event()
+    voice_client = MagicMock(spec=VoiceClient)
+
+    async def connect():
+        await handshake.wait()
+        return voice_client
+
+    async def lookup():
+        # Only finishes if the handshake is already under way
+        await asyncio.sleep(0)
+        handshake.set()
+        return "track"
+
+    context = _connecting_context(AsyncMock(side_effect=connect))
+
+    assert await vm.connect_while(context, lookup()) == "track"
+    assert vm.voice_clients[GUILD_ID] is voice_client
+
+
+@pytest.mark.asyncio
+async def test_connect_while_cancels_work_on_connect_failure():
+    """Test that a failed connection abandons the lookup."""
+    vm = VoiceManager()
+    lookup = asyncio.Event()
+    context = _connecting_context(AsyncMock(side_effect=CommandError("no")))
+
+    with pytest.raises(CommandError):
+        await vm.connect_while(context, lookup.wait())
+    assert GUILD_ID not in vm.voice_clients
+
+
+@pytest.mark.asyncio
+async def test_connect_while_idles_after_failed_work():
+    """Test that a connection left unused by a failed lookup times out."""
+    vm = VoiceManager()
+    voice_client = MagicMock(spec=VoiceClient)
+    voice_client.is_playing.return_value = False
+    voice_client.is_paused.return_value = False
+    context = _connecting_context(AsyncMock(return_value=voice_client))
+
+    async def lookup():
+        raise LookupError
+
+    with pytest.raises(LookupError):
+        await vm.connect_while(context, lookup())
+
+    assert GUILD_ID in vm.inactivity_timers
+    vm.inactivity_timers.cancel(GUILD_ID)
+
+
+@pytest.mark.asyncio
+async def test_concurrent_connects_share_one_handshake():
+    """Test that two commands racing to connect only connect once."""
+    vm = VoiceManager()
+    connect = AsyncMock(return_value=MagicMock(spec=VoiceClient))
+    context = _connecting_context(connect)
+
+    started = await asyncio.gather(vm.connect(context), vm.connect(context))
+
+    assert sorted(started) == [False, True]
+    connect.assert_awaited_once()
+
+
+def _voice_state(channel, deaf: bool = False) -> MagicMock:
+    state = MagicMock(spec=VoiceState)
+    state.channel = channel
+    state.deaf = False
+    state.self_deaf = deaf
+    return state
+
+
+@pytest.mark.asyncio
+async def test_last_listener_leaving_pauses_then_returning_resumes():
+    """Test the auto-pause when the bot is left without listeners."""
+    vm = VoiceManager()
+    channel = MagicMock()
+    listener = MagicMock(bot=False)
+    listener.guild.id = GUILD_ID
+    listener.voice = _voice_state(channel)
+    channel.members = [listener]
+    voice_client = MagicMock(spec=VoiceClient)
+    voice_client.channel = channel
+    voice_client.is_playing.return_value = True
+    vm.voice_clients[GUILD_ID] = voice_client
+    assert vm.count_listeners(GUILD_ID) == 1
+
+    # Deafening counts as leaving
+    await vm.handle_voice_state_update(
+        listener, _voice_state(channel), _voice_state(channel, deaf=True)
+    )
+    assert vm.count_listeners(GUILD_ID) == 0
+    voice_client.pause.assert_called_once()
+    assert GUILD_ID in vm.alone_timers
+
+    voice_client.is_paused.return_value = True
+    await vm.handle_voice_state_update(
+        listener, _voice_state(channel, deaf=True), _voice_state(channel)
+    )
+    assert vm.count_listeners(GUILD_ID) == 1
+    voice_client.resume.assert_called_once()
+    assert GUILD_ID not in vm.alone_timers
+
+
+@pytest.mark.asyncio
+async def test_updates_in_other_channels_are_ignored():
+    """Test that members elsewhere in the guild do not change the count."""
+    vm = VoiceManager()
+    voice_client = MagicMock(spec=VoiceClient)
+    voice_client.channel = MagicMock(members=[])
+    vm.voice_clients[GUILD_ID] = voice_client
+    vm.listeners[GUILD_ID] = 1
+    member = MagicMock(bot=False)
+    member.guild.id = GUILD_ID
+
+    await vm.handle_voice_state_update(
+        member, _voice_state(None), _voice_state(MagicMock())
+    )
+
+    assert vm.count_listeners(GUILD_ID) == 1
+    voice_client.pause.assert_not_called()
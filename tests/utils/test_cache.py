@@ -0,0 +1,128 @@
+"""Tests for the SongCache."""
+
+import asyncio
+
+from keion.utils.cache import SearchCache, SongCache, StreamURLCache, estimate_size
+
+
+def test_get_miss_and_hit():
+    """Test cache hits and misses are counted."""
+    cache = SongCache()
+    assert cache.get("http://example.com/1") is None
+    cache.add("http://example.com/1", {"title": "Song 1"})
+    assert cache.get("http://example.com/1") == {"title": "Song 1"}
+    assert cache.hits == 1
+    assert cache.misses == 1
+
+
+def test_evicts_least_recently_used():
+    """Test that the least recently used entry is evicted first."""
+    cache = SongCache(max_size=2)
+    cache.add("a", {"title": "A"})
+    cache.add("b", {"title": "B"})
+    cache.get("a")  # "b" is now least recently used
+    cache.add("c", {"title": "C"})
+
+    assert "a" in cache
+    assert "b" not in cache
+    assert "c" in cache
+    assert cache.evictions == 1
+
+
+def test_peek_leaves_stats_and_order_alone():
+    """Test that peeking neither counts a lookup nor refreshes an entry."""
+    cache = SongCache(max_size=2)
+    cache.add("a", {"title": "A"})
+    cache.add("b", {"title": "B"})
+
+    assert cache.peek("a") == {"title": "A"}
+    assert cache.peek("missing") is None
+    cache.add("c", {"title": "C"})
+
+    assert "a" not in cache  # still least recently used
+    assert cache.hits == 0
+    assert cache.misses == 0
+
+
+def test_byte_budget():
+    """Test that entries are evicted to stay within the byte budget."""
+    info = {"title": "x" * 1000}
+    size = estimate_size(info)
+    cache = SongCache(max_bytes=size * 2)
+    cache.add("a", info)
+    cache.add("b", {"title": "y" * 1000})
+    cache.add("c", {"title": "z" * 1000})
+
+    assert len(cache) == 2
+    assert "a" not in cache
+    assert cache.total_bytes <= cache.max_bytes
+
+
+def test_oversized_entry_not_cached():
+    """Test that an entry larger than the whole budget is skipped."""
+    cache = SongCache(max_bytes=10)
+    cache.add("a", {"title": "Song"})
+    assert len(cache) == 0
+    assert cache.total_bytes == 0
+
+
+def test_replace_updates_size():
+    """Test that re-adding a key replaces the entry and its size."""
+    cache = SongCache()
+    cache.add("a", {"title": "x" * 1000})
+    cache.add("a", {"title": "y"})
+    assert len(cache) == 1
+    assert cache.total_bytes == estimate_size({"title": "y"})
+
+
+def test_expired_entries(monkeypatch):
+    """Test TTL expiry on lookup and during sweeps."""
+    now = [1000.0]
+    monkeypatch.setattr("keion.utils.cache.time.monotonic", lambda: now[0])
+    cache = SongCache(ttl=10)
+    cache.add("a", {"title": "A"})
+    cache.add("b", {"title": "B"})
+
+    now[0] += 5
+    cache.get("b")
+    now[0] += 6  # "a" is expired, "b" is not
+
+    assert cache.sweep() == 1
+    assert "a" not in cache
+    assert cache.get("b") == {"title": "B"}
+
+    now[0] += 11
+    assert cache.get("b") is None
+    assert cache.total_bytes == 0
+
+
+async def test_background_sweeper():
+    """Test that the background sweeper can be started and stopped."""
+    cache = SongCache(ttl=0, sweep_interval=0.01)
+    cache.add("a", {"title": "A"})
+    cache.start_sweeper()
+    await asyncio.sleep(0.05)
+    assert len(cache) == 0
+    await cache.stop_sweeper()
+
+
+def test_stream_url_cache_validity(monkeypatch):
+    """Test stream URLs are only returned while valid long enough."""
+    monkeypatch.setattr("keion.utils.cache.time.time", lambda: 1000.0)
+    cache = StreamURLCache()
+    cache.add("a", "http://example.com/a", 1600.0, "opus")
+    cache.add("b", "http://example.com/b", None)
+
+    assert cache.get("a", valid_for=300) == ("http://example.com/a", 1600.0, "opus")
+    assert cache.get("b", valid_for=10**9) == ("http://example.com/b", None, None)
+    assert cache.get("a", valid_for=900) is None
+    assert len(cache) == 1
+
+
+def test_search_cache_defaults():
+    """Test that the search cache has its own limits and maps queries to URLs."""
+    cache = SearchCache(max_size=1)
+    cache.add("never gonna give you up", "https://www.youtube.com/watch?v=a")
+    cache.add("k on fuwa fuwa time", "https://www.youtube.com/watch?v=b")
+    assert cache.get("never gonna give you up") is None
+    assert cache.get("k on fuwa fuwa time") == "https://www.youtube.com/watch?v=b"
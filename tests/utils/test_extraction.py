@@ -0,0 +1,170 @@
+"""Tests for the ExtractionScheduler."""
+
+import asyncio
+import threading
+
+import pytest
+
+from keion.utils.extraction import (
+    ExtractionQueueFullError,
+    ExtractionScheduler,
+    Priority,
+    SingleFlight,
+    YoutubeDLPool,
+    normalize_query,
+)
+
+
+@pytest.fixture
+async def scheduler():
+    """Fixture for a single-worker ExtractionScheduler."""
+    scheduler = ExtractionScheduler(max_workers=1, max_pending=4)
+    yield scheduler
+    scheduler.shutdown()
+
+
+async def test_run_returns_result(scheduler: ExtractionScheduler):
+    """Test that results and exceptions are forwarded to the caller."""
+    assert await scheduler.run(lambda x: x * 2, 21) == 42
+
+    def fail():
+        raise ValueError("boom")
+
+    with pytest.raises(ValueError):
+        await scheduler.run(fail)
+
+
+async def test_priority_and_fairness(scheduler: ExtractionScheduler):
+    """Test interactive work goes first and guilds are served round-robin."""
+    gate = threading.Event()
+    order = []
+    blocker = asyncio.ensure_future(scheduler.run(gate.wait))
+    await asyncio.sleep(0)
+
+    jobs = [
+        scheduler.run(order.append, "prefetch", guild_id=1, priority=Priority.PREFETCH),
+        scheduler.run(order.append, "a1", guild_id=1),
+        scheduler.run(order.append, "a2", guild_id=1),
+        scheduler.run(order.append, "b1", guild_id=2),
+    ]
+    tasks = [asyncio.ensure_future(job) for job in jobs]
+    await asyncio.sleep(0)
+    gate.set()
+    await asyncio.gather(blocker, *tasks)
+
+    assert order == ["a1", "b1", "a2", "prefetch"]
+
+
+async def test_back_pressure(scheduler: ExtractionScheduler):
+    """Test that work is rejected once the queue is full."""
+    gate = threading.Event()
+    tasks = [
+        asyncio.ensure_future(scheduler.run(gate.wait, guild_id=i)) for i in range(5)
+    ]
+    await asyncio.sleep(0)
+
+    with pytest.raises(ExtractionQueueFullError):
+        await scheduler.run(gate.wait)
+
+    gate.set()
+    await asyncio.gather(*tasks)
+
+
+def test_pool_reuses_and_recycles(monkeypatch):
+    """Test that pooled instances are reused and recycled after max uses."""
+    closed = []
+
+    class FakeYoutubeDL:
+        def __init__(self, options):
+            self.options = options
+
+        def extract_info(self, url, download=False):
+            return {"url": url, "downloader": self}
+
+        def close(self):
+            closed.append(self)
+
+    monkeypatch.setattr("keion.utils.extraction.yt_dlp.YoutubeDL", FakeYoutubeDL)
+    pool = YoutubeDLPool({"quiet": True}, max_uses=2)
+
+    first = pool.extract_info("a")["downloader"]
+    assert pool.extract_info("b")["downloader"] is first  # warm reuse
+    assert closed == [first]  # recycled after two uses
+
+    with pool.checkout() as one, pool.checkout() as two:
+        assert one is not two  # concurrent checkouts never share
+    assert pool.created == 3
+
+    pool.close()
+    assert len(closed) == 3
+
+
+async def test_single_flight_coalesces():
+    """Test that concurrent calls for one key share a single call."""
+    flight = SingleFlight()
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return "result"
+
+    results = await asyncio.gather(*(flight.run("key", fetch) for _ in range(5)))
+    assert results == ["result"] * 5
+    assert len(calls) == 1
+    assert len(flight) == 0
+
+    await flight.run("key", fetch)
+    assert len(calls) == 2  # a finished call is not reused
+
+
+async def test_single_flight_survives_cancelled_caller():
+    """Test that one caller cancelling does not cancel the shared call."""
+    flight = SingleFlight()
+
+    async def fetch():
+        await asyncio.sleep(0.01)
+        return "result"
+
+    first = asyncio.ensure_future(flight.run("key", fetch))
+    second = asyncio.ensure_future(flight.run("key", fetch))
+    await asyncio.sleep(0)
+    first.cancel()
+    assert await second == "result"
+
+
+async def test_single_flight_interactive_does_not_join_prefetch():
+    """Test that an interactive caller never waits on a prefetch call."""
+    flight = SingleFlight()
+    calls = []
+
+    def fetch(priority: Priority):
+        async def call():
+            calls.append(priority)
+            await asyncio.sleep(0.01)
+            return priority
+
+        return call
+
+    results = await asyncio.gather(
+        flight.run("key", fetch(Priority.PREFETCH), Priority.PREFETCH),
+        flight.run("key", fetch(Priority.INTERACTIVE), Priority.INTERACTIVE),
+        flight.run("key", fetch(Priority.INTERACTIVE), Priority.INTERACTIVE),
+        flight.run("key", fetch(Priority.PREFETCH), Priority.PREFETCH),
+    )
+    assert calls == [Priority.PREFETCH, Priority.INTERACTIVE]
+    assert results == [
+        Priority.PREFETCH,
+        Priority.INTERACTIVE,
+        Priority.INTERACTIVE,
+        Priority.INTERACTIVE,  # joined the interactive call
+    ]
+    assert len(flight) == 0
+
+
+def test_normalize_query():
+    """Test that case, whitespace and punctuation differences are folded."""
+    assert normalize_query("  Never  Gonna\tGive You UP ") == "never gonna give you up"
+    assert normalize_query("Don't Stop Me Now!") == normalize_query("dont stop me now")
+    assert normalize_query("ふわふわ時間") == "ふわふわ時間"
+    assert normalize_query("?!") == "?!"
@@ -0,0 +1,131 @@
+"""Tests for the ffmpeg governor."""
+
+import asyncio
+import threading
+from pathlib import Path
+
+import pytest
+
+from keion.utils.audio import ffmpeg_options_for, ffmpeg_seek_opts
+from keion.utils.constants import (
+    FFMPEG_BITRATE,
+    FFMPEG_DEGRADED_BITRATE,
+    FFMPEG_MIN_BITRATE,
+)
+from keion.utils.ffmpeg_governor import FFmpegGovernor, read_cgroup_cpu_quota
+from keion.utils.track import Track
+
+
+def test_reads_cgroup_v2_quota(tmp_path: Path):
+    """Test reading the CPU quota from cgroup v2."""
+    (tmp_path / "cpu.max").write_text("150000 100000\n")
+    assert read_cgroup_cpu_quota(tmp_path) == pytest.approx(1.5)
+
+    (tmp_path / "cpu.max").write_text("max 100000\n")
+    assert read_cgroup_cpu_quota(tmp_path) is None
+
+
+def test_reads_cgroup_v1_quota(tmp_path: Path):
+    """Test reading the CPU quota from cgroup v1."""
+    (tmp_path / "cpu").mkdir()
+    (tmp_path / "cpu" / "cpu.cfs_quota_us").write_text("50000\n")
+    (tmp_path / "cpu" / "cpu.cfs_period_us").write_text("100000\n")
+    assert read_cgroup_cpu_quota(tmp_path) == pytest.approx(0.5)
+
+    (tmp_path / "cpu" / "cpu.cfs_quota_us").write_text("-1\n")
+    assert read_cgroup_cpu_quota(tmp_path) is None
+
+
+def test_no_cgroup(tmp_path: Path):
+    """Test that a missing cgroup means no quota."""
+    assert read_cgroup_cpu_quota(tmp_path) is None
+
+
+def test_threads_shrink_with_load():
+    """Test that later streams get fewer threads and then degrade."""
+    governor = FFmpegGovernor(cpus=2, max_threads=2, streams_per_cpu=1)
+
+    first = governor.try_acquire()
+    second = governor.try_acquire()
+    third = governor.try_acquire()
+
+    assert (first.threads, first.degraded) == (2, False)
+    assert (second.threads, second.degraded) == (1, False)
+    assert (third.threads, third.degraded) == (1, True)
+
+
+def test_passthrough_is_not_counted():
+    """Test that remuxed streams never count against the budget."""
+    governor = FFmpegGovernor(cpus=1, streams_per_cpu=1)
+    slots = [governor.try_acquire(encode=False) for _ in range(10)]
+    assert governor.encoding == 0
+    assert governor.passthrough == len(slots)
+    assert not governor.try_acquire().degraded
+
+
+@pytest.mark.asyncio
+async def test_saturated_streams_wait_for_a_slot():
+    """Test that streams past the hard limit queue until one ends."""
+    governor = FFmpegGovernor(cpus=1, streams_per_cpu=1)
+    slots = [governor.try_acquire() for _ in range(governor.max_streams)]
+    assert governor.try_acquire() is None
+
+    waiter = asyncio.ensure_future(governor.acquire())
+    await asyncio.sleep(0)
+    assert not waiter.done()
+
+    slots[0].release()
+    slots[0].release()  # Releasing twice is harmless
+    slot = await waiter
+    assert slot.degraded
+    assert governor.encoding == governor.max_streams
+
+
+@pytest.mark.asyncio
+async def test_release_from_player_thread():
+    """Test that releasing from another thread hands off to the event loop."""
+    governor = FFmpegGovernor(cpus=1, streams_per_cpu=1)
+    slot = governor.try_acquire()
+
+    thread = threading.Thread(target=slot.release)
+    thread.start()
+    thread.join()
+    await asyncio.sleep(0)
+
+    assert governor.encoding == 0
+
+
+def test_bitrate_capped_by_channel():
+    """Test that the channel bitrate caps the encode bitrate."""
+    governor = FFmpegGovernor(cpus=4, streams_per_cpu=4)
+    slot = governor.try_acquire()
+
+    assert governor.pick_bitrate(slot, channel_bitrate=64000) == 64
+    assert governor.pick_bitrate(slot, channel_bitrate=384000) == FFMPEG_BITRATE
+    assert governor.pick_bitrate(slot, channel_bitrate=None) == FFMPEG_BITRATE
+    assert governor.pick_bitrate(slot, channel_bitrate=8000) == FFMPEG_MIN_BITRATE
+
+
+def test_bitrate_drops_with_load():
+    """Test that the bitrate slides down as the encoder load rises."""
+    governor = FFmpegGovernor(cpus=1, streams_per_cpu=4)
+    bitrates = []
+    for _ in range(governor.max_streams):
+        slot = governor.try_acquire()
+        bitrates.append(governor.pick_bitrate(slot, channel_bitrate=None))
+
+    assert bitrates == sorted(bitrates, reverse=True)
+    assert bitrates[0] == FFMPEG_BITRATE
+    assert bitrates[-1] == FFMPEG_DEGRADED_BITRATE
+    assert all(bitrate % 8 == 0 for bitrate in bitrates)
+
+
+def test_seek_uses_input_side_seeking():
+    """Test that a start position is passed to ffmpeg before the input."""
+    track = Track(id="1", title="Song", webpage_url="http://a", audio_codec="opus")
+
+    options = ffmpeg_seek_opts(ffmpeg_options_for(track), 90)
+    assert options["before_options"].startswith("-ss 90.000 ")
+    assert "-ss" not in ffmpeg_options_for(track)["before_options"]
+    local = ffmpeg_seek_opts(ffmpeg_options_for(track, gain=2, local=True), 5)
+    assert local["before_options"] == "-ss 5.000"
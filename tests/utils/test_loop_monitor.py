@@ -0,0 +1,46 @@
+"""Tests for the event loop lag monitor."""
+
+import asyncio
+import time
+
+import pytest
+
+from keion.utils.loop_monitor import LoopLagMonitor
+
+INTERVAL = 0.01
+THRESHOLD = 0.05
+
+
+def test_histogram_buckets():
+    """Test that lags land in the first bucket bounding them."""
+    monitor = LoopLagMonitor(buckets=(0.01, 0.1))
+    for lag in (0.0, 0.05, 0.1, 3.0):
+        monitor.record(lag)
+
+    snapshot = monitor.snapshot()
+    assert snapshot["histogram"] == {"0.01": 1, "0.1": 2, "+Inf": 1}
+    assert snapshot["samples"] == 4
+    assert snapshot["max_lag"] == pytest.approx(3.0)
+
+
+def blocking_call():
+    time.sleep(THRESHOLD * 4)
+
+
+@pytest.mark.asyncio
+async def test_blocking_call_is_caught_in_the_act():
+    """Test that a stall records the stack of the blocking call."""
+    monitor = LoopLagMonitor(interval=INTERVAL, threshold=THRESHOLD)
+    monitor.start()
+    try:
+        await asyncio.sleep(INTERVAL * 3)
+        blocking_call()
+        await asyncio.sleep(INTERVAL * 3)
+    finally:
+        await monitor.stop()
+
+    snapshot = monitor.snapshot()
+    assert snapshot["samples"]
+    assert snapshot["max_lag"] >= THRESHOLD
+    assert len(snapshot["stalls"]) == 1
+    assert "blocking_call" in snapshot["stalls"][0]["stack"]
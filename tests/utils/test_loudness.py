@@ -0,0 +1,68 @@
+"""Tests for loudness measurement and normalization."""
+
+import asyncio
+from pathlib import Path
+
+import pytest
+
+from keion.utils.audio import ffmpeg_options_for
+from keion.utils.constants import LOUDNESS_MAX_BOOST, LOUDNESS_TARGET
+from keion.utils.loudness import (
+    LoudnessAnalyzer,
+    loudness_gain,
+    parse_integrated_loudness,
+)
+from keion.utils.track import Track
+
+SUMMARY = """[Parsed_ebur128_0 @ 0x5581] Summary:
+
+  Integrated loudness:
+    I:          -9.3 LUFS
+    Threshold: -19.6 LUFS
+
+  Loudness range:
+    LRA:         5.1 LU
+"""
+
+
+def test_parse_integrated_loudness():
+    """Test reading the integrated loudness from the ebur128 summary."""
+    assert parse_integrated_loudness(SUMMARY) == pytest.approx(-9.3)
+    assert parse_integrated_loudness("    I:         -inf LUFS") is None
+    assert parse_integrated_loudness("no summary") is None
+
+
+def test_loudness_gain_is_clamped():
+    """Test that the gain reaches the target within safe limits."""
+    assert loudness_gain(LOUDNESS_TARGET + 4) == pytest.approx(-4)
+    assert loudness_gain(-60) == LOUDNESS_MAX_BOOST
+
+
+def test_gain_forces_reencoding():
+    """Test that a gain is applied as a linear volume filter."""
+    track = Track(id="1", title="Song", webpage_url="http://a", audio_codec="opus")
+
+    assert ffmpeg_options_for(track)["codec"] == "copy"
+    options = ffmpeg_options_for(track, gain=-4.5)
+    assert "codec" not in options
+    assert "-af volume=-4.5dB" in options["options"]
+    assert "before_options" not in ffmpeg_options_for(track, gain=2, local=True)
+
+
+@pytest.mark.asyncio
+async def test_analyzer_reports_loudness(tmp_path: Path):
+    """Test that the analyzer passes the measured loudness to its callback."""
+    (tmp_path / "summary.txt").write_text(SUMMARY)
+    script = tmp_path / "ffmpeg"
+    script.write_text(f"#!/bin/sh\ncat {tmp_path / 'summary.txt'} >&2\n")
+    script.chmod(0o755)
+    analyzer = LoudnessAnalyzer(executable=str(script))
+    results = []
+
+    analyzer.analyse("1", "song.opus", results.append, local=True)
+    analyzer.analyse("1", "song.opus", results.append, local=True)
+    assert "1" in analyzer
+    await asyncio.gather(*analyzer._pending.values())
+
+    assert results == [pytest.approx(-9.3)]
+    assert "1" not in analyzer
@@ -0,0 +1,55 @@
+"""Tests for the Prometheus metrics."""
+
+from keion.utils.metrics import CallbackMetric, Histogram, MetricsRegistry
+
+
+def test_histogram_exposition():
+    """Test that histograms render cumulative buckets, sum and count."""
+    registry = MetricsRegistry()
+    histogram = registry.histogram(
+        "keion_test_seconds", "Test latency", labels=("kind",), buckets=(0.1, 1.0)
+    )
+    histogram.observe(0.05, "url")
+    histogram.observe(0.5, "url")
+    histogram.observe(5, "url")
+
+    lines = registry.render().splitlines()
+    assert lines[:2] == [
+        "# HELP keion_test_seconds Test latency",
+        "# TYPE keion_test_seconds histogram",
+    ]
+    assert 'keion_test_seconds_bucket{kind="url",le="0.1"} 1.0' in lines
+    assert 'keion_test_seconds_bucket{kind="url",le="1.0"} 2.0' in lines
+    assert 'keion_test_seconds_bucket{kind="url",le="+Inf"} 3.0' in lines
+    assert 'keion_test_seconds_sum{kind="url"} 5.55' in lines
+    assert 'keion_test_seconds_count{kind="url"} 3.0' in lines
+
+
+def test_histogram_timer():
+    """Test timing a block of code."""
+    histogram = Histogram("keion_test_seconds", "Test latency")
+    with histogram.time():
+        pass
+    assert "keion_test_seconds_count 1.0" in "\n".join(histogram.render())
+
+
+def test_callback_metric():
+    """Test that callback metrics are read at render time and escaped."""
+    registry = MetricsRegistry()
+    values = {}
+    registry.register(
+        CallbackMetric(
+            "keion_test_total",
+            "Test",
+            lambda: values or None,
+            labels=("name",),
+            metric_type="counter",
+        )
+    )
+    assert registry.render().splitlines()[-1] == "# TYPE keion_test_total counter"
+
+    values[('a"b',)] = 2
+    assert registry.render().splitlines()[-1] == 'keion_test_total{name="a\\"b"} 2.0'
+
+    registry.unregister("keion_test_total")
+    assert "keion_test_total" not in registry
@@ -0,0 +1,108 @@
+"""Tests for the on-disk Opus cache."""
+
+import asyncio
+import os
+from pathlib import Path
+
+import pytest
+
+from keion.utils.opus_cache import OpusDiskCache
+
+
+def write_entry(cache: OpusDiskCache, track_id: str, size: int, mtime: float) -> Path:
+    path = cache.path_for(cache.key_for(track_id))
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(b"x" * size)
+    os.utime(path, (mtime, mtime))
+    return path
+
+
+def fake_ffmpeg(tmp_path: Path, exit_code: int = 0) -> str:
+    """Create a stand-in for ffmpeg that writes its last argument."""
+    script = tmp_path / "ffmpeg"
+    script.write_text(
+        "#!/bin/sh\n"
+        'for last; do :; done\nprintf opus > "$last"\n'
+        f"exit {exit_code}\n"
+    )
+    script.chmod(0o755)
+    return str(script)
+
+
+def test_load_indexes_files_oldest_first(tmp_path: Path):
+    """Test that existing files are indexed and leftovers are removed."""
+    cache = OpusDiskCache(tmp_path / "opus", max_bytes=250)
+    write_entry(cache, "old", 100, mtime=1000)
+    write_entry(cache, "new", 100, mtime=2000)
+    newest = write_entry(cache, "newest", 100, mtime=3000)
+    leftover = newest.with_name("partial.opus.abcd.tmp")
+    leftover.write_bytes(b"x")
+
+    cache.load()
+
+    assert cache.enabled
+    assert "old" not in cache  # evicted to fit the byte budget
+    assert "new" in cache
+    assert "newest" in cache
+    assert cache.total_bytes == 200
+    assert not leftover.exists()
+
+
+def test_get_marks_recently_used(tmp_path: Path):
+    """Test that reading a file protects it from eviction."""
+    cache = OpusDiskCache(tmp_path, max_bytes=200)
+    write_entry(cache, "a", 100, mtime=1000)
+    write_entry(cache, "b", 100, mtime=2000)
+    cache.load()
+
+    assert cache.get("a") == str(cache.path_for(cache.key_for("a")))
+    write_entry(cache, "c", 100, mtime=3000)
+    cache._index[cache.key_for("c")] = 100
+    cache.total_bytes += 100
+    cache._evict()
+
+    assert "a" in cache
+    assert "b" not in cache
+    assert cache.get("missing") is None
+    assert cache.hits == 1
+    assert cache.misses == 1
+
+
+def test_disabled_until_loaded(tmp_path: Path):
+    """Test that nothing is cached before the index is loaded."""
+    cache = OpusDiskCache(tmp_path)
+    write_entry(cache, "a", 10, mtime=1000)
+    assert cache.get("a") is None
+    assert "a" not in cache
+
+
+@pytest.mark.asyncio
+async def test_store_writes_atomically(tmp_path: Path):
+    """Test that a finished transcode is moved into place and indexed."""
+    cache = OpusDiskCache(tmp_path / "opus", executable=fake_ffmpeg(tmp_path))
+    cache.load()
+
+    cache.store("abc", "https://example.com/stream")
+    cache.store("abc", "https://example.com/stream")  # already in progress
+    assert len(cache._pending) == 1
+    await asyncio.gather(*cache._pending.values())
+
+    path = Path(cache.get("abc"))
+    assert path.read_bytes() == b"opus"
+    assert cache.total_bytes == 4
+    assert list(path.parent.glob("*.tmp")) == []
+
+
+@pytest.mark.asyncio
+async def test_failed_store_leaves_nothing(tmp_path: Path):
+    """Test that a failed transcode leaves no file behind."""
+    cache = OpusDiskCache(
+        tmp_path / "opus", executable=fake_ffmpeg(tmp_path, exit_code=1)
+    )
+    cache.load()
+
+    cache.store("abc", "https://example.com/stream")
+    await asyncio.gather(*cache._pending.values())
+
+    assert "abc" not in cache
+    assert list((tmp_path / "opus").glob("*/*")) == []
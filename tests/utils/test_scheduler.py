@@ -0,0 +1,72 @@
+"""Tests for the deadline scheduler."""
+
+import asyncio
+
+import pytest
+
+from keion.utils.scheduler import DeadlineScheduler
+
+RESOLUTION = 0.01
+
+
+@pytest.fixture
+async def fired():
+    return []
+
+
+@pytest.fixture
+async def scheduler(fired: list):
+    async def record(key):
+        fired.append(key)
+
+    scheduler = DeadlineScheduler(record, resolution=RESOLUTION)
+    yield scheduler
+    await scheduler.close()
+
+
+@pytest.mark.asyncio
+async def test_fires_in_deadline_order(scheduler: DeadlineScheduler, fired: list):
+    """Test that keys fire once their deadlines pass, earliest first."""
+    scheduler.schedule("late", RESOLUTION * 4)
+    scheduler.schedule("early", RESOLUTION)
+    assert len(scheduler) == 2
+
+    await asyncio.sleep(RESOLUTION * 8)
+
+    assert fired == ["early", "late"]
+    assert not scheduler
+
+
+@pytest.mark.asyncio
+async def test_reschedule_replaces_deadline(scheduler: DeadlineScheduler, fired: list):
+    """Test that scheduling a key again moves its deadline."""
+    scheduler.schedule("guild", RESOLUTION)
+    scheduler.schedule("guild", RESOLUTION * 6)
+
+    await asyncio.sleep(RESOLUTION * 3)
+    assert fired == []
+    assert "guild" in scheduler
+
+    await asyncio.sleep(RESOLUTION * 6)
+    assert fired == ["guild"]
+
+
+@pytest.mark.asyncio
+async def test_cancel(scheduler: DeadlineScheduler, fired: list):
+    """Test that cancelled keys never fire."""
+    scheduler.schedule("guild", RESOLUTION)
+    scheduler.cancel("guild")
+    scheduler.cancel("missing")
+
+    await asyncio.sleep(RESOLUTION * 4)
+    assert fired == []
+
+
+@pytest.mark.asyncio
+async def test_stale_entries_are_compacted(scheduler: DeadlineScheduler):
+    """Test that repeated rescheduling does not grow the heap without bound."""
+    for _ in range(1000):
+        scheduler.schedule("guild", 60)
+
+    assert len(scheduler) == 1
+    assert len(scheduler._heap) < 500
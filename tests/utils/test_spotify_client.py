@@ -0,0 +1,121 @@
+"""Tests for the SpotifyClient."""
+
+import pytest
+
+from keion.utils.spotify_client import SpotifyAPIError, SpotifyClient
+
+
+class FakeResponse:
+    """Minimal stand-in for an aiohttp response context manager."""
+
+    def __init__(self, status, payload=None, headers=None):
+        self.status = status
+        self._payload = payload or {}
+        self.headers = headers or {}
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        return False
+
+    async def json(self):
+        return self._payload
+
+
+class FakeSession:
+    """Session returning queued responses and recording requests."""
+
+    closed = False
+
+    def __init__(self, responses):
+        self.responses = list(responses)
+        self.requests = []
+
+    def post(self, url, **kwargs):
+        self.requests.append(("POST", url))
+        return self.responses.pop(0)
+
+    def get(self, url, **kwargs):
+        self.requests.append(("GET", url))
+        return self.responses.pop(0)
+
+
+def token(expires_in=3600):
+    return FakeResponse(200, {"access_token": "token", "expires_in": expires_in})
+
+
+@pytest.fixture
+def client(monkeypatch):
+    """Fixture for a SpotifyClient with fake credentials."""
+    monkeypatch.setenv("SPOTIFY_CLIENT_ID", "id")
+    monkeypatch.setenv("SPOTIFY_CLIENT_SECRET", "secret")
+    return SpotifyClient()
+
+
+def use_session(client, monkeypatch, responses):
+    session = FakeSession(responses)
+    monkeypatch.setattr(client, "_get_session", lambda: session)
+    return session
+
+
+async def test_token_reused_until_near_expiry(client, monkeypatch):
+    """Test the token is fetched once and refreshed before it expires."""
+    session = use_session(
+        client,
+        monkeypatch,
+        [
+            token(),
+            FakeResponse(200, {"id": "1"}),
+            FakeResponse(200, {"id": "2"}),
+            token(),
+            FakeResponse(200, {"id": "3"}),
+        ],
+    )
+    assert (await client.get_track_info("1"))["id"] == "1"
+    assert (await client.get_track_info("2"))["id"] == "2"
+    assert [method for method, _ in session.requests] == ["POST", "GET", "GET"]
+
+    client._token_expires_at = 0.0  # token is about to expire
+    assert (await client.get_track_info("3"))["id"] == "3"
+    assert session.requests[-2][0] == "POST"
+
+
+async def test_unauthorized_retry_is_bounded(client, monkeypatch):
+    """Test that repeated 401s fail instead of recursing forever."""
+    use_session(
+        client,
+        monkeypatch,
+        [token(), FakeResponse(401)] * 3,
+    )
+    with pytest.raises(SpotifyAPIError):
+        await client.get_track_info("1")
+
+
+async def test_error_status_raises(client, monkeypatch):
+    """Test that unexpected statuses raise SpotifyAPIError."""
+    use_session(client, monkeypatch, [token(), FakeResponse(404)])
+    with pytest.raises(SpotifyAPIError):
+        await client.get_track_info("missing")
+
+
+async def test_iter_collection_tracks_batches(client, monkeypatch):
+    """Test playlists are paged and resolved through the batch endpoint."""
+    requests = []
+
+    async def fake_get(path, params=None):
+        requests.append((path, params))
+        if path.startswith("/playlists/"):
+            if params["offset"] == 0:
+                items = [{"track": {"id": str(i)}} for i in range(100)]
+                return {"items": items, "next": "page-2"}
+            return {"items": [{"track": {"id": "100"}}, {"track": None}], "next": None}
+        ids = params["ids"].split(",")
+        return {"tracks": [{"id": track_id} for track_id in ids]}
+
+    monkeypatch.setattr(client, "_get", fake_get)
+    tracks = [t async for t in client.iter_collection_tracks("playlist", "abc")]
+
+    assert [t["id"] for t in tracks] == [str(i) for i in range(101)]
+    batches = [params["ids"] for path, params in requests if path == "/tracks"]
+    assert [len(batch.split(",")) for batch in batches] == [50, 50, 1]
@@ -0,0 +1,134 @@
+"""Tests for the Track record."""
+
+import dataclasses
+
+import pytest
+
+from keion.utils.audio import ffmpeg_options_for, ffmpeg_opts
+from keion.utils.track import (
+    SpotifyMetadata,
+    Track,
+    parse_audio_codec,
+    parse_stream_expiry,
+)
+
+
+def test_from_info_drops_heavy_fields():
+    """Test that only the used fields are kept from a yt-dlp info dict."""
+    info = {
+        "id": "abc123",
+        "title": "Test Song",
+        "webpage_url": "https://www.youtube.com/watch?v=abc123",
+        "url": "https://rr1.googlevideo.com/videoplayback?expire=1700000000&id=x",
+        "duration": 185.0,
+        "uploader": "Test Channel",
+        "thumbnail": "http://example.com/thumb.jpg",
+        "formats": [{"url": "http://example.com/f"}] * 50,
+        "http_headers": {"User-Agent": "yt-dlp"},
+    }
+    track = Track.from_info(info)
+
+    assert track.id == "abc123"
+    assert track.stream_url == info["url"]
+    assert track.stream_expires_at == 1700000000
+    assert track.duration == 185
+    assert track.uploader == "Test Channel"
+    assert not hasattr(track, "__dict__")
+
+
+def test_track_is_immutable():
+    """Test that tracks cannot be mutated in place."""
+    track = Track(id="1", title="Song", webpage_url="http://example.com")
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        track.title = "Other"
+
+
+def test_spotify_metadata_display():
+    """Test that Spotify metadata takes precedence for display fields."""
+    spotify = SpotifyMetadata.from_api(
+        {
+            "id": "sp1",
+            "name": "Song",
+            "artists": [{"name": "A"}, {"name": "B"}],
+            "album": {"images": [{"url": "http://example.com/album.jpg"}]},
+        }
+    )
+    track = Track(
+        id="1",
+        title="Song",
+        webpage_url="http://example.com",
+        uploader="Channel",
+        thumbnail="http://example.com/thumb.jpg",
+        spotify_metadata=spotify,
+    )
+    assert track.artist == "A, B"
+    assert track.artwork_url == "http://example.com/album.jpg"
+
+
+@pytest.mark.parametrize(
+    "url, expected",
+    [
+        ("https://r.googlevideo.com/videoplayback?expire=1700000000", 1700000000),
+        ("https://r.googlevideo.com/api/manifest/expire/1700000000/ei/x", 1700000000),
+        ("https://example.com/song.mp3", None),
+        (None, None),
+    ],
+)
+def test_parse_stream_expiry(url, expected):
+    """Test expiry parsing from signed stream URLs."""
+    assert parse_stream_expiry(url) == expected
+
+
+def test_stream_expires_within(monkeypatch):
+    """Test stream expiry checks and refreshing the stream URL."""
+    monkeypatch.setattr("keion.utils.track.time.time", lambda: 1000.0)
+    track = Track(id="1", title="Song", webpage_url="http://example.com")
+    assert track.stream_expires_within(0)  # No stream URL yet
+
+    fresh = track.with_stream("https://r.googlevideo.com/videoplayback?expire=1500")
+    assert fresh.stream_expires_at == 1500
+    assert not fresh.stream_expires_within(300)
+    assert fresh.stream_expires_within(600)
+    assert not track.with_stream("http://example.com/a.mp3").stream_expires_within(
+        10**9
+    )
+
+
+def test_from_flat_entry_placeholder():
+    """Test that flat playlist entries become unresolved placeholders."""
+    track = Track.from_flat_entry(
+        {"id": "abc123", "title": "Song", "duration": 200.0, "channel": "Channel"}
+    )
+    assert track.is_placeholder
+    assert track.webpage_url == "https://www.youtube.com/watch?v=abc123"
+    assert track.duration == 200
+    assert track.uploader == "Channel"
+    assert not track.with_stream("http://example.com/a.mp3").is_placeholder
+
+
+@pytest.mark.parametrize(
+    ("info", "codec"),
+    [
+        ({"acodec": "opus", "ext": "webm"}, "opus"),
+        ({"acodec": "mp4a.40.2", "ext": "m4a"}, "mp4a"),
+        ({"acodec": "none", "ext": "opus"}, "opus"),
+        ({"ext": "webm"}, None),
+    ],
+)
+def test_parse_audio_codec(info, codec):
+    """Test detecting the audio codec of a yt-dlp format."""
+    assert parse_audio_codec(info) == codec
+
+
+def test_opus_streams_skip_reencoding():
+    """Test that only Opus sources are streamed with codec copy."""
+    info = {"id": "1", "url": "http://example.com/a.webm", "acodec": "opus"}
+    opus = Track.from_info(info)
+    aac = Track.from_info({**info, "acodec": "mp4a.40.2"})
+
+    assert opus.is_opus
+    assert ffmpeg_options_for(opus)["codec"] == "copy"
+    assert "libopus" not in ffmpeg_options_for(opus)["options"]
+    assert ffmpeg_options_for(aac) == ffmpeg_opts
+    # A re-resolved stream may use another format
+    assert not opus.with_stream("http://example.com/a.m4a").is_opus
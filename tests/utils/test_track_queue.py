@@ -0,0 +1,151 @@
+"""Tests for the indexed track queue."""
+
+import random
+from unittest.mock import patch
+
+import pytest
+
+from keion.utils.track import Track
+from keion.utils.track_queue import TrackQueue
+
+
+def make_tracks(count: int) -> list[Track]:
+    return [
+        Track(id=str(i), title=f"Song {i}", webpage_url=f"http://example.com/{i}")
+        for i in range(count)
+    ]
+
+
+def test_matches_list_under_random_edits():
+    """Test that positional edits behave exactly like a plain list."""
+    rng = random.Random(42)
+    tracks = make_tracks(50)
+    queue = TrackQueue(block_size=4)
+    expected: list[Track] = []
+
+    for _ in range(2000):
+        operation = rng.choice(
+            ["append", "insert", "remove", "move", "pop", "pop", "discard"]
+        )
+        if operation == "append" or not expected:
+            track = rng.choice(tracks)
+            queue.append(track)
+            expected.append(track)
+        elif operation == "insert":
+            index = rng.randrange(len(expected) + 1)
+            track = rng.choice(tracks)
+            queue.insert(index, track)
+            expected.insert(index, track)
+        elif operation == "remove":
+            index = rng.randrange(len(expected))
+            assert queue.remove(index) == expected.pop(index)
+        elif operation == "move":
+            source = rng.randrange(len(expected))
+            destination = rng.randrange(len(expected))
+            queue.move(source, destination)
+            expected.insert(destination, expected.pop(source))
+        elif operation == "discard":
+            track = rng.choice(tracks)
+            assert queue.discard(track) == (track in expected)
+            if track in expected:
+                expected.remove(track)
+        else:
+            assert queue.popleft() == expected.pop(0)
+
+        assert len(queue) == len(expected)
+
+    assert list(queue) == expected
+    assert [queue[i] for i in range(len(expected))] == expected
+    assert queue[-1] == expected[-1]
+    assert queue[3:9] == expected[3:9]
+    for index, entry in enumerate(queue.entries()):
+        assert queue.position(entry.entry_id) == index
+
+
+def test_membership_and_counts():
+    """Test that membership and duplicate counts track every edit."""
+    song1, song2, song3 = make_tracks(3)
+    tracks = [song1, song2, song1]
+    queue = TrackQueue(tracks)
+
+    assert song1 in queue
+    assert song3 not in queue
+    assert queue.count(song1) == 2
+
+    queue.popleft()
+    assert queue.count(song1) == 1
+    assert queue.discard(song1)
+    assert song1 not in queue
+    assert not queue.discard(song1)
+
+
+def test_entries_have_unique_ids():
+    """Test that repeated songs are distinct entries."""
+    (song,) = make_tracks(1)
+    queue = TrackQueue([song, song])
+    assert queue.entry(0).entry_id != queue.entry(1).entry_id
+
+
+def test_lookup_by_entry_id():
+    """Test that entries are found and removed by their entry ID."""
+    tracks = make_tracks(10)
+    queue = TrackQueue(tracks, block_size=2)
+    entry = queue.insert(5, tracks[0])
+    queue.popleft()
+    queue.popleft()
+
+    assert queue.position(entry.entry_id) == 3
+    assert queue.remove_entry(entry.entry_id) == tracks[0]
+    assert queue.count(tracks[0]) == 0
+    assert list(queue) == tracks[2:]
+    with pytest.raises(KeyError):
+        queue.position(entry.entry_id)
+
+
+def test_popleft_keeps_the_index():
+    """Test that draining the head does not rebuild the block index."""
+    queue = TrackQueue(make_tracks(40), block_size=2)
+    queue.entry(0)  # Builds the index
+
+    with patch.object(queue, "_build_tree", wraps=queue._build_tree) as build:
+        for _ in range(19):
+            queue.popleft()
+        assert queue[0].id == "19"
+
+    build.assert_not_called()
+
+
+def test_shuffle_is_a_permutation():
+    """Test that shuffling keeps every entry exactly once."""
+    tracks = make_tracks(100)
+    queue = TrackQueue(tracks, block_size=8)
+    entry_ids = {entry.entry_id for entry in queue.entries()}
+
+    queue.shuffle(random.Random(1))
+
+    assert list(queue) != tracks
+    assert sorted(queue, key=lambda track: int(track.id)) == tracks
+    assert {entry.entry_id for entry in queue.entries()} == entry_ids
+
+
+def test_dedupe_keeps_first_occurrences():
+    """Test that dedupe keeps the first occurrence of every song."""
+    song1, song2, song3 = make_tracks(3)
+    tracks = [song1, song2, song1, song3, song2]
+    queue = TrackQueue(tracks, block_size=2)
+
+    assert queue.dedupe() == 2
+    assert list(queue) == [song1, song2, song3]
+    assert queue.count(song1) == 1
+    assert queue[-1] == song3
+
+
+def test_out_of_range_positions():
+    """Test that invalid positions raise IndexError."""
+    queue = TrackQueue(make_tracks(3))
+    with pytest.raises(IndexError):
+        queue.remove(3)
+    with pytest.raises(IndexError):
+        queue.move(0, 3)
+    with pytest.raises(IndexError):
+        TrackQueue().popleft()
@@ -0,0 +1,114 @@
+"""Tests for the dashboard broadcaster."""
+
+import asyncio
+import json
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from fastapi import WebSocketDisconnect
+
+from keion.utils.events import EventBus
+from keion.web.dashboard import DashboardBroadcaster, diff_snapshots
+
+
+def _player(guild_id: int, title: str) -> dict:
+    return {"guild_id": guild_id, "current_song_title": title}
+
+
+def test_diff_snapshots():
+    """Test that only changed stats and players are sent."""
+    old = {
+        "stats": {"servers": 3, "active_voice": 2},
+        "players": [_player(1, "A"), _player(2, "B")],
+        "positions": {1: 10.0, 2: 20.0},
+    }
+    new = {
+        "stats": {"servers": 3, "active_voice": 1},
+        "players": [_player(1, "C")],
+        "positions": {1: 0.0},
+    }
+
+    assert diff_snapshots(old, new) == {
+        "stats": {"active_voice": 1},
+        "players": {"updated": [_player(1, "C")], "removed": [2]},
+        "positions": {1: 0.0},
+    }
+    assert diff_snapshots(new, new) == {}
+
+
+def test_moving_position_does_not_resend_players():
+    """Test that playback progress alone is sent without the players."""
+    old = {"stats": {}, "players": [_player(1, "A")], "positions": {1: 10.0}}
+    new = {"stats": {}, "players": [_player(1, "A")], "positions": {1: 12.5}}
+
+    assert diff_snapshots(old, new) == {"positions": {1: 12.5}}
+
+
+@pytest.mark.asyncio
+async def test_events_are_coalesced_into_one_shared_diff():
+    """Test that a burst of events builds one snapshot for every client."""
+    bus = EventBus()
+    broadcaster = DashboardBroadcaster(MagicMock(), events=bus, debounce=0)
+    broadcaster._snapshot = {
+        "stats": {"active_voice": 0},
+        "players": [],
+        "positions": {},
+    }
+    clients = [MagicMock(queue=asyncio.Queue(4)) for _ in range(3)]
+    broadcaster.clients.update(clients)
+    snapshot = {"stats": {"active_voice": 1}, "players": [], "positions": {}}
+
+    with patch.object(
+        broadcaster, "_build_snapshot", return_value=snapshot
+    ) as build_snapshot:
+        bus.publish("song_start", 1)
+        bus.publish("queue", 1)
+        await broadcaster._refresh_task
+
+    build_snapshot.assert_called_once()
+    messages = {client.queue.get_nowait() for client in clients}
+    assert messages == {'{"type": "diff", "seq": 1, "stats": {"active_voice": 1}}'}
+
+
+@pytest.mark.asyncio
+async def test_slow_client_is_dropped():
+    """Test that a client whose queue is full stops receiving updates."""
+    broadcaster = DashboardBroadcaster(MagicMock(), events=EventBus())
+    client = MagicMock(queue=asyncio.Queue(1))
+    broadcaster.clients.add(client)
+
+    broadcaster._broadcast("first")
+    broadcaster._broadcast("second")
+
+    assert client not in broadcaster.clients
+    assert client.queue is None
+
+
+@pytest.mark.asyncio
+async def test_connect_and_resync_send_fresh_snapshots():
+    """Test that sockets get a snapshot built when they connect or ask."""
+    broadcaster = DashboardBroadcaster(MagicMock(), events=EventBus())
+    broadcaster._snapshot = {"stats": {}, "players": [], "positions": {1: 1.0}}
+    other = MagicMock(queue=asyncio.Queue(4))
+    broadcaster.clients.add(other)
+    websocket = MagicMock(accept=AsyncMock(), send_text=AsyncMock())
+    websocket.receive_text = AsyncMock(side_effect=["resync", WebSocketDisconnect()])
+    snapshots = [
+        {"stats": {}, "players": [], "positions": {1: position}}
+        for position in (5.0, 9.0)
+    ]
+
+    with (
+        patch.object(broadcaster, "_build_snapshot", side_effect=snapshots),
+        patch.object(broadcaster, "_send", wraps=broadcaster._send) as send,
+    ):
+        await broadcaster.serve(websocket)
+
+    sent = [
+        json.loads(message)
+        for client, message in (call.args for call in send.call_args_list)
+        if client is not other
+    ]
+    assert [message["positions"] for message in sent] == [{"1": 5.0}, {"1": 9.0}]
+    assert {message["type"] for message in sent} == {"snapshot"}
+    assert json.loads(other.queue.get_nowait())["positions"] == {"1": 5.0}